@@ -1,22 +1,27 @@
 import os
 import csv
-from bs4 import BeautifulSoup
 import re
+from story_cache import get_story_content, load_parse_cache, save_parse_cache
+from telugu_tokenizer import compile_keywords, find_keywords, token_text
 
-def analyze_html_file(file_path):
+# Story indicators in title/filename, matched on whole grapheme clusters
+STORY_INDICATORS = compile_keywords([
+    'కథ', 'కధ', 'కథా', 'కదబ',  # Telugu words for story
+    'story', 'tale',
+    'అనుభవ', 'జరిగిన',  # experience, happened
+    'చిన్న', 'పెద్ద',  # small, big (story descriptors)
+])
+
+def analyze_html_file(file_path, cache=None):
     """Analyze an HTML file to determine if it's a story or document"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, 'html.parser')
+        content = get_story_content(file_path, cache)
         
         # Get title
-        title_tag = soup.find('title')
-        title = title_tag.text.strip() if title_tag else os.path.basename(file_path)
+        title = content['title'] or os.path.basename(file_path)
         
         # Get text content
-        text_content = soup.get_text()
+        text_content = content['text']
         
         # Indicators for documents (not stories)
         document_indicators = [
@@ -31,15 +36,8 @@ def analyze_html_file(file_path):
         filename = os.path.basename(file_path).lower()
         is_likely_document = any(indicator in filename for indicator in document_indicators)
         
-        # Story indicators in title/content
-        story_indicators = [
-            'కథ', 'కధ', 'కథా', 'కదబ',  # Telugu words for story
-            'story', 'tale',
-            'అనుభవ', 'జరిగిన',  # experience, happened
-            'చిన్న', 'పెద్ద',  # small, big (story descriptors)
-        ]
-        
-        has_story_indicators = any(indicator in title.lower() or indicator in filename for indicator in story_indicators)
+        # Story indicators in title/filename (on separate lines so no indicator spans both)
+        has_story_indicators = bool(find_keywords(STORY_INDICATORS, token_text(title) + '\n' + token_text(filename)))
         
         # Check content length (stories are usually longer)
         content_length = len(text_content.strip())
@@ -77,6 +75,7 @@ def analyze_html_file(file_path):
 def main():
     stories_base_path = '/Users/udaykanteti/Workspaces/ravigarikathalu/stories'
     results = []
+    cache = load_parse_cache()
     
     # Walk through all year directories
     for year in ['2021', '2022', '2023', '2024']:
@@ -85,8 +84,9 @@ def main():
             for filename in os.listdir(year_path):
                 if filename.endswith('.html'):
                     file_path = os.path.join(year_path, filename)
-                    result = analyze_html_file(file_path)
+                    result = analyze_html_file(file_path, cache)
                     results.append(result)
+    save_parse_cache(cache)
     
     # Sort by year and filename
     results.sort(key=lambda x: (x['year'], x['filename']))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Story Pipeline Benchmarks
+=========================
+
+Times every stage of the story build on synthetic corpora (see
+synthetic_corpus.py) so a change to the extractor, the classifier or
+the categorizer can be measured instead of guessed.
+
+Stages, run per file in the same order as the build scripts:
+    read        read the HTML bytes from disk
+    parse       BeautifulSoup(html, 'html.parser')
+    extract     extract_story_content() - title, text, paragraphs
+    stream      extract_story_html() - the same content in one pass
+                without a tree (compare with parse + extract)
+    classify    classify_story() / analyze_content_type()
+    categorize  categorize_story()
+    serialize   json.dumps of the finished catalog (once per corpus)
+
+For each corpus size the report gives seconds, files/s and MB/s (of
+input HTML) per stage plus the peak RSS of the run; --memory also
+records the peak Python allocation of each stage with tracemalloc,
+which slows the timings down. Each size runs in a fresh process so
+peak memory is not carried over between sizes.
+
+Results are written as JSON (default benchmark-results.json); pass
+--compare with an earlier results file to print the speed-up per stage.
+
+Usage:
+    python benchmark_stories.py [--sizes 1000,10000,100000] [--memory]
+                                [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from comprehensive_story_analysis import classify_story
+from create_stories_data import build_story_data, categorize_story
+from dedupe_stories import story_text
+from story_cache import extract_story_content
+from story_extractor import extract_story_html
+from synthetic_corpus import generate_corpus
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+RESULTS_FILE = 'benchmark-results.json'
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [1000, 10000, 100000]
+STAGES = ['read', 'parse', 'extract', 'stream', 'classify', 'categorize', 'serialize']
+
+
+def read_bytes(path):
+    """Stage: read one file"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_html(data):
+    """Stage: build the BeautifulSoup tree"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(data.decode('utf-8'), 'html.parser')
+
+
+def serialize_catalog(stories):
+    """Stage: encode the catalog the way create_stories_data.py writes it"""
+    return json.dumps(stories, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def run_stage(totals, stage, trace, function, *args):
+    """Call function(*args), adding its time (and peak allocation) to the stage totals"""
+    if trace:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    result = function(*args)
+    totals[stage]['seconds'] += time.perf_counter() - started
+
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] - base
+        totals[stage]['peak_bytes'] = max(totals[stage]['peak_bytes'], peak)
+    return result
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def benchmark_size(size, seed=0, trace=False):
+    """Run every stage over a corpus of `size` files and return the measurements"""
+    files = generate_corpus(size, seed)
+    totals = {stage: {'seconds': 0.0, 'peak_bytes': 0} for stage in STAGES}
+    classifications = {}
+    stories = []
+    input_bytes = 0
+
+    if trace:
+        tracemalloc.start()
+
+    for path in files:
+        year = os.path.basename(os.path.dirname(path))
+        filename = os.path.basename(path)
+
+        data = run_stage(totals, 'read', trace, read_bytes, path)
+        input_bytes += len(data)
+        soup = run_stage(totals, 'parse', trace, parse_html, data)
+        content = run_stage(totals, 'extract', trace, extract_story_content, soup)
+        run_stage(totals, 'stream', trace, extract_story_html, data.decode('utf-8'))
+        result = run_stage(totals, 'classify', trace, classify_story, year, filename, content)
+        classifications[result['classification']] = classifications.get(result['classification'], 0) + 1
+
+        if result['classification'] == 'Story':
+            story_data = build_story_data(path, content)
+            stories.append(run_stage(totals, 'categorize', trace, categorize_story, story_data, story_text(content)))
+
+    output = run_stage(totals, 'serialize', trace, serialize_catalog, stories)
+
+    if trace:
+        tracemalloc.stop()
+
+    megabytes = input_bytes / (1024 * 1024)
+    stages = {}
+    for stage in STAGES:
+        seconds = totals[stage]['seconds']
+        stages[stage] = {
+            'seconds': round(seconds, 6),
+            'files_per_s': round(len(files) / seconds, 1) if seconds else None,
+            'mb_per_s': round(megabytes / seconds, 2) if seconds else None,
+            'peak_mb': round(totals[stage]['peak_bytes'] / (1024 * 1024), 2) if trace else None
+        }
+
+    rss = peak_rss_bytes()
+    return {
+        'size': size,
+        'files': len(files),
+        'input_mb': round(megabytes, 2),
+        'output_mb': round(len(output) / (1024 * 1024), 2),
+        'classifications': classifications,
+        'stages': stages,
+        'total_seconds': round(sum(totals[stage]['seconds'] for stage in STAGES), 6),
+        'peak_rss_mb': round(rss / (1024 * 1024), 1) if rss is not None else None
+    }
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run):
+    """Print one size's stage table"""
+    print(f"\n=== {run['files']} FILES ({run['input_mb']} MB) ===")
+    print(f"{'stage':<12}{'seconds':>10}{'files/s':>12}{'MB/s':>10}{'peak MB':>10}")
+    for stage in STAGES:
+        result = run['stages'][stage]
+        files_per_s = f"{result['files_per_s']:.0f}" if result['files_per_s'] else '-'
+        mb_per_s = f"{result['mb_per_s']:.1f}" if result['mb_per_s'] else '-'
+        peak = f"{result['peak_mb']:.1f}" if result['peak_mb'] is not None else '-'
+        print(f"{stage:<12}{result['seconds']:>10.3f}{files_per_s:>12}{mb_per_s:>10}{peak:>10}")
+    print(f"Total: {run['total_seconds']:.2f}s, peak RSS: {run['peak_rss_mb']} MB, "
+          f"classified: {run['classifications']}")
+
+
+def print_comparison(results, previous, previous_file):
+    """Print the speed-up of every stage against an earlier results file"""
+    previous_runs = {run['size']: run for run in previous.get('runs', [])}
+
+    print(f"\n=== COMPARED WITH {previous_file} ({previous.get('commit') or 'unknown commit'}) ===")
+    for run in results['runs']:
+        before = previous_runs.get(run['size'])
+        if before is None:
+            print(f"{run['size']} files: no earlier run")
+            continue
+        changes = []
+        for stage in STAGES:
+            if stage not in before['stages']:
+                continue  # Stage added since the earlier run
+            old, new = before['stages'][stage]['seconds'], run['stages'][stage]['seconds']
+            changes.append(f"{stage} {old / new:.2f}x" if new else f"{stage} -")
+        print(f"{run['size']} files: " + ', '.join(changes))
+
+
+def main(sizes, seed=0, trace=False, output=RESULTS_FILE, compare=None):
+    """Benchmark each corpus size in its own process and write the results file"""
+    print("⏱️  Benchmarking story pipeline stages...")
+
+    # Read the baseline first, it may be the file about to be overwritten
+    previous = None
+    if compare:
+        with open(compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'memory_traced': trace,
+        'runs': []
+    }
+
+    for size in sizes:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            run = executor.submit(benchmark_size, size, seed, trace).result()
+        results['runs'].append(run)
+        print_run(run)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+    if previous is not None:
+        print_comparison(results, previous, compare)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the story build stages on synthetic corpora")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated corpus sizes (default: 1000,10000,100000)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus random seed")
+    parser.add_argument('--memory', action='store_true',
+                        help="record the peak allocation of each stage (slower)")
+    parser.add_argument('--output', default=RESULTS_FILE, help="results JSON file")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(',')], args.seed, args.memory, args.output, args.compare)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Build Precompressed Static Assets
+=================================
+
+Writes <file>.gz (gzip level 9) and <file>.br (brotli quality 11) next
+to every story page, the catalog, the generated search/body payloads
+and the site's own script.js, styles.css, index.html, service worker
+and precache manifest, so a server in
+front of the archive can send the precompressed variant instead of
+compressing on every request.
+
+Each variant gets the mtime of its source file; variants whose mtime
+already matches are current and are skipped. Variants whose source has
+been deleted, or has shrunk below MIN_SIZE, are removed. gzip output is deterministic (no embedded
+timestamp or file name) so unchanged files produce identical bytes.
+
+Story pages and reader payloads rarely change and get brotli quality
+11. Files every catalog build rewrites (FREQUENT_PATTERNS) get quality
+9, about eight times faster for output some 8% larger.
+
+brotli variants need the optional `brotli` package (pip install -r
+requirements-optional.txt); without it only gzip variants are written.
+
+Usage:
+    python build_compressed_assets.py [--force]
+"""
+
+import argparse
+import glob
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files served to the browser
+ASSET_PATTERNS = [
+    'index.html', 'listing/*.html', 'script.js', 'styles.css', 'sw.js', 'precache-manifest.json',
+    'stories-data.json', 'stories/**/*.html', 'catalog/*.json', 'search-index/*.json', 'story-bodies/**/*.json'
+]
+
+# Rewritten by every catalog build, so compressed at BROTLI_FREQUENT_QUALITY
+FREQUENT_PATTERNS = [
+    'index.html', 'listing/*.html', 'stories-data.json', 'catalog/*.json', 'search-index/*.json',
+    'precache-manifest.json'
+]
+
+BROTLI_QUALITY = 11
+BROTLI_FREQUENT_QUALITY = 9
+
+# Below this size the compression framing outweighs the savings
+MIN_SIZE = 256
+
+
+def gzip_bytes(data, frequent=False):
+    """Compress with gzip at maximum level and a fixed header"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data, frequent=False):
+    """Compress with brotli tuned for text, at a lower quality for frequently rewritten files"""
+    quality = BROTLI_FREQUENT_QUALITY if frequent else BROTLI_QUALITY
+    return brotli.compress(data, quality=quality, mode=brotli.MODE_TEXT)
+
+
+def compressors():
+    """Return (suffix, compress function) for every available encoding"""
+    encodings = [('.gz', gzip_bytes)]
+    if brotli is not None:
+        encodings.append(('.br', brotli_bytes))
+    return encodings
+
+
+def find_assets(patterns=ASSET_PATTERNS):
+    """Return every asset path matching the patterns, sorted"""
+    assets = set()
+    for pattern in patterns:
+        assets.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(assets)
+
+
+def is_current(source_stat, variant_path):
+    """True if a variant exists and was written from this version of its source"""
+    try:
+        return os.stat(variant_path).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def write_variant(path, data, source_stat):
+    """Write a compressed variant atomically and stamp it with the source mtime"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    os.replace(tmp_path, path)
+
+
+def remove_orphans(sources, encodings):
+    """Delete variants whose source is not in sources (deleted or too small); return how many"""
+    sources = set(sources)
+    removed = 0
+    for suffix, _ in encodings:
+        for pattern in ASSET_PATTERNS:
+            for variant in glob.glob(pattern + suffix, recursive=True):
+                if variant[:-len(suffix)] not in sources:
+                    os.remove(variant)
+                    removed += 1
+    return removed
+
+
+def build_compressed_assets(force=False):
+    """Write missing or stale gzip/brotli variants and report the savings"""
+    print("🗜️  Building precompressed assets...")
+    if brotli is None:
+        print("⚠️  brotli is not installed, writing gzip variants only "
+              "(pip install -r requirements-optional.txt)")
+
+    encodings = compressors()
+    assets = find_assets()
+    frequent = set(find_assets(FREQUENT_PATTERNS))
+    compressed_sources = []
+    totals = {'original': 0, 'written': 0, 'skipped': 0}
+    for suffix, _ in encodings:
+        totals[suffix] = 0
+
+    for path in assets:
+        source_stat = os.stat(path)
+        if source_stat.st_size < MIN_SIZE:
+            continue
+
+        compressed_sources.append(path)
+        data = None
+        totals['original'] += source_stat.st_size
+        for suffix, compress in encodings:
+            variant_path = path + suffix
+            if not force and is_current(source_stat, variant_path):
+                totals[suffix] += os.path.getsize(variant_path)
+                totals['skipped'] += 1
+                continue
+
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            compressed = compress(data, path in frequent)
+            write_variant(variant_path, compressed, source_stat)
+            totals[suffix] += len(compressed)
+            totals['written'] += 1
+
+    removed = remove_orphans(compressed_sources, encodings)
+
+    print(f"📦 Assets: {len(assets)} ({totals['original'] / 1024:.0f} KB uncompressed)")
+    print(f"✍️  Variants written: {totals['written']}, already current: {totals['skipped']}, removed: {removed}")
+    for suffix, _ in encodings:
+        saved = totals['original'] - totals[suffix]
+        percent = saved / totals['original'] * 100 if totals['original'] else 0
+        print(f"   {suffix}: {totals[suffix] / 1024:.0f} KB (saves {saved / 1024:.0f} KB, {percent:.1f}%)")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write gzip and brotli variants of the site's static files")
+    parser.add_argument('--force', action='store_true',
+                        help="recompress every file even if its variants are current")
+    args = parser.parse_args()
+    build_compressed_assets(args.force)
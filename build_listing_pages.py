@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Build Static Listing Pages
+==========================
+
+Prerenders the story list so the first HTML response already shows
+stories, before script.js has fetched the catalog, and so the list
+works without JavaScript at all.
+
+Every view - all stories, each year and each site category - is split
+into pages of PAGE_SIZE cards in the site's default (newest first)
+order, rendered with the same card markup as createStoryCard() in
+script.js:
+
+    index.html                  all stories, page 1
+    listing/all-<n>.html        all stories, page n >= 2
+    listing/<view>.html         a year or category, page 1
+    listing/<view>-<n>.html     a year or category, page n >= 2
+
+index.template.html is the template, and the only copy of the page
+that is edited or tracked; index.html is generated like every other
+listing page. The build fills the template's listing:cards region
+(the story grid) and listing:pages region (page and view links inside
+<noscript>) and leaves everything else as written. Listing pages in
+listing/ are copies of it with <base href="../">, so every link, stylesheet and
+catalog fetch resolves from the site root. The grid carries the view
+(data-year, data-category, data-page) and script.js, once loaded,
+selects the same filters and replaces the cards with interactive ones
+starting at the same story.
+
+Every page also gets the site's UI strings from translations.json, the
+one copy script.js and this build share, as an inline block
+(<script type="application/json" id="translations">, the listing:strings
+region); cards and links here use the default language (DEFAULT_LANGUAGE).
+
+index.html also gets an inline data block (<script type="application/json"
+id="initialData">, the listing:data region) with the catalog manifest,
+the story count of every year, category and length, and the catalog
+entries of its first page. script.js renders the first page and fills
+the filters from it without a single request, and loads the catalog
+shards in the background. Listing pages leave the block out, since the
+manifest changes with every catalog write and would otherwise rewrite
+every page.
+
+Generation is incremental: listing/pages.json records a key per page
+(template, UI strings, page links and the card fields of its entries), and only
+pages whose key changed are rendered and rewritten. Pages of views
+that no longer exist are removed.
+
+Usage:
+    python build_listing_pages.py
+"""
+
+import glob
+import hashlib
+import html
+import json
+import os
+import re
+from datetime import date
+from urllib.parse import quote
+from story_catalog import (CATALOG_DIR, CATALOG_FILE, entry_file, group_by_year, load_snapshot,
+                           write_if_changed)
+from story_facets import (LENGTH_BUCKETS, SITE_CATEGORIES, length_bucket, shard_entries,
+                          sort_orders)
+
+LISTING_DIR = 'listing'
+LISTING_TEMPLATE = 'index.template.html'
+LISTING_INDEX = 'index.html'
+LISTING_MANIFEST = os.path.join(LISTING_DIR, 'pages.json')
+
+# Bump when the page or card markup changes, so every page is rewritten
+LISTING_VERSION = 3
+
+# Format of the inline data block, kept in step with INLINE_DATA_VERSION in script.js
+INLINE_DATA_VERSION = 1
+
+# Cards per page, as storiesPerPage in script.js
+PAGE_SIZE = 12
+
+# UI strings shared with script.js; pages are rendered in its default language
+TRANSLATIONS_FILE = 'translations.json'
+DEFAULT_LANGUAGE = 'te'
+
+REGION_RE = r'(<!-- listing:{name} -->).*?(\n[ \t]*<!-- /listing:{name} -->)'
+GRID_RE = re.compile(r'<div class="stories-grid" id="storiesGrid"[^>]*>')
+TITLE_RE = re.compile(r'<title>.*?</title>')
+DISPLAY_FORMAT = "%B %d, %Y"
+
+
+def fill_region(page, name, content):
+    """Replace the body of a listing:<name> region of the template"""
+    pattern = re.compile(REGION_RE.format(name=name), re.S)
+    body = '\n' + content if content else ''
+    return pattern.sub(lambda match: match.group(1) + body + match.group(2), page, count=1)
+
+
+def empty_template(template):
+    """The template with its listing regions emptied, which is what a page depends on"""
+    for name in ('cards', 'pages', 'strings', 'data'):
+        template = fill_region(template, name, '')
+    return GRID_RE.sub('<div class="stories-grid" id="storiesGrid">', template, count=1)
+
+
+def page_path(slug, page):
+    """Site-relative path of page `page` (from 1) of a view"""
+    if slug == 'all' and page == 1:
+        return LISTING_INDEX
+    name = slug if page == 1 else f"{slug}-{page}"
+    return f"{LISTING_DIR}/{name}.html"
+
+
+def page_href(slug, page):
+    """Link to a page, scrolled to the story list"""
+    return html.escape(quote(page_path(slug, page)) + '#stories')
+
+
+def card_fields(year, entry):
+    """Everything a story card shows"""
+    display_date = entry.get('created_display')
+    if not display_date and entry.get('created_date'):
+        try:
+            display_date = date.fromisoformat(entry['created_date']).strftime(DISPLAY_FORMAT)
+        except ValueError:
+            display_date = None
+    text_length = entry.get('text_length')
+    return {
+        'title': entry.get('title') or '',
+        'file': entry_file(entry, year),
+        'date': display_date or str(year),
+        # Math.round(text_length / 5), rounding halves up
+        'words': (text_length * 2 + 5) // 10 if isinstance(text_length, int) else 0,
+        'category': SITE_CATEGORIES[entry.get('site_category', 0)],
+        'length': LENGTH_BUCKETS[length_bucket(entry)]
+    }
+
+
+def load_strings(translations_file=TRANSLATIONS_FILE):
+    """The shared UI strings"""
+    with open(translations_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_card(card, strings):
+    """One story card, the markup of createStoryCard() with links to the story file"""
+    names = strings['categories'][DEFAULT_LANGUAGE]
+    ui = strings['ui'][DEFAULT_LANGUAGE]
+    title = html.escape(card['title'])
+    href = html.escape(quote(card['file']))
+    return f"""<div class="story-card">
+    <div class="story-card-header">
+        <h3 class="story-card-title"><a href="{href}">{title}</a></h3>
+        <div class="story-card-meta">
+            <span><i class="fas fa-calendar"></i> {html.escape(card['date'])}</span>
+            <span><i class="fas fa-file-word"></i> {card['words']} {html.escape(ui['words'])}</span>
+        </div>
+    </div>
+    <div class="story-card-content">
+        <p class="story-card-excerpt">{title}</p>
+        <div class="story-card-footer">
+            <div class="story-categories">
+                <span class="category-tag {card['category']}">{html.escape(names[card['category']])}</span>
+                <span class="category-tag {card['length']}">{html.escape(names[card['length']])}</span>
+            </div>
+            <a class="read-more" href="{href}">
+                {html.escape(ui['readMore'])} <i class="fas fa-arrow-right"></i>
+            </a>
+        </div>
+    </div>
+</div>"""
+
+
+def render_links(views, slug, page, pages, strings):
+    """Page links of the current view and links to every view, for readers without JavaScript"""
+    page_links = []
+    for number in range(1, pages + 1):
+        if number == page:
+            page_links.append(f'<span class="current" aria-current="page">{number}</span>')
+        else:
+            page_links.append(f'<a href="{page_href(slug, number)}">{number}</a>')
+    view_links = []
+    for view in views:
+        label = html.escape(view['label'])
+        if view['slug'] == slug:
+            view_links.append(f'<span class="current" aria-current="page">{label}</span>')
+        else:
+            view_links.append(f'<a href="{page_href(view["slug"], 1)}">{label}</a>')
+    page_text = html.escape(strings['ui'][DEFAULT_LANGUAGE]['page'])
+    page_nav = f'<nav class="listing-pages" aria-label="{page_text}">' + ' '.join(page_links) + '</nav>'
+    view_nav = '<nav class="listing-views">' + ' '.join(view_links) + '</nav>'
+    return f"<noscript>\n    {page_nav}\n    {view_nav}\n</noscript>"
+
+
+def indent(text, spaces):
+    """Indent every line of text"""
+    return '\n'.join(' ' * spaces + line if line else line for line in text.split('\n'))
+
+
+def render_json(element_id, data):
+    """Inline JSON block; '<' is escaped so no string can end the script element"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+    return f'<script type="application/json" id="{element_id}">{payload}</script>'
+
+
+def render_page(template, strings, views, view, page, pages, cards, data=None):
+    """One listing page from the template, with the inline data block if data is given"""
+    result = fill_region(template, 'cards', indent('\n'.join(render_card(card, strings) for card in cards), 16))
+    result = fill_region(result, 'pages', indent(render_links(views, view['slug'], page, pages, strings), 12))
+    result = fill_region(result, 'strings', indent(render_json('translations', strings), 4))
+    result = fill_region(result, 'data', indent(render_json('initialData', data), 4) if data is not None else '')
+
+    attributes = ''.join(f' data-{name}="{html.escape(str(value))}"'
+                         for name, value in (('year', view.get('year')), ('category', view.get('category')),
+                                             ('page', page if page > 1 else None))
+                         if value)
+    result = GRID_RE.sub(lambda match: f'<div class="stories-grid" id="storiesGrid"{attributes}>', result, count=1)
+
+    if page_path(view['slug'], page) != LISTING_INDEX:
+        ui = strings['ui'][DEFAULT_LANGUAGE]
+        title = view['label'] if page == 1 else f"{view['label']} - {ui['page']} {page}"
+        title = html.escape(f"{title} - {ui['siteTitle']}")
+        result = TITLE_RE.sub(lambda match: f'<base href="../">\n    <title>{title}</title>',
+                              result, count=1)
+    return result
+
+
+def listing_views(entries, strings):
+    """Every view with its story numbers in newest-first order, and the card of each story"""
+    years = sorted({year for year, _ in entries}, reverse=True)
+    order = sort_orders(entries)['newest']
+    cards = [card_fields(year, entry) for year, entry in entries]
+
+    views = [{'slug': 'all', 'label': strings['ui'][DEFAULT_LANGUAGE]['allStories'], 'numbers': order}]
+    for year in years:
+        numbers = [number for number in order if entries[number][0] == year]
+        views.append({'slug': year, 'label': year, 'year': year, 'numbers': numbers})
+    for category in SITE_CATEGORIES:
+        numbers = [number for number in order if cards[number]['category'] == category]
+        if numbers:
+            views.append({'slug': category, 'label': strings['categoryFilters'][DEFAULT_LANGUAGE][category],
+                          'category': category, 'numbers': numbers})
+    return views, cards
+
+
+def inline_data(entries, views, numbers, catalog_dir=CATALOG_DIR):
+    """Inline data of index.html, or None before the catalog has been published"""
+    manifest_file = os.path.join(catalog_dir, 'manifest.json')
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    counts = {'year': {}, 'category': {}, 'length': {}}
+    for view in views:
+        if view.get('year'):
+            counts['year'][view['year']] = len(view['numbers'])
+        elif view.get('category'):
+            counts['category'][view['category']] = len(view['numbers'])
+    for _, entry in entries:
+        length = LENGTH_BUCKETS[length_bucket(entry)]
+        counts['length'][length] = counts['length'].get(length, 0) + 1
+
+    stories = [dict(entries[number][1], year=entries[number][0], number=number) for number in numbers]
+    return {'version': INLINE_DATA_VERSION, 'manifest': manifest, 'counts': counts, 'stories': stories}
+
+
+def load_listing_manifest(manifest_file=LISTING_MANIFEST):
+    """Page keys from the previous build"""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return manifest.get('pages', {}) if manifest.get('version') == LISTING_VERSION else {}
+
+
+def page_key(*parts):
+    """Stable hash of everything a page is rendered from"""
+    data = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+def build_listing_pages(catalog_file=CATALOG_FILE):
+    """Render the listing pages whose entries or template changed; return page counts"""
+    with open(LISTING_TEMPLATE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    strings = load_strings()
+    template_key = page_key(empty_template(template), strings)
+
+    entries = shard_entries(group_by_year(load_snapshot(catalog_file)))
+    views, cards = listing_views(entries, strings)
+    view_links = [[view['slug'], view['label']] for view in views]
+    previous = load_listing_manifest()
+    keys = {}
+    written = 0
+
+    for view in views:
+        pages = max(1, -(-len(view['numbers']) // PAGE_SIZE))
+        for page in range(1, pages + 1):
+            path = page_path(view['slug'], page)
+            numbers = view['numbers'][(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            page_cards = [cards[number] for number in numbers]
+            data = inline_data(entries, views, numbers) if path == LISTING_INDEX else None
+            keys[path] = page_key(LISTING_VERSION, template_key, view_links, view['slug'], page, pages,
+                                  page_cards, data)
+            if previous.get(path) == keys[path] and os.path.exists(path):
+                continue
+            payload = render_page(template, strings, views, view, page, pages, page_cards, data).encode('utf-8')
+            if write_if_changed(path, payload):
+                written += 1
+
+    removed = 0
+    for path in glob.glob(os.path.join(LISTING_DIR, '*.html')):
+        if path.replace(os.sep, '/') not in keys:
+            os.remove(path)
+            removed += 1
+
+    manifest = {'version': LISTING_VERSION, 'pages': keys}
+    write_if_changed(LISTING_MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    return {'pages': len(keys), 'written': written, 'removed': removed}
+
+
+if __name__ == "__main__":
+    print("📄 Building static listing pages...")
+    totals = build_listing_pages()
+    print(f"✅ Pages: {totals['pages']} ({totals['written']} rewritten, {totals['removed']} removed)")
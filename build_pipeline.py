@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Story Build Pipeline
+====================
+
+One entry point for the whole catalog build. The steps that used to be
+run by hand (comprehensive_story_analysis.py, update_classification.py,
+rebuild_from_csv.py, ...) are modelled as stages with declared inputs
+and outputs:
+
+    scan -> classify -> review -> dedupe -> load -> merge -> related
+         -> catalog -> listing -> bodies -> search -> precache -> compress
+
+    scan      list every story HTML file
+    classify  classify each file as Story / Document (incremental, and
+              writes detailed_story_analysis_latest.csv)
+    review    apply manual decisions from review-overrides.json and any
+              reviewed "Mavaya stories" CSV
+    dedupe    cluster near-duplicate stories (MinHash/LSH) and write
+              duplicate-clusters.json
+    load      read the curated catalog (stories-data.json and its journal)
+              without the fields the pipeline derives itself
+    merge     turn the reviewed Story rows into catalog entries, keeping
+              the dates, year and extra fields of stories already listed
+              and leaving out near-duplicates; a story not yet listed is
+              only added once a review decision marks it as a Story
+    related   add the top-k TF-IDF neighbours of each story as "related"
+    catalog   write stories-data.json and the year-sharded catalog/
+    listing   prerender the story list from index.template.html into
+              index.html and listing/ pages
+    bodies    write the reader payloads in story-bodies/
+    search    rebuild the full-text search index in search-index/
+    precache  hash every served file into precache-manifest.json for the
+              service worker (sw.js), after every stage that writes one
+    compress  write gzip/brotli variants of the served files
+
+Every stage stores its result in .build-cache/. A stage is skipped when
+the fingerprint of its inputs (upstream results and the size/mtime of
+input files) matches the previous run and its outputs still exist, so
+changing one override only re-runs review, merge and catalog. When a
+stage re-runs but produces the same result, the stages after it are
+skipped too.
+
+--watch keeps running and rebuilds whenever files under stories/
+change (inotify, or polling with --poll), batching changes until the
+tree has been quiet for --debounce seconds. Only the touched files are
+re-extracted and re-classified; the catalog, related stories, reader
+payloads and search index are updated in place, each file replaced
+atomically, and only listing pages showing a touched story are
+rewritten. The precache manifest is refreshed after all of them so a
+registered service worker drops the changed files, and the gzip/brotli
+variants of the changed files are rewritten last, so every derived
+file is current once a rebuild finishes. --until is not accepted with
+--watch for that reason.
+
+Usage:
+    python build_pipeline.py [--jobs N] [--force] [--until STAGE]
+    python build_pipeline.py --watch [--debounce 0.2] [--poll]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from build_compressed_assets import ASSET_PATTERNS, build_compressed_assets
+from build_listing_pages import (LISTING_MANIFEST, LISTING_TEMPLATE, LISTING_VERSION, TRANSLATIONS_FILE,
+                                 build_listing_pages)
+from build_precache_manifest import PRECACHE_MANIFEST, PRECACHE_VERSION, build_precache_manifest
+from build_search_index import INDEX_DIR, INDEX_VERSION, build_search_index
+from build_story_bodies import BODIES_DIR, BODIES_VERSION, build_story_bodies
+from comprehensive_story_analysis import (CLASSIFIER_VERSION, analyze_all_stories,
+                                          find_story_files, print_summary,
+                                          save_detailed_analysis)
+from dedupe_stories import (DEDUPE_REPORT, DEDUPE_VERSION, dedupe_files, duplicate_files,
+                            minhash_signature, story_text)
+from related_stories import RELATED_VERSION, add_related_stories, term_counts
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from story_catalog import CATALOG_FILE, JOURNAL_FILE, entry_file, load_catalog, write_catalog
+from story_categories import with_site_categories
+from story_csv import (REVIEW_OVERRIDES_FILE, apply_review_override, clean_title,
+                       load_review_overrides, load_reviewed_csv, review_override)
+from story_manifest import (ANALYSIS_CSV, finish_scan, load_manifest,
+                            print_delta_report, save_manifest)
+from story_watcher import watch_changes
+
+BUILD_CACHE_DIR = '.build-cache'
+STATE_FILE = os.path.join(BUILD_CACHE_DIR, 'state.json')
+
+# Bump to invalidate every cached stage result
+PIPELINE_VERSION = 1
+
+REVIEWED_CSV_PATTERN = 'Mavaya stories*.csv'
+STORY_FILES_PATTERN = 'stories/*/*.html'
+STORIES_DIR = 'stories'
+
+# Catalog fields the pipeline computes itself, left out of the load stage's result
+DERIVED_FIELDS = ('classification', 'confidence', 'text_length', 'related', 'site_category')
+
+
+def data_hash(data):
+    """Stable hash of a JSON-serialisable value"""
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(pattern):
+    """Size and mtime of every file matching a path or glob pattern"""
+    fingerprint = []
+    for path in sorted(glob.glob(pattern)):
+        stat = os.stat(path)
+        fingerprint.append([path, stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+def load_state():
+    """Load the recorded key and result hash of every stage"""
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable build state {STATE_FILE}: {e}")
+    return {}
+
+
+def save_json_atomic(path, data):
+    """Write JSON to path through a temporary file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def artifact_path(name):
+    """Cache file holding a stage's result"""
+    return os.path.join(BUILD_CACHE_DIR, f"{name}.json")
+
+
+def load_artifact(name):
+    """Return a stage's cached result, or None if it is missing"""
+    path = artifact_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def apply_review_overrides(results, overrides):
+    """Return analysis rows with manual decisions applied and marked as reviewed"""
+    reviewed = []
+    for result in results:
+        override = review_override(result, overrides)
+        reviewed.append(dict(apply_review_override(result, override), reviewed=True) if override else result)
+    return reviewed
+
+
+def run_scan(inputs, options):
+    """Stage: list every story file"""
+    return [[year, filename] for year, filename in find_story_files()]
+
+
+def run_classify(inputs, options):
+    """Stage: classify every scanned file, re-using the manifest and parse cache"""
+    cache = load_parse_cache()
+    manifest = load_manifest(CLASSIFIER_VERSION)
+    story_files = [tuple(item) for item in inputs['scan']]
+
+    results, _ = analyze_all_stories(cache, manifest, options.jobs, story_files)
+    delta = finish_scan(manifest)
+    save_parse_cache(cache)
+    save_manifest(manifest)
+
+    save_detailed_analysis(results, ANALYSIS_CSV)
+    print_summary(results)
+    print_delta_report(delta)
+    return results
+
+
+def run_review(inputs, options):
+    """Stage: apply review-overrides.json and reviewed CSV decisions"""
+    overrides = {}
+    for csv_file in sorted(glob.glob(REVIEWED_CSV_PATTERN)):
+        overrides.update(load_reviewed_csv(csv_file))
+    overrides.update(load_review_overrides())
+
+    reviewed = apply_review_overrides(inputs['classify'], overrides)
+    changed = sum(1 for row in reviewed if row.get('reviewed'))
+    print(f"   ✍️  Review overrides applied: {changed}")
+    return reviewed
+
+
+def run_dedupe(inputs, options):
+    """Stage: cluster near-duplicate stories"""
+    story_paths = [row['filepath'] for row in inputs['review']
+                   if str(row['classification']).lower() == 'story']
+    return dedupe_files(story_paths, jobs=options.jobs)
+
+
+def run_load(inputs, options):
+    """Stage: read the curated catalog merge builds on
+
+    The fields the pipeline derives (classification figures, related
+    stories, site category) are left out, so the catalog stage writing
+    them back does not change this result and merge stays skipped.
+    """
+    return {year: [{key: value for key, value in entry.items() if key not in DERIVED_FIELDS}
+                   for entry in entries]
+            for year, entries in load_catalog().items()}
+
+
+def file_date(path):
+    """Modification date of a story file as YYYY-MM-DD"""
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+
+
+def run_merge(inputs, options):
+    """Stage: build catalog entries for reviewed stories
+
+    Stories already in stories-data.json keep their year group, position,
+    dates and any extra fields. A story that is not listed yet is only
+    added when a review decision (review-overrides.json or a reviewed
+    CSV) marks it as a Story, under its folder year and dated by its
+    file; classifier-only stories are counted as awaiting review.
+    Entries whose file is no longer a Story, or is a near-duplicate of
+    another story, are dropped.
+    """
+    suppressed = duplicate_files(inputs['dedupe'])
+    stories = {row['filepath']: row for row in inputs['review']
+               if str(row['classification']).lower() == 'story' and row['filepath'] not in suppressed}
+
+    merged = {}
+    listed = set()
+    for year, entries in inputs['load'].items():
+        for entry in entries:
+            path = entry_file(entry, year)
+            row = stories.get(path)
+            if row is None or path in listed:
+                continue
+            entry = dict(entry)
+            entry.update({
+                'classification': row['classification'],
+                'confidence': row['confidence'],
+                'text_length': row['text_length']
+            })
+            merged.setdefault(year, []).append(entry)
+            listed.add(path)
+
+    new_entries = {}
+    awaiting = 0
+    for path, row in stories.items():
+        if path in listed:
+            continue
+        if not row.get('reviewed'):
+            awaiting += 1
+            continue
+        new_entries.setdefault(str(row['year']), []).append({
+            "title": clean_title(row['title']),
+            "file": path,
+            "date": file_date(path),
+            "category": "story",
+            "classification": row['classification'],
+            "confidence": row['confidence'],
+            "text_length": row['text_length']
+        })
+    for year in sorted(new_entries):
+        merged.setdefault(year, []).extend(sorted(new_entries[year], key=lambda x: x['title']))
+
+    total = sum(len(entries) for entries in merged.values())
+    print(f"   📚 Stories: {total} ({total - len(listed)} new, {len(suppressed)} duplicates left out, "
+          f"{awaiting} awaiting review)")
+    return merged
+
+
+def run_related(inputs, options):
+    """Stage: precompute the related stories of every catalog entry"""
+    return add_related_stories(inputs['merge'], jobs=options.jobs)
+
+
+def run_catalog(inputs, options):
+    """Stage: decide each entry's site category, then write stories-data.json and the year-sharded catalog"""
+    manifest = write_catalog(with_site_categories(inputs['related'], options.jobs))
+    print(f"   🗂️  Catalog shards: {len(manifest['years'])} years, {manifest['total']} stories")
+    return manifest
+
+
+def run_listing(inputs, options):
+    """Stage: prerender the story list; only pages whose entries changed are rewritten"""
+    totals = build_listing_pages()
+    print(f"   📄 Listing pages: {totals['pages']} ({totals['written']} rewritten, {totals['removed']} removed)")
+    return {'pages': totals['pages']}
+
+
+def run_bodies(inputs, options):
+    """Stage: write the reader payloads of every catalog story; only changed payloads are rewritten"""
+    totals = build_story_bodies(options.jobs)
+    return {key: value for key, value in totals.items() if key not in ('written', 'removed')}
+
+
+def run_search(inputs, options):
+    """Stage: rebuild the full-text search index; only changed shards are rewritten"""
+    manifest = build_search_index(options.jobs)
+    return {'stories': len(manifest['docs']), 'shards': len(manifest['shards'])}
+
+
+def run_precache(inputs, options):
+    """Stage: hash the served files for the service worker's cache"""
+    totals = build_precache_manifest()
+    print(f"   📦 Precache manifest: {totals['precache']} precached, {totals['runtime']} cached on first read")
+    return {key: value for key, value in totals.items() if key != 'written'}
+
+
+def run_compress(inputs, options):
+    """Stage: precompress the served files; only stale variants are rewritten"""
+    totals = build_compressed_assets()
+    return {key: value for key, value in totals.items() if key not in ('written', 'skipped')}
+
+
+# Inputs are earlier stage names or file paths/globs; outputs are files
+# the stage writes and must still exist for its cached result to be used.
+STAGES = [
+    {'name': 'scan', 'version': 1, 'inputs': ['stories/*'], 'outputs': [],
+     'run': run_scan},
+    {'name': 'classify', 'version': CLASSIFIER_VERSION, 'inputs': ['scan', STORY_FILES_PATTERN],
+     'outputs': [ANALYSIS_CSV], 'run': run_classify},
+    {'name': 'review', 'version': 1, 'inputs': ['classify', REVIEW_OVERRIDES_FILE, REVIEWED_CSV_PATTERN],
+     'outputs': [], 'run': run_review},
+    {'name': 'dedupe', 'version': DEDUPE_VERSION, 'inputs': ['review', STORY_FILES_PATTERN],
+     'outputs': [DEDUPE_REPORT], 'run': run_dedupe},
+    {'name': 'load', 'version': 1, 'inputs': [CATALOG_FILE, JOURNAL_FILE],
+     'outputs': [], 'run': run_load},
+    {'name': 'merge', 'version': 4, 'inputs': ['review', 'dedupe', 'load'],
+     'outputs': [], 'run': run_merge},
+    {'name': 'related', 'version': RELATED_VERSION, 'inputs': ['merge', STORY_FILES_PATTERN],
+     'outputs': [], 'run': run_related},
+    {'name': 'catalog', 'version': 3, 'inputs': ['related'],
+     'outputs': [CATALOG_FILE, 'catalog/manifest.json'], 'run': run_catalog},
+    {'name': 'listing', 'version': LISTING_VERSION, 'inputs': ['catalog', LISTING_TEMPLATE, TRANSLATIONS_FILE],
+     'outputs': [LISTING_MANIFEST], 'run': run_listing},
+    {'name': 'bodies', 'version': BODIES_VERSION, 'inputs': ['catalog', STORY_FILES_PATTERN],
+     'outputs': [BODIES_DIR], 'run': run_bodies},
+    {'name': 'search', 'version': INDEX_VERSION, 'inputs': ['catalog', STORY_FILES_PATTERN],
+     'outputs': [os.path.join(INDEX_DIR, 'index.json')], 'run': run_search},
+    # Hashes every file the stages above write, so it runs after all of them
+    {'name': 'precache', 'version': PRECACHE_VERSION,
+     'inputs': ['listing', 'bodies', 'search'] + [pattern for pattern in ASSET_PATTERNS
+                                                  if pattern != PRECACHE_MANIFEST],
+     'outputs': [PRECACHE_MANIFEST], 'run': run_precache},
+    {'name': 'compress', 'version': 1, 'inputs': ['precache'] + ASSET_PATTERNS, 'outputs': [],
+     'run': run_compress},
+]
+
+
+def run_pipeline(options):
+    """Run every stage in order, skipping those whose inputs are unchanged"""
+    print("🏗️  Running story build pipeline...")
+    started = time.perf_counter()
+    state = load_state()
+    hashes = {}
+    results = {}
+    stage_names = [stage['name'] for stage in STAGES]
+    last = stage_names.index(options.until) if options.until else len(STAGES) - 1
+
+    for stage in STAGES[:last + 1]:
+        name = stage['name']
+        fingerprint = [PIPELINE_VERSION, stage['version']]
+        for item in stage['inputs']:
+            fingerprint.append(hashes[item] if item in stage_names else file_fingerprint(item))
+        key = data_hash(fingerprint)
+
+        previous = state.get(name, {})
+        outputs_present = all(os.path.exists(path) for path in stage['outputs'])
+        if not options.force and previous.get('key') == key and outputs_present:
+            if os.path.exists(artifact_path(name)):
+                hashes[name] = previous['hash']
+                print(f"⏭️  {name}: up to date")
+                continue
+
+        stage_started = time.perf_counter()
+        print(f"▶️  {name}: running")
+        inputs = {item: results[item] if item in results else load_artifact(item)
+                  for item in stage['inputs'] if item in stage_names}
+        result = stage['run'](inputs, options)
+        results[name] = result
+        hashes[name] = data_hash(result)
+
+        save_json_atomic(artifact_path(name), result)
+        state[name] = {'key': key, 'hash': hashes[name]}
+        save_json_atomic(STATE_FILE, state)
+        print(f"   ✅ {name} done in {time.perf_counter() - stage_started:.2f}s")
+
+    print(f"🎉 Pipeline finished in {time.perf_counter() - started:.2f}s")
+
+
+def warm_memos(options):
+    """Sign and count the terms of every story once, so the first watch rebuild is as fast as later ones"""
+    story_files = sorted(glob.glob(STORY_FILES_PATTERN))
+    cache = load_parse_cache()
+    for content, _ in get_story_contents(story_files, cache, options.jobs):
+        if content is not None:
+            text = story_text(content)
+            minhash_signature(text)
+            term_counts(text)
+    save_parse_cache(cache)
+
+
+def watch_pipeline(options):
+    """Rebuild after every batch of story file changes until interrupted"""
+    run_pipeline(options)
+    warm_memos(options)
+    try:
+        for changed in watch_changes(STORIES_DIR, options.debounce, options.poll):
+            started = time.perf_counter()
+            print(f"\n✏️  Changed: {', '.join(sorted(changed))}")
+            try:
+                run_pipeline(options)
+            except Exception as e:
+                print(f"❌ Rebuild failed, waiting for the next change: {e}")
+                continue
+            print(f"⚡ Rebuilt in {time.perf_counter() - started:.2f}s")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the story catalog through cached stages")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    parser.add_argument('--force', action='store_true',
+                        help="re-run every stage even if its inputs are unchanged")
+    parser.add_argument('--until', choices=[stage['name'] for stage in STAGES],
+                        help="stop after this stage (not with --watch, which always builds everything)")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and rebuild when files under stories/ change")
+    parser.add_argument('--debounce', type=float, default=0.2,
+                        help="seconds without changes before a watch rebuild starts")
+    parser.add_argument('--poll', action='store_true',
+                        help="poll for changes instead of using inotify")
+    args = parser.parse_args()
+    if args.watch:
+        if args.until:
+            parser.error("--until cannot be combined with --watch")
+        watch_pipeline(args)
+    else:
+        run_pipeline(args)
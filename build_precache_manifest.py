@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Build Precache Manifest
+=======================
+
+Writes precache-manifest.json, the list of every file the site serves
+with a hash of its content, for the service worker in sw.js:
+
+    {"version": 1,
+     "precache": {"index.html": "<hash>", "script.js": "<hash>", ...},
+     "runtime": {"stories/2024/<name>.html": "<hash>", ...}}
+
+"precache" entries (the page, script, stylesheet and catalog) are
+fetched when the service worker installs, so a returning reader gets
+the list straight from the cache and can browse offline. "runtime"
+entries (story pages and reader payloads, listing pages, the search
+index) are cached the first time they are read. Both are then served
+cache-first and cached per hash: when the manifest changes the service
+worker precaches the new build beside the old one, switches to it on
+the next page load and then drops the files whose hash changed, so a
+catalog update costs a download of the changed shards and nothing else
+and no page mixes two builds.
+
+Hashes are the first 16 hex digits of the SHA-256 of the file, as in
+the catalog manifest. The file is only rewritten when its content
+changes.
+
+Usage:
+    python build_precache_manifest.py
+"""
+
+import glob
+import hashlib
+import json
+import os
+from build_compressed_assets import find_assets
+from story_catalog import CATALOG_DIR, write_if_changed
+
+PRECACHE_MANIFEST = 'precache-manifest.json'
+SERVICE_WORKER = 'sw.js'
+
+# Format of the manifest, kept in step with MANIFEST_VERSION in sw.js
+PRECACHE_VERSION = 1
+
+# Fetched when the service worker installs; every other asset on first use
+PRECACHE_PATTERNS = ['index.html', 'script.js', 'styles.css', f'{CATALOG_DIR}/*.json']
+
+
+def file_hash(path):
+    """Return the content hash of a file"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def build_precache_manifest():
+    """Hash every served file into precache-manifest.json"""
+    precache = set()
+    for pattern in PRECACHE_PATTERNS:
+        precache.update(glob.glob(pattern))
+
+    manifest = {'version': PRECACHE_VERSION, 'precache': {}, 'runtime': {}}
+    for path in find_assets():
+        # The worker and its manifest are always fetched from the network
+        if path in (PRECACHE_MANIFEST, SERVICE_WORKER):
+            continue
+        group = 'precache' if path in precache else 'runtime'
+        manifest[group][path.replace(os.sep, '/')] = file_hash(path)
+
+    payload = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    written = write_if_changed(PRECACHE_MANIFEST, payload.encode('utf-8'))
+    return {
+        'precache': len(manifest['precache']),
+        'runtime': len(manifest['runtime']),
+        'written': int(written)
+    }
+
+
+if __name__ == "__main__":
+    print("📦 Building precache manifest...")
+    totals = build_precache_manifest()
+    state = 'written' if totals['written'] else 'unchanged'
+    print(f"✅ {PRECACHE_MANIFEST} {state}: {totals['precache']} precached, {totals['runtime']} cached on first read")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Build Full-Text Search Index
+============================
+
+Builds an inverted index over the cleaned text of every story in
+stories-data.json so the site can search inside story bodies without
+downloading the stories/ tree. Terms are the cached token streams from
+the parse cache (telugu_tokenizer.py); script.js tokenizes queries with
+the same rules.
+
+Output (search-index/):
+    index.json      - version, the list of story files (doc ids are
+                      positions in this list) and the shard for each
+                      term prefix
+    <prefix>.json   - {term: [doc delta, term frequency, ...]} for every
+                      term starting with that prefix
+
+Terms are sharded by their first character; shards that grow past
+MAX_SHARD_TERMS are split again by their first two characters. The
+browser fetches only the shards whose prefix matches the query.
+Shards are only rewritten when their content changes, and shards for
+prefixes that no longer exist are removed.
+
+Usage:
+    python build_search_index.py [--jobs N]
+"""
+
+import argparse
+import json
+import os
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from story_catalog import entry_file, iter_catalog_entries, load_catalog, write_if_changed
+
+INDEX_DIR = 'search-index'
+INDEX_VERSION = 2
+MAX_SHARD_TERMS = 2000
+
+
+def shard_file_name(prefix):
+    """File name for a shard, from the code points of its prefix"""
+    return '-'.join(f"{ord(char):04x}" for char in prefix) + '.json'
+
+
+def build_postings(token_streams):
+    """Return {term: [(doc id, term frequency), ...]} over a list of token streams"""
+    postings = {}
+    for doc_id, tokens in enumerate(token_streams):
+        counts = {}
+        for term in tokens.split():
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            postings.setdefault(term, []).append((doc_id, count))
+    return postings
+
+
+def shard_terms(terms, length=1):
+    """Group terms by prefix, splitting oversized groups on a longer prefix"""
+    groups = {}
+    for term in terms:
+        groups.setdefault(term[:length], []).append(term)
+
+    shards = {}
+    for prefix, group in groups.items():
+        if len(group) > MAX_SHARD_TERMS and length < 2 and any(len(term) > length for term in group):
+            shards.update(shard_terms(group, length + 1))
+        else:
+            shards[prefix] = group
+    return shards
+
+
+def encode_postings(entries):
+    """Flatten postings into [doc delta, tf, doc delta, tf, ...]"""
+    encoded = []
+    previous = 0
+    for doc_id, count in entries:
+        encoded.extend((doc_id - previous, count))
+        previous = doc_id
+    return encoded
+
+
+def build_search_index(jobs=1, index_dir=INDEX_DIR):
+    """Build the sharded inverted index for every story in the catalog"""
+    print("🔎 Building full-text search index...")
+
+    files = [entry_file(entry, year) for year, entry in iter_catalog_entries(load_catalog())]
+    files = [path for path in files if path and os.path.exists(path)]
+
+    cache = load_parse_cache()
+    token_streams = []
+    for path, (content, error) in zip(files, get_story_contents(files, cache, jobs)):
+        if error is not None:
+            print(f"   Error reading {path}: {error}")
+        token_streams.append(content['tokens'] if content else '')
+    save_parse_cache(cache)
+
+    postings = build_postings(token_streams)
+    shards = shard_terms(sorted(postings))
+
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = {'version': INDEX_VERSION, 'docs': files, 'shards': {}}
+    total_bytes = 0
+    for prefix in sorted(shards):
+        shard = {term: encode_postings(postings[term]) for term in shards[prefix]}
+        file_name = shard_file_name(prefix)
+        data = json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_if_changed(os.path.join(index_dir, file_name), data)
+        total_bytes += len(data)
+        manifest['shards'][prefix] = file_name
+
+    # Drop shards for prefixes that no longer have terms; their compressed
+    # variants are removed by build_compressed_assets.py
+    shard_files = set(manifest['shards'].values())
+    for name in os.listdir(index_dir):
+        if name.endswith('.json') and name != 'index.json' and name not in shard_files:
+            os.remove(os.path.join(index_dir, name))
+
+    data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    write_if_changed(os.path.join(index_dir, 'index.json'), data)
+
+    print(f"📚 Indexed stories: {len(files)}")
+    print(f"🔤 Distinct terms: {len(postings)}")
+    print(f"🗂️  Shards: {len(shards)} ({total_bytes / 1024:.0f} KB total)")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the full-text search index for the site")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    args = parser.parse_args()
+    build_search_index(args.jobs)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Build Pre-Extracted Story Bodies
+================================
+
+Writes the cleaned paragraph list of every story in stories-data.json to
+a small JSON payload so the story modal no longer has to download and
+parse the full story HTML in the browser.
+
+Output (story-bodies/<year>/):
+    <name>.json     - {"version": 1, "chunks": N, "paragraphs": [...]}
+    <name>.<i>.json - {"paragraphs": [...]} for chunks 1..N-1
+
+Stories longer than CHUNK_CHARS are split on paragraph boundaries so
+the modal can render the first chunk immediately and stream the rest.
+Files are only rewritten when their content changes, and payloads for
+stories that left the catalog are removed.
+
+Usage:
+    python build_story_bodies.py [--jobs N]
+"""
+
+import argparse
+import json
+import os
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from story_catalog import entry_file, iter_catalog_entries, load_catalog, write_if_changed
+
+BODIES_DIR = 'story-bodies'
+BODIES_VERSION = 1
+CHUNK_CHARS = 6000
+
+
+def body_paths(story_file, chunks, bodies_dir=BODIES_DIR):
+    """Payload paths for a story file, one per chunk"""
+    relative = os.path.relpath(story_file, 'stories')
+    base = os.path.join(bodies_dir, os.path.splitext(relative)[0])
+    return [f"{base}.json" if index == 0 else f"{base}.{index}.json" for index in range(chunks)]
+
+
+def chunk_paragraphs(paragraphs, chunk_chars=CHUNK_CHARS):
+    """Split paragraphs into chunks of roughly chunk_chars characters"""
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        if current and size + len(paragraph) > chunk_chars:
+            chunks.append(current)
+            current = []
+            size = 0
+        current.append(paragraph)
+        size += len(paragraph)
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+def write_story_body(story_file, content, bodies_dir=BODIES_DIR):
+    """Write the chunk payloads of one story; return (payload paths, number rewritten)"""
+    chunks = chunk_paragraphs(content['paragraphs'])
+    paths = body_paths(story_file, len(chunks), bodies_dir)
+    written = 0
+    for index, (path, paragraphs) in enumerate(zip(paths, chunks)):
+        payload = {'paragraphs': paragraphs}
+        if index == 0:
+            payload = {'version': BODIES_VERSION, 'chunks': len(chunks), 'paragraphs': paragraphs}
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if write_if_changed(path, data):
+            written += 1
+    return paths, written
+
+
+def build_story_bodies(jobs=1, bodies_dir=BODIES_DIR):
+    """Write chunked paragraph payloads for every story in the catalog; return payload counts"""
+    print("📖 Building pre-extracted story bodies...")
+
+    files = [entry_file(entry, year) for year, entry in iter_catalog_entries(load_catalog())]
+    files = [path for path in files if path and os.path.exists(path)]
+
+    cache = load_parse_cache()
+    contents = get_story_contents(files, cache, jobs)
+    save_parse_cache(cache)
+
+    expected = set()
+    written = 0
+    chunked = 0
+    for story_file, (content, error) in zip(files, contents):
+        if error is not None:
+            print(f"   Error reading {story_file}: {error}")
+            continue
+
+        paths, story_written = write_story_body(story_file, content, bodies_dir)
+        expected.update(os.path.normpath(path) for path in paths)
+        written += story_written
+        if len(paths) > 1:
+            chunked += 1
+
+    # Remove payloads for stories (or chunks) that no longer exist; their
+    # compressed variants are removed by build_compressed_assets.py
+    removed = 0
+    for root, _, names in os.walk(bodies_dir):
+        for name in names:
+            path = os.path.normpath(os.path.join(root, name))
+            if name.endswith('.json') and path not in expected:
+                os.remove(path)
+                removed += 1
+
+    print(f"📚 Stories: {len(files)} ({chunked} split into chunks)")
+    print(f"✏️  Payloads written: {written}, unchanged: {len(expected) - written}, removed: {removed}")
+    return {'stories': len(files), 'payloads': len(expected), 'written': written, 'removed': removed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write pre-extracted story bodies for the modal")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    args = parser.parse_args()
+    build_story_bodies(args.jobs)
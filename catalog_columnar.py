@@ -0,0 +1,245 @@
+"""
+Columnar Catalog Format
+=======================
+
+A compact, versioned encoding of the story catalog. Instead of repeating
+every key in every entry, the catalog is stored as one array per field:
+
+    {
+      "format": "columnar",
+      "version": 1,
+      "count": 180,
+      "dicts": {"group": ["2024", ...], "category": ["story"], ...},
+      "columns": {
+        "group": [0, 0, 1, ...],        # catalog year, dictionary-encoded
+        "title": [...],
+        "file": ["gift.html", ...],     # name only when under stories/<year>/
+        "related": [["a.html", "stories/2021/b.html"], ...],
+        "category": [0, 0, ...],        # dictionary-encoded
+        "site_category": [2, 0, ...],   # story_facets.SITE_CATEGORIES index
+        "date": [19814, ...],           # days since 1970-01-01
+        "created": [0, ...],            # days after date (null = absent)
+        "modified": [0, ...],           # days after created
+        "flags": [3, ...],              # which derived fields are present
+        ...
+      },
+      "extras": {"17": {"excerpt": "..."}}
+    }
+
+created_date / modified_date / *_display strings are rebuilt from the
+integers; anything that cannot be derived (or any field not listed in
+COLUMNS) is kept per row in "extras", so decoding is always lossless.
+Columns that no entry uses are omitted.
+decode_record() rebuilds a single entry on demand; script.js has the
+matching reader for the site.
+"""
+
+from datetime import date, timedelta
+
+FORMAT_NAME = 'columnar'
+FORMAT_VERSION = 3
+
+EPOCH = date(1970, 1, 1)
+DISPLAY_FORMAT = "%B %d, %Y"
+
+# Known fields of every catalog shape and how each is encoded:
+#   raw       - value stored as is
+#   path      - stories/<year>/<name> stored as <name>
+#   dict      - index into dicts[field]
+#   dict_list - list of indexes into dicts[field]
+#   path_list - list of paths, each shortened like a path
+COLUMNS = [
+    ('title', 'raw'), ('file', 'path'), ('filename', 'path'), ('path', 'raw'), ('id', 'raw'),
+    ('category', 'dict'), ('classification', 'dict'), ('confidence', 'raw'),
+    ('text_length', 'raw'), ('textLength', 'raw'), ('wordCount', 'raw'), ('excerpt', 'raw'),
+    ('categories', 'dict_list'), ('tags', 'dict_list'), ('reasons', 'raw'),
+    ('site_category', 'raw'), ('related', 'path_list')
+]
+
+# Bits in the "flags" column
+FLAG_CREATED_DISPLAY = 1
+FLAG_MODIFIED_DISPLAY = 2
+FLAG_YEAR = 4
+
+MISSING = object()
+
+
+def to_days(value):
+    """Convert a YYYY-MM-DD string to days since 1970-01-01, or None if it
+    is missing or would not round-trip exactly"""
+    try:
+        parsed = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return (parsed - EPOCH).days if parsed.isoformat() == value else None
+
+
+def from_days(days):
+    """Convert days since 1970-01-01 back to a date"""
+    return EPOCH + timedelta(days=days)
+
+
+def format_display(days):
+    """Human-readable date string used by the *_display fields"""
+    return from_days(days).strftime(DISPLAY_FORMAT)
+
+
+def _short_path(path, group):
+    """<name> for stories/<group>/<name>, otherwise the path unchanged"""
+    name = path.rsplit('/', 1)[-1]
+    return name if path == f"stories/{group}/{name}" else path
+
+
+def _dict_index(dicts, name, value):
+    """Return the dictionary code for a value, adding it if needed"""
+    values = dicts.setdefault(name, [])
+    if value not in values:
+        values.append(value)
+    return values.index(value)
+
+
+def encode_catalog(catalog):
+    """Encode a dict of year -> entries into the columnar format"""
+    dicts = {}
+    names = ['group'] + [name for name, _ in COLUMNS] + ['date', 'created', 'modified', 'flags']
+    columns = {name: [] for name in names}
+    extras = {}
+    count = 0
+
+    for group in sorted(catalog, reverse=True):
+        for entry in catalog[group]:
+            row = dict(entry)
+            extra = {}
+            flags = 0
+
+            columns['group'].append(_dict_index(dicts, 'group', group))
+
+            for name, codec in COLUMNS:
+                value = row.pop(name, MISSING)
+                if value is MISSING:
+                    value = None
+                elif value is None:
+                    extra[name] = None
+                elif codec == 'path' and isinstance(value, str) and '/' not in value:
+                    # Bare names would be expanded on decode, keep them verbatim
+                    extra[name] = value
+                    value = None
+                elif codec == 'path' and isinstance(value, str):
+                    value = _short_path(value, group)
+                elif codec == 'dict':
+                    value = _dict_index(dicts, name, value)
+                elif codec == 'dict_list' and isinstance(value, list):
+                    value = [_dict_index(dicts, name, item) for item in value]
+                elif codec == 'dict_list':
+                    extra[name] = value
+                    value = None
+                elif (codec == 'path_list' and isinstance(value, list) and
+                      all(isinstance(item, str) and '/' in item for item in value)):
+                    value = [_short_path(item, group) for item in value]
+                elif codec == 'path_list':
+                    extra[name] = value
+                    value = None
+                columns[name].append(value)
+
+            # Dates are stored once as integers, the rest relative to them
+            day = to_days(row.get('date'))
+            created = to_days(row.get('created_date')) if day is not None else None
+            modified = to_days(row.get('modified_date')) if created is not None else None
+
+            columns['date'].append(day)
+            columns['created'].append(None if created is None else created - day)
+            columns['modified'].append(None if modified is None else modified - created)
+            for name, value in [('date', day), ('created_date', created), ('modified_date', modified)]:
+                if value is not None:
+                    del row[name]
+
+            # Display strings are dropped when they can be rebuilt exactly
+            if created is not None and row.get('created_display') == format_display(created):
+                flags |= FLAG_CREATED_DISPLAY
+                del row['created_display']
+            if modified is not None and row.get('modified_display') == format_display(modified):
+                flags |= FLAG_MODIFIED_DISPLAY
+                del row['modified_display']
+            if type(row.get('year')) is int and str(row['year']) == group:
+                flags |= FLAG_YEAR
+                del row['year']
+
+            columns['flags'].append(flags)
+            extra.update(row)
+            if extra:
+                extras[str(count)] = extra
+            count += 1
+
+    # Columns no entry uses are left out entirely
+    columns = {name: values for name, values in columns.items()
+               if any(value is not None for value in values)}
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'count': count,
+        'dicts': dicts,
+        'columns': columns,
+        'extras': extras
+    }
+
+
+def decode_record(data, index):
+    """Rebuild one catalog entry from the columnar format; returns (year, entry)"""
+    if data.get('format') != FORMAT_NAME or data.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported catalog format: {data.get('format')} v{data.get('version')}")
+
+    columns = data['columns']
+    dicts = data['dicts']
+    group = dicts['group'][columns['group'][index]]
+    extra = data['extras'].get(str(index), {})
+    entry = {}
+
+    def column(name):
+        return columns[name][index] if name in columns else None
+
+    for name, codec in COLUMNS:
+        value = column(name)
+        if value is None:
+            continue
+        if codec == 'dict':
+            value = dicts[name][value]
+        elif codec == 'dict_list':
+            value = [dicts[name][item] for item in value]
+        elif codec == 'path' and '/' not in value:
+            value = f"stories/{group}/{value}"
+        elif codec == 'path_list':
+            value = [item if '/' in item else f"stories/{group}/{item}" for item in value]
+        entry[name] = value
+
+    day = column('date')
+    created = column('created')
+    modified = column('modified')
+    flags = column('flags') or 0
+
+    if day is not None:
+        entry['date'] = from_days(day).isoformat()
+    if created is not None:
+        created += day
+        entry['created_date'] = from_days(created).isoformat()
+    if modified is not None:
+        modified += created
+        entry['modified_date'] = from_days(modified).isoformat()
+    if flags & FLAG_CREATED_DISPLAY:
+        entry['created_display'] = format_display(created)
+    if flags & FLAG_MODIFIED_DISPLAY:
+        entry['modified_display'] = format_display(modified)
+    if flags & FLAG_YEAR:
+        entry['year'] = int(group)
+
+    entry.update(extra)
+    return group, entry
+
+
+def decode_catalog(data):
+    """Rebuild the full dict of year -> entries from the columnar format"""
+    catalog = {}
+    for index in range(data['count']):
+        group, entry = decode_record(data, index)
+        catalog.setdefault(group, []).append(entry)
+    return catalog
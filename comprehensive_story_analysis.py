@@ -1,105 +1,126 @@
 import os
 import csv
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
+import argparse
+from story_cache import (EXTRACTOR_BACKEND, extract_story_content, get_story_content,
+                         get_story_contents, load_parse_cache, parse_story_html, save_parse_cache)
+from indicator_matcher import compile_indicators, find_indicators
+from telugu_tokenizer import compile_keywords, find_keywords, normalize, token_text
+from story_manifest import (ANALYSIS_CSV, finish_scan, load_manifest, lookup_file,
+                            print_delta_report, record_file, save_manifest)
+from story_trace import (finish_trace, print_trace_summary, save_chrome_trace, start_trace,
+                         trace_file_size, trace_step)
+
+# Bump whenever analyze_content_type changes so the manifest forces a full rescan
+CLASSIFIER_VERSION = 2
 
 def extract_text_content(html_content):
     """Extract clean text content from HTML"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.decompose()
-    text = soup.get_text()
-    # Clean up text
-    lines = (line.strip() for line in text.splitlines())
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = ' '.join(chunk for chunk in chunks if chunk)
-    return text
+    return parse_story_html(html_content)['text']
 
-def analyze_content_type(text, title, filename):
-    """Comprehensive analysis to determine if content is a story or document"""
-    
-    text_lower = text.lower()
-    title_lower = title.lower()
-    
-    # Strong indicators this is NOT a story (documents/forms/bills etc.)
-    document_indicators = [
-        # Bills and invoices
-        'invoice', 'bill', 'payment', 'amount', 'tax', 'gst', 'total', 'due date',
-        'account number', 'customer id', 'billing', 'charges', 'subscription',
-        'fibernet', 'broadband', 'internet', 'plan', 'rental',
-        
-        # Official documents
-        'application', 'form', 'registration', 'certificate', 'license',
-        'government', 'office', 'department', 'ministry', 'authority',
-        'proforma', 'annexure', 'schedule', 'rules', 'regulation',
-        
-        # Legal/Property documents
-        'agreement', 'contract', 'deed', 'lease', 'rent', 'property',
-        'house tax', 'municipal', 'survey number', 'plot',
-        
-        # Personal documents
-        'passport', 'aadhaar', 'pan card', 'voter id', 'driving license',
-        'bank statement', 'cheque', 'transaction',
-        
-        # Logs and records
-        'log', 'record', 'entry', 'date:', 'time:', 'status:',
-        'whatsapp chat', 'conversation', 'message',
-        
-        # Greetings/Announcements
-        'greeting', 'congratulations', 'birthday', 'anniversary',
-        'wishes', 'celebration', 'invitation',
-        
-        # Technical/Administrative
-        'config', 'setup', 'installation', 'manual', 'guide',
-        'specification', 'requirement', 'procedure'
-    ]
-    
-    # Strong indicators this IS a story
-    story_indicators = [
-        # Narrative elements
-        'కథ', 'కధ', 'అనుభవం', 'జరిగిన', 'జరిగింది', 'చెప్పాలని',
-        'గుర్తుకు వచ్చింది', 'జ్ఞాపకం', 'జరిగిన విషయం',
-        
-        # Story beginnings
-        'ఒకసారి', 'ఒకప్పుడు', 'అనగనగా', 'ఒక రోజు',
-        'ముందు రోజు', 'గత వారం', 'చిన్న వయసులో',
-        
-        # Dialogue indicators
-        'అన్నాడు', 'అంది', 'చెప్పాడు', 'చెప్పింది', 'అడిగాడు', 'అడిగింది',
-        
-        # Emotional/Reflective content
-        'అనిపించింది', 'భావించాను', 'అర్థమైంది', 'తెలిసింది',
-        'ఆలోచించాను', 'గుర్తుకు వచ్చింది'
-    ]
+# Strong indicators this is NOT a story (documents/forms/bills etc.)
+DOCUMENT_INDICATORS = [
+    # Bills and invoices
+    'invoice', 'bill', 'payment', 'amount', 'tax', 'gst', 'total', 'due date',
+    'account number', 'customer id', 'billing', 'charges', 'subscription',
+    'fibernet', 'broadband', 'internet', 'plan', 'rental',
+    
+    # Official documents
+    'application', 'form', 'registration', 'certificate', 'license',
+    'government', 'office', 'department', 'ministry', 'authority',
+    'proforma', 'annexure', 'schedule', 'rules', 'regulation',
+    
+    # Legal/Property documents
+    'agreement', 'contract', 'deed', 'lease', 'rent', 'property',
+    'house tax', 'municipal', 'survey number', 'plot',
+    
+    # Personal documents
+    'passport', 'aadhaar', 'pan card', 'voter id', 'driving license',
+    'bank statement', 'cheque', 'transaction',
+    
+    # Logs and records
+    'log', 'record', 'entry', 'date:', 'time:', 'status:',
+    'whatsapp chat', 'conversation', 'message',
+    
+    # Greetings/Announcements
+    'greeting', 'congratulations', 'birthday', 'anniversary',
+    'wishes', 'celebration', 'invitation',
+    
+    # Technical/Administrative
+    'config', 'setup', 'installation', 'manual', 'guide',
+    'specification', 'requirement', 'procedure'
+]
+
+# Strong indicators this IS a story
+STORY_INDICATORS = [
+    # Narrative elements
+    'కథ', 'కధ', 'అనుభవం', 'జరిగిన', 'జరిగింది', 'చెప్పాలని',
+    'గుర్తుకు వచ్చింది', 'జ్ఞాపకం', 'జరిగిన విషయం',
+    
+    # Story beginnings
+    'ఒకసారి', 'ఒకప్పుడు', 'అనగనగా', 'ఒక రోజు',
+    'ముందు రోజు', 'గత వారం', 'చిన్న వయసులో',
+    
+    # Dialogue indicators
+    'అన్నాడు', 'అంది', 'చెప్పాడు', 'చెప్పింది', 'అడిగాడు', 'అడిగింది',
+    
+    # Emotional/Reflective content
+    'అనిపించింది', 'భావించాను', 'అర్థమైంది', 'తెలిసింది',
+    'ఆలోచించాను', 'గుర్తుకు వచ్చింది'
+]
+
+# Filename patterns for documents
+DOC_FILENAME_PATTERNS = [
+    'application', 'form', 'proforma', 'bill', 'invoice', 'agreement',
+    'log', 'chat', 'greeting', 'fibernet', 'tax', 'eci', 'minutes'
+]
+
+# Each list is compiled once into a single-pass matcher; indicators in
+# story text only match on whole grapheme clusters (telugu_tokenizer.py)
+DOCUMENT_MATCHER = compile_keywords(DOCUMENT_INDICATORS)
+STORY_MATCHER = compile_keywords(STORY_INDICATORS)
+DOC_FILENAME_MATCHER = compile_indicators(DOC_FILENAME_PATTERNS)
+
+def analyze_content_type(text, title, filename, tokens=None):
+    """Comprehensive analysis to determine if content is a story or document
+    
+    tokens is the cached token stream of text, computed here if not given.
+    """
+    
+    # Check for document indicators (one pass over text and title); they
+    # include field labels such as 'date:', so punctuation is kept
+    found = find_keywords(DOCUMENT_MATCHER, normalize(text))
+    found.update(find_keywords(DOCUMENT_MATCHER, normalize(title)))
     
-    # Check for document indicators
     document_score = 0
     document_reasons = []
     
-    for indicator in document_indicators:
-        if indicator in text_lower or indicator in title_lower:
+    for indicator in DOCUMENT_INDICATORS:
+        if indicator in found:
             document_score += 1
             document_reasons.append(f"Contains '{indicator}'")
     
     # Check filename patterns for documents
-    doc_filename_patterns = [
-        'application', 'form', 'proforma', 'bill', 'invoice', 'agreement',
-        'log', 'chat', 'greeting', 'fibernet', 'tax', 'eci', 'minutes'
-    ]
+    found = find_indicators(DOC_FILENAME_MATCHER, filename.lower())
     
-    for pattern in doc_filename_patterns:
-        if pattern in filename.lower():
+    for pattern in DOC_FILENAME_PATTERNS:
+        if pattern in found:
             document_score += 2
             document_reasons.append(f"Filename contains '{pattern}'")
     
+    # Document evidence always wins, so the story scan can be skipped
+    if document_score >= 2:
+        confidence = min(90, 60 + document_score * 10)
+        return "Document", confidence, "; ".join(document_reasons[:3])  # Top 3 reasons
+    
     # Check for story indicators
+    found = find_keywords(STORY_MATCHER, token_text(text) if tokens is None else tokens)
     story_score = 0
     story_reasons = []
     
-    for indicator in story_indicators:
-        if indicator in text:
+    for indicator in STORY_INDICATORS:
+        if indicator in found:
             story_score += 1
             story_reasons.append(f"Contains story element '{indicator}'")
     
@@ -114,11 +135,7 @@ def analyze_content_type(text, title, filename):
         story_reasons.append("Has narrative structure")
     
     # Decision logic
-    if document_score >= 2:
-        classification = "Document"
-        confidence = min(90, 60 + document_score * 10)
-        reasons = document_reasons[:3]  # Top 3 reasons
-    elif story_score >= 2:
+    if story_score >= 2:
         classification = "Story"
         confidence = min(90, 60 + story_score * 10)
         reasons = story_reasons[:3]
@@ -134,75 +151,162 @@ def analyze_content_type(text, title, filename):
     
     return classification, confidence, "; ".join(reasons)
 
-def analyze_all_stories():
-    """Analyze all HTML files in the stories directory"""
+def classify_story(year, filename, content):
+    """Classify parsed story content and return its analysis row"""
     
-    results = []
-    total_files = 0
+    filepath = os.path.join(f'stories/{year}', filename)
+    title = content['title'] or filename.replace('.html', '')
+    text_content = content['text']
+    
+    # Analyze content
+    classification, confidence, reasons = analyze_content_type(text_content, title, filename,
+                                                               content.get('tokens'))
     
-    # Walk through all story directories
+    return {
+        'filename': filename,
+        'year': year,
+        'title': title,
+        'classification': classification,
+        'confidence': confidence,
+        'reasons': reasons,
+        'text_length': len(text_content),
+        'filepath': filepath
+    }
+
+def error_result(year, filename, error):
+    """Build the analysis row recorded for a file that could not be read"""
+    return {
+        'filename': filename,
+        'year': year,
+        'title': 'ERROR',
+        'classification': 'Error',
+        'confidence': 0,
+        'reasons': f'Error reading file: {error}',
+        'text_length': 0,
+        'filepath': os.path.join(f'stories/{year}', filename)
+    }
+
+def analyze_story_file(year, filename, cache=None):
+    """Classify a single story file and return its analysis row"""
+    
+    filepath = os.path.join(f'stories/{year}', filename)
+    try:
+        # Title and text come from the shared parse cache
+        return classify_story(year, filename, get_story_content(filepath, cache))
+    except Exception as e:
+        return error_result(year, filename, e)
+
+def read_file(filepath):
+    """Read a story file's raw bytes"""
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+def parse_html(data):
+    """Parse raw story HTML into a BeautifulSoup tree"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(data.decode('utf-8'), 'html.parser')
+
+def trace_story_file(year, filename, trace):
+    """Classify a single story file without the cache, timing every step"""
+    
+    filepath = os.path.join(f'stories/{year}', filename)
+    try:
+        data = trace_step(trace, 'read', filepath, read_file, filepath)
+        trace_file_size(trace, filepath, len(data))
+        if EXTRACTOR_BACKEND == 'bs4':
+            soup = trace_step(trace, 'parse', filepath, parse_html, data)
+            content = trace_step(trace, 'get_text', filepath, extract_story_content, soup)
+        else:
+            content = trace_step(trace, 'extract', filepath, parse_story_html, data.decode('utf-8'))
+        return trace_step(trace, 'classify', filepath, classify_story, year, filename, content)
+    except Exception as e:
+        return error_result(year, filename, e)
+
+def find_story_files():
+    """Return (year, filename) for every HTML file in the story directories"""
+    
+    story_files = []
     for year in ['2021', '2022', '2023', '2024']:
         year_path = f'stories/{year}'
         if not os.path.exists(year_path):
             continue
-            
-        print(f"Analyzing {year}...")
         
-        for filename in os.listdir(year_path):
-            if not filename.endswith('.html'):
+        for filename in sorted(os.listdir(year_path)):
+            if filename.endswith('.html'):
+                story_files.append((year, filename))
+    return story_files
+
+def analyze_all_stories(cache=None, manifest=None, jobs=1, story_files=None, trace=None):
+    """Analyze all HTML files in the stories directory
+    
+    With a manifest, files whose size/mtime/hash are unchanged reuse their
+    previous result and only added or changed files are re-classified.
+    With jobs > 1, HTML parsing is spread across a process pool; results
+    and output order are the same as a serial run. With a trace, files are
+    parsed one at a time, bypassing the cache, and every step is timed.
+    """
+    
+    results = []
+    pending = []
+    errors = []
+    
+    if story_files is None:
+        story_files = find_story_files()
+    total_files = len(story_files)
+    
+    for year, filename in story_files:
+        filepath = os.path.join(f'stories/{year}', filename)
+        
+        if manifest is not None:
+            previous = lookup_file(manifest, filepath)
+            if previous is not None:
+                results.append(previous)
                 continue
-                
-            total_files += 1
-            filepath = os.path.join(year_path, filename)
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-                
-                # Extract title from HTML
-                soup = BeautifulSoup(html_content, 'html.parser')
-                title_tag = soup.find('title')
-                title = title_tag.get_text().strip() if title_tag else filename.replace('.html', '')
-                
-                # Extract text content
-                text_content = extract_text_content(html_content)
-                
-                # Analyze content
-                classification, confidence, reasons = analyze_content_type(text_content, title, filename)
-                
-                results.append({
-                    'filename': filename,
-                    'year': year,
-                    'title': title,
-                    'classification': classification,
-                    'confidence': confidence,
-                    'reasons': reasons,
-                    'text_length': len(text_content),
-                    'filepath': filepath
-                })
-                
-                print(f"  {filename} -> {classification} ({confidence}%)")
-                
-            except Exception as e:
-                print(f"  Error processing {filename}: {e}")
-                results.append({
-                    'filename': filename,
-                    'year': year,
-                    'title': 'ERROR',
-                    'classification': 'Error',
-                    'confidence': 0,
-                    'reasons': f'Error reading file: {e}',
-                    'text_length': 0,
-                    'filepath': filepath
-                })
+        
+        # Placeholder, filled in once the file has been parsed
+        pending.append((len(results), year, filename, filepath))
+        results.append(None)
+    
+    print(f"Analyzing {len(pending)} of {total_files} files...")
+    if trace is not None:
+        for index, year, filename, filepath in pending:
+            result = trace_story_file(year, filename, trace)
+            print(f"  {filename} -> {result['classification']} ({result['confidence']}%)")
+            results[index] = result
+            if result['classification'] == 'Error':
+                errors.append((filepath, result['reasons']))
+            if manifest is not None:
+                record_file(manifest, filepath, result)
+        pending = []
+    
+    contents = get_story_contents([item[3] for item in pending], cache, jobs)
+    
+    for (index, year, filename, filepath), (content, error) in zip(pending, contents):
+        if error is None:
+            result = classify_story(year, filename, content)
+            print(f"  {filename} -> {result['classification']} ({result['confidence']}%)")
+            if manifest is not None:
+                record_file(manifest, filepath, result)
+        else:
+            result = error_result(year, filename, error)
+            errors.append((filepath, error))
+            if manifest is not None:
+                record_file(manifest, filepath, result)
+        results[index] = result
+    
+    if errors:
+        print(f"\n=== ERRORS ({len(errors)}) ===")
+        for filepath, error in errors:
+            print(f"  {filepath}: {error}")
     
     return results, total_files
 
-def save_detailed_analysis(results):
+def save_detailed_analysis(results, csv_filename=None):
     """Save detailed analysis to CSV"""
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f'detailed_story_analysis_{timestamp}.csv'
+    if csv_filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_filename = f'detailed_story_analysis_{timestamp}.csv'
     
     with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['filename', 'year', 'title', 'classification', 'confidence', 
@@ -259,11 +363,44 @@ def print_summary(results):
             print(f"  ... and {len(review_files) - 10} more")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify every story file as Story or Document")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore the manifest and re-analyse every file")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="time every step of every file (implies --full, runs serially) "
+                             "and write a Chrome trace JSON to FILE")
+    parser.add_argument('--trace-top', type=int, default=10,
+                        help="number of slowest files listed in the trace summary")
+    args = parser.parse_args()
+    
     print("Starting comprehensive story analysis...")
-    print("This will take a few minutes as I read through all 467 files...")
     
-    results, total_files = analyze_all_stories()
-    csv_file = save_detailed_analysis(results)
+    cache = load_parse_cache()
+    manifest = load_manifest(CLASSIFIER_VERSION)
+    if args.full or args.trace:
+        manifest['entries'] = {}
+    
+    trace = None
+    if args.trace:
+        # Warm up the extractor (imports, bs4 entity table and selectors) so the
+        # first traced file is not charged for it
+        parse_story_html('<div class="story-body"><p>&nbsp;</p></div>')
+        trace = start_trace()
+    results, total_files = analyze_all_stories(cache, manifest, args.jobs, trace=trace)
+    if trace is not None:
+        finish_trace(trace)
+    delta = finish_scan(manifest)
+    save_parse_cache(cache)
+    save_manifest(manifest)
+    
+    csv_file = save_detailed_analysis(results, ANALYSIS_CSV)
     print_summary(results)
+    print_delta_report(delta)
+    
+    if trace is not None:
+        save_chrome_trace(trace, args.trace)
+        print_trace_summary(trace, args.trace_top)
     
     print(f"\nAnalysis complete! Check {csv_file} for detailed results.")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Story Detection
+==============================
+
+Finds stories whose text is nearly the same (re-uploads, untitled
+copies, a part saved twice) without comparing every pair of files:
+
+    1. each story's cleaned body text is cut into word shingles
+       (SHINGLE_SIZE consecutive words)
+    2. a MinHash signature of NUM_BINS values is computed with
+       one-permutation hashing: every shingle is hashed once and kept
+       if it is the smallest in its bin, empty bins are filled from the
+       next non-empty one, so the cost is linear in the text length
+    3. signatures are split into BANDS bands; files sharing a band land
+       in the same bucket (locality-sensitive hashing), and only those
+       candidates are compared
+    4. candidates whose estimated Jaccard similarity reaches the
+       threshold are linked, and each linked group is split into
+       clusters around canonical copies
+
+Each cluster names one canonical file to keep (a real title over an
+untitled-document, then the longest text) and the duplicates the
+catalog build leaves out; every duplicate reaches the threshold
+against its canonical file. The report is written to duplicate-clusters.json.
+
+Usage:
+    python dedupe_stories.py [--threshold 0.8] [--jobs N] [--report FILE]
+"""
+
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+
+DEDUPE_REPORT = 'duplicate-clusters.json'
+
+# Bump when signatures or cluster rules change
+DEDUPE_VERSION = 2
+
+SHINGLE_SIZE = 3
+NUM_BINS = 128
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+BUCKET_WINDOW = 64
+DEFAULT_THRESHOLD = 0.8
+
+# Signatures kept in memory, so a long-running build (build_pipeline.py
+# --watch) only signs texts that changed
+SIGNATURE_MEMO_SIZE = 4096
+
+# Bin values are below 2**64 / NUM_BINS; borrowed values are shifted past them
+BORROW_OFFSET = 1 << 57
+
+# Placeholder names that should never be kept over a titled copy
+PLACEHOLDER_NAMES = ['untitled-document', 'imp.html']
+
+
+def story_text(content):
+    """Text used for comparison: the story paragraphs, or the page text if there are none"""
+    return ' '.join(content['paragraphs']) or content['text']
+
+
+@functools.lru_cache(maxsize=SIGNATURE_MEMO_SIZE)
+def minhash_signature(text):
+    """One-permutation MinHash signature of the word shingles of text"""
+    words = text.split()
+    bins = [None] * NUM_BINS
+    for start in range(max(1, len(words) - SHINGLE_SIZE + 1)):
+        shingle = ' '.join(words[start:start + SHINGLE_SIZE]).encode('utf-8')
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'big')
+        index, value = value % NUM_BINS, value // NUM_BINS
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+
+    if all(value is None for value in bins):
+        return bins  # Empty text
+
+    # Densify: an empty bin takes the next non-empty bin's value, offset by the distance
+    signature = []
+    for index in range(NUM_BINS):
+        distance = 0
+        while bins[(index + distance) % NUM_BINS] is None:
+            distance += 1
+        signature.append(bins[(index + distance) % NUM_BINS] + distance * BORROW_OFFSET)
+    return signature
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_BINS
+
+
+def candidate_pairs(signatures):
+    """Pairs of indices sharing at least one LSH band
+
+    Every pair inside a bucket is a candidate. Buckets larger than
+    BUCKET_WINDOW + 1 (mass-produced pages sharing a band) pair each
+    member with the next BUCKET_WINDOW members only, so one crowded
+    bucket cannot make the run quadratic.
+    """
+    pairs = set()
+    for band in range(BANDS):
+        buckets = {}
+        for index, signature in enumerate(signatures):
+            if signature[0] is None:
+                continue  # No text to compare
+            key = tuple(signature[band * ROWS:(band + 1) * ROWS])
+            buckets.setdefault(key, []).append(index)
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:position + 1 + BUCKET_WINDOW]:
+                    pairs.add((first, second))
+    return pairs
+
+
+def find_clusters(signatures, order, threshold=DEFAULT_THRESHOLD):
+    """Group indices into clusters of near-duplicates
+
+    Files linked by similar pairs are taken in `order` (a sort key per
+    index, best copy first). Each joins the first canonical copy it
+    reaches the threshold against, or becomes a canonical copy itself,
+    so every duplicate is similar to the copy it is dropped for rather
+    than only chained to it. Returns (clusters, number of candidate
+    pairs) where a cluster is (canonical, [(duplicate, similarity)]).
+    """
+    parent = list(range(len(signatures)))
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    pairs = candidate_pairs(signatures)
+    for first, second in pairs:
+        if similarity(signatures[first], signatures[second]) >= threshold:
+            parent[root(second)] = root(first)
+
+    groups = {}
+    for index in range(len(signatures)):
+        groups.setdefault(root(index), []).append(index)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        canonicals = []
+        for index in sorted(members, key=order):
+            for canonical, duplicates in canonicals:
+                score = similarity(signatures[canonical], signatures[index])
+                if score >= threshold:
+                    duplicates.append((index, score))
+                    break
+            else:
+                canonicals.append((index, []))
+        clusters.extend(cluster for cluster in canonicals if cluster[1])
+    return clusters, len(pairs)
+
+
+def is_placeholder(path):
+    """True for files saved without a real title"""
+    name = os.path.basename(path)
+    return any(name.startswith(placeholder) for placeholder in PLACEHOLDER_NAMES)
+
+
+def canonical_order(path, content):
+    """Sort key choosing the copy to keep: titled, then longest, then first path"""
+    return (is_placeholder(path), -content['word_count'], path)
+
+
+def build_dedupe_report(file_paths, contents, threshold=DEFAULT_THRESHOLD, jobs=1):
+    """Compute signatures for the files and return the cluster report"""
+    texts = [story_text(content) for content in contents]
+    if jobs > 1 and len(texts) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            signatures = list(executor.map(minhash_signature, texts,
+                                           chunksize=max(1, len(texts) // (jobs * 4))))
+    else:
+        signatures = [minhash_signature(text) for text in texts]
+
+    order = lambda index: canonical_order(file_paths[index], contents[index])
+    clusters, pair_count = find_clusters(signatures, order, threshold)
+    report_clusters = []
+    for canonical, duplicates in clusters:
+        report_clusters.append({
+            'canonical': file_paths[canonical],
+            'title': contents[canonical]['title'],
+            'duplicates': [{
+                'file': file_paths[index],
+                'title': contents[index]['title'],
+                'similarity': round(score, 3)
+            } for index, score in duplicates]
+        })
+    report_clusters.sort(key=lambda cluster: cluster['canonical'])
+
+    return {
+        'version': DEDUPE_VERSION,
+        'threshold': threshold,
+        'shingle_size': SHINGLE_SIZE,
+        'num_bins': NUM_BINS,
+        'bands': BANDS,
+        'files': len(file_paths),
+        'candidate_pairs': pair_count,
+        'clusters': report_clusters
+    }
+
+
+def duplicate_files(report):
+    """Paths the catalog should leave out: every non-canonical cluster member"""
+    if not report:
+        return set()
+    return {duplicate['file'] for cluster in report['clusters'] for duplicate in cluster['duplicates']}
+
+
+def load_dedupe_report(report_file=DEDUPE_REPORT):
+    """Load the cluster report, or None if it has not been built"""
+    if not os.path.exists(report_file):
+        return None
+    with open(report_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_dedupe_report(report, report_file=DEDUPE_REPORT):
+    """Write the cluster report"""
+    tmp_file = report_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, report_file)
+
+
+def dedupe_files(file_paths, threshold=DEFAULT_THRESHOLD, jobs=1, report_file=DEDUPE_REPORT):
+    """Extract (through the parse cache), cluster and save the report for a list of files"""
+    cache = load_parse_cache()
+    paths, contents = [], []
+    for path, (content, error) in zip(file_paths, get_story_contents(file_paths, cache, jobs)):
+        if error:
+            print(f"❌ Skipping {path}: {error}")
+            continue
+        paths.append(path)
+        contents.append(content)
+    save_parse_cache(cache)
+
+    report = build_dedupe_report(paths, contents, threshold, jobs)
+    save_dedupe_report(report, report_file)
+    print(f"   🧬 {report['files']} files, {report['candidate_pairs']} candidate pairs, "
+          f"{len(report['clusters'])} duplicate clusters "
+          f"({len(duplicate_files(report))} files suppressed)")
+    return report
+
+
+def print_report(report):
+    """Print every cluster with its canonical file and duplicates"""
+    for cluster in report['clusters']:
+        print(f"\n📗 {cluster['canonical']} ({cluster['title']})")
+        for duplicate in cluster['duplicates']:
+            print(f"   ↳ {duplicate['similarity']:.2f}  {duplicate['file']} ({duplicate['title']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate stories with MinHash/LSH")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="estimated Jaccard similarity for two files to be duplicates")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for parsing and signatures")
+    parser.add_argument('--report', default=DEDUPE_REPORT, help="cluster report JSON file")
+    args = parser.parse_args()
+
+    print("🔎 Looking for near-duplicate stories...")
+    report = dedupe_files(sorted(glob.glob('stories/*/*.html')), args.threshold, args.jobs, args.report)
+    print_report(report)
+    print(f"\n📄 Report saved to {args.report}")
@@ -0,0 +1,86 @@
+"""
+Single-Pass Indicator Matcher
+=============================
+
+Compiles a list of indicator strings into one matcher that finds every
+occurrence of every indicator in a single pass over the text, instead of
+running one substring search per indicator.
+
+The indicators are folded into a trie and emitted as a nested regular
+expression in which every branch starts with a distinct character, so
+the regex engine can skip ahead on its first-character set and decides
+each position in one step, however many indicators there are. Each hit
+is the longest indicator starting at that position; shorter indicators
+starting at the same position are necessarily prefixes of it and are
+added from a precomputed table. Scanning resumes one character after
+each hit so overlapping indicators are reported too.
+
+Usage:
+    matcher = compile_indicators(['tax', 'house tax', 'bill', 'billing'])
+    hits = find_indicators(matcher, 'house tax billing')
+    # {'house tax': [0], 'tax': [6], 'billing': [10], 'bill': [10]}
+"""
+
+import re
+
+
+def _trie_pattern(node):
+    """Turn a trie node into a regex fragment that prefers the longest match"""
+    branches = []
+    terminal = False
+    for char, child in sorted(node.items()):
+        if char == '':
+            terminal = True
+            continue
+        branches.append(re.escape(char) + _trie_pattern(child))
+
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        body = '(?:' + body + ')?'
+    return body
+
+
+def compile_indicators(indicators):
+    """Compile indicator strings into a single-pass matcher"""
+    patterns = list(dict.fromkeys(indicator for indicator in indicators if indicator))
+
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    # For every indicator, the shorter indicators it starts with
+    pattern_set = set(patterns)
+    prefixes = {
+        pattern: [pattern[:end] for end in range(1, len(pattern)) if pattern[:end] in pattern_set]
+        for pattern in patterns
+    }
+
+    regex = re.compile(_trie_pattern(trie)) if patterns else None
+    return {
+        'patterns': patterns,
+        'prefixes': prefixes,
+        'regex': regex
+    }
+
+
+def find_indicators(matcher, text):
+    """Return {indicator: [start positions]} for every indicator found in text"""
+    hits = {}
+    if matcher['regex'] is None:
+        return hits
+
+    search = matcher['regex'].search
+    match = search(text)
+    while match is not None:
+        longest = match.group()
+        position = match.start()
+        hits.setdefault(longest, []).append(position)
+        for prefix in matcher['prefixes'][longest]:
+            hits.setdefault(prefix, []).append(position)
+        match = search(text, position + 1)
+    return hits
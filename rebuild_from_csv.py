@@ -5,15 +5,23 @@ Rebuild Stories Data from CSV Classification
 
 This script rebuilds the stories-data.json file using ONLY entries 
 that are classified as "Story" in the CSV file, fixing the count mismatch.
+Only the difference is written, as catalog journal changes (see
+story_catalog.py): new stories are added, entries the CSV no longer
+lists as Story are removed, and every field that differs from the CSV
+(title, confidence, length, category, and the date when the CSV has a
+date column) is updated, so existing entries keep their dates and
+extra fields. The catalog is published before the script exits.
 
 Usage:
     python rebuild_from_csv.py
 """
 
-import pandas as pd
-import json
 import os
 from datetime import datetime
+from story_catalog import (add_change, append_changes, compact_journal, entry_file,
+                           load_catalog, remove_change, update_change)
+from story_categories import with_site_categories
+from story_csv import iter_story_records
 
 def rebuild_stories_data():
     """Rebuild stories-data.json using only CSV-classified stories."""
@@ -29,71 +37,87 @@ def rebuild_stories_data():
     csv_file = csv_files[0]
     print(f"📖 Reading: {csv_file}")
     
-    # Read CSV
-    df = pd.read_csv(csv_file)
-    print(f"📊 Total entries in CSV: {len(df)}")
-    
-    # Show classification breakdown
-    print("\n📋 Classification breakdown:")
-    classification_counts = df['classification'].value_counts()
-    for classification, count in classification_counts.items():
-        print(f"   {classification}: {count}")
-    
-    # Filter only stories
-    stories_df = df[df['classification'].str.lower() == 'story'].copy()
-    print(f"\n✅ Entries classified as 'Story': {len(stories_df)}")
-    
-    # Group by year
+    # Stream the Story rows; the classification breakdown is counted on the way
+    stats = {}
     new_stories_data = {}
+    story_count = 0
     
-    for _, row in stories_df.iterrows():
-        year = str(row['year'])
-        title = row['title']
-        
-        # Remove redundant suffix if present
-        title = title.replace(' - రవి కావూరు కథలు', '').replace(' - రవి గరి కథలు', '')
+    for row in iter_story_records(csv_file, stats):
+        year = row['year']
         filename = row['filepath']
         
         if year not in new_stories_data:
             new_stories_data[year] = []
         
-        # Create story entry
+        # Create story entry; without a date in the CSV, existing entries keep theirs
         story_entry = {
-            "title": title,
+            "title": row['title'],
             "file": filename,
-            "date": datetime.now().strftime("%Y-%m-%d"),
+            "date": row.get('date'),
             "category": "story",
             "classification": "Story",  # From CSV
-            "confidence": row.get('confidence', 'N/A'),
-            "text_length": row.get('text_length', 0)
+            "confidence": row['confidence'] if row['confidence'] is not None else 'N/A',
+            "text_length": row['text_length'] or 0
         }
         
         new_stories_data[year].append(story_entry)
+        story_count += 1
     
-    # Sort years and stories within each year
-    sorted_data = {}
+    print(f"📊 Total entries in CSV: {stats['rows']}")
+    
+    # Show classification breakdown
+    print("\n📋 Classification breakdown:")
+    for classification, count in sorted(stats['classifications'].items(), key=lambda item: -item[1]):
+        print(f"   {classification}: {count}")
+    
+    print(f"\n✅ Entries classified as 'Story': {story_count}")
+    new_stories_data = with_site_categories(new_stories_data)
+    
+    # Diff against the current catalog, new stories by year and title
+    current = {entry_file(entry, year): entry for year, entries in load_catalog().items() for entry in entries}
+    today = datetime.now().strftime("%Y-%m-%d")
+    wanted = set()
+    changes = []
     for year in sorted(new_stories_data.keys()):
-        sorted_data[year] = sorted(new_stories_data[year], key=lambda x: x['title'])
+        for story_entry in sorted(new_stories_data[year], key=lambda x: x['title']):
+            path = entry_file(story_entry, year)
+            wanted.add(path)
+            entry = current.get(path)
+            if entry is None:
+                changes.append(add_change(year, dict(story_entry, date=story_entry['date'] or today)))
+                continue
+            fields = {key: value for key, value in story_entry.items()
+                      if value is not None and entry.get(key) != value}
+            if fields:
+                changes.append(update_change(path, fields))
+    changes.extend(remove_change(path) for path in current if path not in wanted)
     
-    # Save new stories data
-    with open('stories-data.json', 'w', encoding='utf-8') as f:
-        json.dump(sorted_data, f, ensure_ascii=False, indent=2)
+    # Journal the difference and publish it (plus the year-sharded catalog for the site)
+    if changes:
+        append_changes(changes)
+    compact_journal()
     
     # Show summary
-    total_stories = sum(len(stories) for stories in sorted_data.values())
+    counts = {}
+    for change in changes:
+        counts[change['op']] = counts.get(change['op'], 0) + 1
+    print(f"\n📒 Journaled {len(changes)} changes: {counts.get('add', 0)} added, "
+          f"{counts.get('update', 0)} updated, {counts.get('remove', 0)} removed")
+    
+    total_stories = sum(len(stories) for stories in new_stories_data.values())
     print(f"\n🎉 Successfully rebuilt stories-data.json!")
     print(f"📝 Total stories: {total_stories}")
     print(f"\n📅 Stories by year:")
-    for year, stories in sorted_data.items():
+    for year, stories in sorted(new_stories_data.items()):
         print(f"   {year}: {len(stories)} stories")
     
     # Show what was excluded
-    excluded_count = len(df) - len(stories_df)
+    excluded_count = stats['rows'] - story_count
     print(f"\n🚫 Excluded {excluded_count} entries (Documents, etc.)")
     
     print(f"\n✅ Your website will now show exactly {total_stories} stories!")
     print("📌 Next steps:")
-    print("   1. git add stories-data.json")
+    print("   1. git add stories-data.json catalog/")
     print("   2. git commit -m 'Fix story count - use only CSV-classified stories'")
     print("   3. git push")
 
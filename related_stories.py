@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Related Stories
+===============
+
+Precomputes a "related stories" list for every catalog entry so the
+reader modal can suggest what to read next without any similarity math
+in the browser.
+
+Each story's cleaned body text (the same text dedupe_stories.py compares,
+tokenized by telugu_tokenizer.py) becomes a row of a sparse CSR TF-IDF
+matrix X: sublinear term frequency, smoothed IDF, rows L2-normalised,
+terms that appear in one story or in more than MAX_DF_RATIO of them
+dropped. Cosine similarities are X[block] @ X.T, computed one block of
+rows at a time; the block height is chosen so a block never holds more
+than MAX_BLOCK_CELLS scores, which bounds memory however large the
+archive grows. The top-k neighbours of each row (argpartition) above
+MIN_SCORE are stored as file paths in the entry's "related" field.
+
+Requires numpy and scipy (see requirements.txt).
+
+Usage:
+    python related_stories.py [--top-k 5] [--jobs N]
+"""
+
+import argparse
+import functools
+from dedupe_stories import story_text
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from story_catalog import entry_file, load_catalog, write_catalog
+from telugu_tokenizer import tokenize
+
+# Bump when vectors or neighbour selection change
+RELATED_VERSION = 3
+
+DEFAULT_TOP_K = 5
+MAX_DF_RATIO = 0.5
+MIN_SCORE = 0.05
+
+# Term counts kept in memory, so a long-running build (build_pipeline.py
+# --watch) only tokenizes texts that changed
+TERM_COUNT_MEMO_SIZE = 4096
+
+# Scores held per block (float32): 2**23 cells is 32 MB
+MAX_BLOCK_CELLS = 1 << 23
+
+
+@functools.lru_cache(maxsize=TERM_COUNT_MEMO_SIZE)
+def term_counts(text):
+    """Number of times each term occurs in text"""
+    counts = {}
+    for term in tokenize(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def build_tfidf(texts, max_df_ratio=MAX_DF_RATIO):
+    """Return the L2-normalised TF-IDF matrix of the texts as a CSR matrix"""
+    import numpy as np
+    from scipy import sparse
+
+    vocabulary = {}
+    indices, counts, indptr = [], [], [0]
+    for text in texts:
+        for term, count in term_counts(text).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix((np.array(counts, dtype=np.float32),
+                                np.array(indices, dtype=np.int64),
+                                np.array(indptr, dtype=np.int64)),
+                               shape=(len(texts), len(vocabulary)))
+
+    total = len(texts)
+    document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    keep = (document_frequency >= 2) & (document_frequency <= max(2, int(total * max_df_ratio)))
+    idf = (np.log((1 + total) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    matrix = matrix[:, np.flatnonzero(keep)].tocsr()
+    matrix.data = 1 + np.log(matrix.data)
+    matrix = matrix @ sparse.diags(idf[keep])
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+def top_related(matrix, top_k=DEFAULT_TOP_K, min_score=MIN_SCORE, max_block_cells=MAX_BLOCK_CELLS):
+    """Return the row indexes of the top_k most similar rows for every row"""
+    import numpy as np
+
+    rows = matrix.shape[0]
+    if rows < 2:
+        return [[] for _ in range(rows)]
+    top_k = min(top_k, rows - 1)
+    block_size = max(1, max_block_cells // rows)
+    transposed = matrix.T.tocsc()
+
+    related = []
+    for block_start in range(0, rows, block_size):
+        block_end = min(rows, block_start + block_size)
+        scores = (matrix[block_start:block_end] @ transposed).toarray()
+        scores[np.arange(block_end - block_start), np.arange(block_start, block_end)] = -1
+
+        best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        for offset, candidates in enumerate(best):
+            row_scores = scores[offset, candidates]
+            # Highest score first, lower index first on ties
+            order = np.lexsort((candidates, -row_scores))
+            related.append([int(candidates[i]) for i in order if row_scores[i] >= min_score])
+    return related
+
+
+def add_related_stories(catalog, top_k=DEFAULT_TOP_K, jobs=1):
+    """Return a copy of the catalog with a "related" list of file paths on every entry"""
+    entries = [(year, entry, entry_file(entry, year))
+               for year in catalog for entry in catalog[year]]
+
+    cache = load_parse_cache()
+    texts = [''] * len(entries)
+    for index, (content, error) in enumerate(get_story_contents([path for _, _, path in entries],
+                                                                 cache, jobs)):
+        if content is not None:
+            texts[index] = story_text(content)
+    save_parse_cache(cache)
+
+    matrix = build_tfidf(texts)
+    neighbours = top_related(matrix, top_k)
+
+    updated = {year: [] for year in catalog}
+    for (year, entry, _), related in zip(entries, neighbours):
+        entry = {key: value for key, value in entry.items() if key != 'related'}
+        if related:
+            entry['related'] = [entries[other][2] for other in related]
+        updated[year].append(entry)
+
+    linked = sum(1 for related in neighbours if related)
+    print(f"   🔗 Related stories: {linked} of {len(entries)} stories linked "
+          f"({matrix.shape[1]} terms)")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute related stories for the catalog")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help="number of related stories kept per story")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    args = parser.parse_args()
+
+    print("🔗 Computing related stories...")
+    manifest = write_catalog(add_related_stories(load_catalog(), args.top_k, args.jobs))
+    print(f"✅ Catalog updated: {manifest['total']} stories")
@@ -4,69 +4,59 @@ let filteredStories = [];
 let displayedStories = [];
 let storiesPerPage = 12;
 let currentPage = 1;
+// Index of the first story shown: a prerendered listing page (build_listing_pages.py)
+// starts at its own page until the filters change
+let pageStart = 0;
 let currentLanguage = 'te'; // Default to Telugu
-
-// Translation mappings
-const translations = {
-    categories: {
-        te: {
-            'family': 'కుటుంబం',
-            'travel': 'ప్రయాణం',
-            'kids': 'పిల్లలు',
-            'spiritual': 'ఆధ్యాత్మిక',
-            'philosophical': 'తత్వం',
-            'general': 'సాధారణ',
-            'short': 'చిన్న',
-            'long': 'పెద్ద'
-        },
-        en: {
-            'family': 'Family',
-            'travel': 'Travel',
-            'kids': 'Kids',
-            'spiritual': 'Spiritual',
-            'philosophical': 'Philosophy',
-            'general': 'General',
-            'short': 'Short',
-            'long': 'Long'
-        }
-    },
-    categoryFilters: {
-        te: {
-            'family': 'కుటుంబ కధలు',
-            'travel': 'ప్రయాణ వృత్తాంతాలు',
-            'kids': 'పిల్లల కధలు',
-            'spiritual': 'ఆధ్యాత్మిక కధలు',
-            'philosophical': 'తత్వ చర్చలు',
-            'general': 'సాధారణ కధలు'
-        },
-        en: {
-            'family': 'Family Stories',
-            'travel': 'Travel Stories',
-            'kids': 'Children Stories',
-            'spiritual': 'Spiritual Stories',
-            'philosophical': 'Philosophical Stories',
-            'general': 'General Stories'
-        }
-    },
-    ui: {
-        te: {
-            'words': 'పదాలు',
-            'readMore': 'ఇక కథ లోకి',
-            'loadMore': 'మరిన్ని కథలు లోడ్ చేయండి ({count})',
-            'loadMoreDefault': 'మరిన్ని కథలు లోడ్ చేయండి',
-            'storyLoading': 'కథ లోడ్ చేస్తున్నాం...',
-            'storyError': 'కథ లోడ్ చేయడంలో లోపం'
-        },
-        en: {
-            'words': 'words',
-            'readMore': 'Read More',
-            'loadMore': 'Load More Stories ({count})',
-            'loadMoreDefault': 'Load More Stories',
-            'storyLoading': 'Loading story...',
-            'storyError': 'Error loading story'
-        }
-    }
-};
+let filterRequestId = 0;
+let modalRequestId = 0;
+
+// Year-sharded catalog written by story_catalog.py
+const CATALOG_DIR = 'catalog';
+let catalogManifest = null;
+const catalogYearPromises = {};
+
+// Filter bitmaps and sort orders over every shard (story_facets.py);
+// stories are numbered in shard order, see loadCatalogYears
+const FACETS_VERSION = 1;
+const LENGTH_BUCKETS = ['short', 'long'];
+// Category of each story's site_category code, kept in step with story_facets.py
+const SITE_CATEGORIES = ['general', 'family', 'spiritual', 'travel', 'kids', 'philosophical'];
+let catalogFacets = null;
+let storiesByNumber = [];
+
+// First page, manifest and facet counts inlined into index.html by
+// build_listing_pages.py, so the first render needs no request
+const INLINE_DATA_VERSION = 1;
+let catalogCounts = null;
+
+// Columnar shard layout, kept in step with catalog_columnar.py
+const COLUMNAR_FORMAT = 'columnar';
+const COLUMNAR_VERSION = 3;
+const COLUMNAR_COLUMNS = [
+    ['title', 'raw'], ['file', 'path'], ['filename', 'path'], ['path', 'raw'], ['id', 'raw'],
+    ['category', 'dict'], ['classification', 'dict'], ['confidence', 'raw'],
+    ['text_length', 'raw'], ['textLength', 'raw'], ['wordCount', 'raw'], ['excerpt', 'raw'],
+    ['categories', 'dict_list'], ['tags', 'dict_list'], ['reasons', 'raw'],
+    ['site_category', 'raw'], ['related', 'path_list']
+];
+const FLAG_CREATED_DISPLAY = 1;
+const FLAG_MODIFIED_DISPLAY = 2;
+const FLAG_YEAR = 4;
+const MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'];
+
+// Pre-extracted story paragraphs built by build_story_bodies.py
+const STORY_BODIES_DIR = 'story-bodies';
+
+// Full-text search index built by build_search_index.py
+const SEARCH_INDEX_DIR = 'search-index';
+let searchManifestPromise = null;
+const searchShardPromises = {};
+
+// UI strings shared with build_listing_pages.py (translations.json), inlined
+// into every page by the build so no request is needed
+const translations = JSON.parse(document.getElementById('translations').textContent);
 
 // DOM elements
 const storiesGrid = document.getElementById('storiesGrid');
@@ -80,6 +70,7 @@ const searchInput = document.getElementById('searchInput');
 const modal = document.getElementById('storyModal');
 const modalTitle = document.getElementById('modalTitle');
 const modalContent = document.getElementById('modalContent');
+const relatedStoriesList = document.getElementById('relatedStories');
 const langToggle = document.getElementById('langToggle');
 
 // Initialize the website
@@ -90,9 +81,78 @@ document.addEventListener('DOMContentLoaded', function() {
     setupLanguageToggle();
 });
 
-// Load stories from JSON file
+// Cache-first repeat visits and offline reading (sw.js), once the page has loaded
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('sw.js')
+            .catch(error => console.warn('Service worker registration failed:', error));
+    });
+}
+
+// Load stories, preferring the year-sharded catalog
 async function loadStories() {
+    const view = listingView();
     try {
+        const inline = readInlineData();
+        if (inline) {
+            // Show the inlined first page now and load the whole catalog behind it
+            catalogManifest = inline.manifest;
+            catalogCounts = inline.counts;
+            filteredStories = inline.stories;
+            populateFilters();
+            yearFilter.value = view.year;
+            categoryFilter.value = view.category;
+            displayStories();
+            updateTotalStoriesCount();
+            // The rest of the list is on its way; a click before it arrives is kept in currentPage
+            loadMoreBtn.style.display = catalogManifest.total > storiesPerPage ? 'block' : 'none';
+
+            const requestId = filterRequestId;
+            whenIdle(async () => {
+                await Promise.all([loadCatalogYears(), loadCatalogFacets()]);
+                populateFilters();
+                if (requestId === filterRequestId) {
+                    // The inlined stories were only this page; the full list starts earlier
+                    pageStart = (view.page - 1) * storiesPerPage;
+                }
+                await refreshFilteredStories();
+                console.log(`Loaded ${allStories.length} stories`);
+            });
+            return;
+        }
+
+        catalogManifest = await fetch(`${CATALOG_DIR}/manifest.json`)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+
+        if (catalogManifest && catalogManifest.years.length > 0) {
+            // First paint needs only the newest year, or the year of a listing
+            // page (a category page lists every year); the rest load when idle
+            allStories = [];
+            storiesByNumber = [];
+            const firstYears = view.category ? null : [view.year || catalogManifest.years[0].year];
+            await Promise.all([loadCatalogYears(firstYears), loadCatalogFacets()]);
+            filteredStories = catalogFacets ?
+                facetStories(view.year, view.category, '', sortFilter.value) :
+                sortStories(allStories.filter(story => inListingView(story, view)), sortFilter.value);
+
+            populateFilters();
+            yearFilter.value = view.year;
+            categoryFilter.value = view.category;
+            pageStart = (view.page - 1) * storiesPerPage;
+            displayStories();
+            updateTotalStoriesCount();
+
+            whenIdle(async () => {
+                await loadCatalogYears();
+                populateFilters();
+                refreshFilteredStories();
+                console.log(`Loaded ${allStories.length} stories`);
+            });
+            return;
+        }
+
+        // Fall back to the single stories-data.json file
         const response = await fetch('stories-data.json');
         const storiesData = await response.json();
         
@@ -105,9 +165,12 @@ async function loadStories() {
             });
         }
         
-        filteredStories = [...allStories];
+        filteredStories = allStories.filter(story => inListingView(story, view));
         
         populateFilters();
+        yearFilter.value = view.year;
+        categoryFilter.value = view.category;
+        pageStart = (view.page - 1) * storiesPerPage;
         displayStories();
         updateTotalStoriesCount();
         
@@ -118,8 +181,225 @@ async function loadStories() {
     }
 }
 
+// Inline data block of the page, or null when there is none or it is from another version
+function readInlineData() {
+    const element = document.getElementById('initialData');
+    try {
+        const data = element && JSON.parse(element.textContent);
+        return data && data.version === INLINE_DATA_VERSION ? data : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+// View of a prerendered listing page, from the story grid's data attributes
+function listingView() {
+    const data = storiesGrid.dataset || {};
+    return {year: data.year || '', category: data.category || '', page: Number(data.page) || 1};
+}
+
+function inListingView(story, view) {
+    return (!view.year || String(story.year) === view.year) &&
+        (!view.category || storyCategory(story) === view.category);
+}
+
+// Fetch year shards (every year when none are given) into allStories
+function loadCatalogYears(years) {
+    if (!catalogManifest) {
+        return Promise.resolve();
+    }
+
+    // A story's number is the count of every earlier (newer) year plus its row
+    const offsets = {};
+    let offset = 0;
+    catalogManifest.years.forEach(item => {
+        offsets[item.year] = offset;
+        offset += item.count;
+    });
+
+    const wanted = catalogManifest.years.filter(item => !years || years.includes(item.year));
+    return Promise.all(wanted.map(item => {
+        if (!catalogYearPromises[item.year]) {
+            catalogYearPromises[item.year] = fetch(`${CATALOG_DIR}/${item.file}?v=${item.hash}`)
+                .then(response => response.json())
+                .then(data => {
+                    const stories = Array.isArray(data) ? data : decodeColumnarCatalog(data);
+                    stories.forEach((story, row) => {
+                        story.year = item.year; // Add year property to each story
+                        story.number = offsets[item.year] + row;
+                        storiesByNumber[story.number] = story;
+                        allStories.push(story);
+                    });
+                })
+                .catch(error => {
+                    delete catalogYearPromises[item.year]; // Retry on next use
+                    console.error(`Error loading stories for ${item.year}:`, error);
+                });
+        }
+        return catalogYearPromises[item.year];
+    }));
+}
+
+// Fetch the facets file once; catalogFacets stays null if it is missing
+async function loadCatalogFacets() {
+    const item = catalogManifest && catalogManifest.facets;
+    if (!item || catalogFacets) {
+        return;
+    }
+    const data = await fetch(`${CATALOG_DIR}/${item.file}?v=${item.hash}`)
+        .then(response => response.ok ? response.json() : null)
+        .catch(() => null);
+    if (!data || data.version !== FACETS_VERSION) {
+        return;
+    }
+
+    const bitmaps = {};
+    for (const facet in data.bitmaps) {
+        bitmaps[facet] = {};
+        for (const value in data.bitmaps[facet]) {
+            bitmaps[facet][value] = decodeBitmap(data.bitmaps[facet][value]);
+        }
+    }
+    catalogFacets = {count: data.count, bitmaps: bitmaps, lengths: data.lengths, sorts: data.sorts};
+}
+
+// Base64 bitmap to 32-bit words; bit n of the bytes is bit n % 32 of word
+// n >> 5 on little-endian hardware, which every browser runs on
+function decodeBitmap(encoded) {
+    const bytes = Uint8Array.from(atob(encoded), char => char.charCodeAt(0));
+    return new Uint32Array(bytes.buffer);
+}
+
+function hasBit(bitmap, number) {
+    return (bitmap[number >> 5] >>> (number & 31)) & 1;
+}
+
+// Loaded stories matching the facet values ('' = any), in the chosen order
+function facetStories(yearValue, categoryValue, lengthValue, sortValue) {
+    let selected = null;
+    [['year', yearValue], ['category', categoryValue], ['length', lengthValue]].forEach(([facet, value]) => {
+        if (!value) {
+            return;
+        }
+        const bitmap = catalogFacets.bitmaps[facet][value] || new Uint32Array((catalogFacets.count + 31) >> 5);
+        selected = selected ? selected.map((word, index) => word & bitmap[index]) : bitmap;
+    });
+
+    const order = catalogFacets.sorts[sortValue] || catalogFacets.sorts.newest;
+    const stories = [];
+    order.forEach(number => {
+        const story = storiesByNumber[number];
+        if (story && (!selected || hasBit(selected, number))) {
+            stories.push(story);
+        }
+    });
+    return stories;
+}
+
+// Category shown for a story, decided by the catalog build (site_category code)
+function storyCategory(story) {
+    return SITE_CATEGORIES[story.site_category] || SITE_CATEGORIES[0];
+}
+
+// Length bucket shown for a story: its facet when known, else from text_length
+function storyLength(story) {
+    if (catalogFacets && story.number !== undefined) {
+        return LENGTH_BUCKETS[catalogFacets.lengths[story.number]];
+    }
+    return story.text_length < 1000 ? 'short' : 'long';
+}
+
+// Days since 1970-01-01 to a UTC Date
+function dateFromDays(days) {
+    return new Date(days * 86400000);
+}
+
+// Same text as Python's strftime("%B %d, %Y")
+function formatDisplayDate(date) {
+    const day = String(date.getUTCDate()).padStart(2, '0');
+    return `${MONTH_NAMES[date.getUTCMonth()]} ${day}, ${date.getUTCFullYear()}`;
+}
+
+// Rebuild one catalog entry from a columnar shard (see catalog_columnar.py)
+function decodeColumnarRecord(data, index) {
+    const columns = data.columns;
+    const dicts = data.dicts;
+    const column = name => columns[name] ? columns[name][index] : null;
+    const group = dicts.group[columns.group[index]];
+    const story = {};
+
+    COLUMNAR_COLUMNS.forEach(([name, codec]) => {
+        let value = column(name);
+        if (value === null || value === undefined) {
+            return;
+        }
+        if (codec === 'dict') {
+            value = dicts[name][value];
+        } else if (codec === 'dict_list') {
+            value = value.map(item => dicts[name][item]);
+        } else if (codec === 'path' && !value.includes('/')) {
+            value = `stories/${group}/${value}`;
+        } else if (codec === 'path_list') {
+            value = value.map(item => item.includes('/') ? item : `stories/${group}/${item}`);
+        }
+        story[name] = value;
+    });
+
+    const day = column('date');
+    let created = column('created');
+    let modified = column('modified');
+    const flags = column('flags') || 0;
+
+    if (day !== null && day !== undefined) {
+        story.date = dateFromDays(day).toISOString().slice(0, 10);
+    }
+    if (created !== null && created !== undefined) {
+        created += day;
+        story.created_date = dateFromDays(created).toISOString().slice(0, 10);
+    }
+    if (modified !== null && modified !== undefined) {
+        modified += created;
+        story.modified_date = dateFromDays(modified).toISOString().slice(0, 10);
+    }
+    if (flags & FLAG_CREATED_DISPLAY) {
+        story.created_display = formatDisplayDate(dateFromDays(created));
+    }
+    if (flags & FLAG_MODIFIED_DISPLAY) {
+        story.modified_display = formatDisplayDate(dateFromDays(modified));
+    }
+    if (flags & FLAG_YEAR) {
+        story.year = parseInt(group, 10);
+    }
+
+    return Object.assign(story, data.extras[String(index)] || {});
+}
+
+// Rebuild every entry of a columnar shard, in stored order
+function decodeColumnarCatalog(data) {
+    if (data.format !== COLUMNAR_FORMAT || data.version !== COLUMNAR_VERSION) {
+        throw new Error(`Unsupported catalog format: ${data.format} v${data.version}`);
+    }
+    const stories = [];
+    for (let index = 0; index < data.count; index++) {
+        stories.push(decodeColumnarRecord(data, index));
+    }
+    return stories;
+}
+
+// Run a callback when the browser is idle
+function whenIdle(callback) {
+    if ('requestIdleCallback' in window) {
+        requestIdleCallback(callback);
+    } else {
+        setTimeout(callback, 200);
+    }
+}
+
 // Populate filter dropdowns
 function populateFilters() {
+    const selectedYear = yearFilter.value;
+    const selectedCategory = categoryFilter.value;
+
     // Clear existing options (except first default option)
     const yearOptions = yearFilter.querySelectorAll('option:not(:first-child)');
     yearOptions.forEach(option => option.remove());
@@ -127,8 +407,10 @@ function populateFilters() {
     const categoryOptions = categoryFilter.querySelectorAll('option:not(:first-child)');
     categoryOptions.forEach(option => option.remove());
 
-    // Year filter
-    const years = [...new Set(allStories.map(story => story.year))].sort((a, b) => b - a);
+    // Year filter (the manifest knows every year before all shards are loaded)
+    const years = catalogManifest ?
+        catalogManifest.years.map(item => item.year) :
+        [...new Set(allStories.map(story => story.year))].sort((a, b) => b - a);
     years.forEach(year => {
         const option = document.createElement('option');
         option.value = year;
@@ -136,11 +418,11 @@ function populateFilters() {
         yearFilter.appendChild(option);
     });
 
-    // Category filter - use auto-categorization
-    const categories = new Set();
+    // Category filter - every category of the catalog, or of the loaded stories
+    const catalogCategories = catalogFacets ? catalogFacets.bitmaps.category : catalogCounts && catalogCounts.category;
+    const categories = new Set(Object.keys(catalogCategories || {}));
     allStories.forEach(story => {
-        const autoCategory = categorizeStory(story);
-        categories.add(autoCategory);
+        categories.add(storyCategory(story));
     });
     
     [...categories].sort().forEach(category => {
@@ -149,6 +431,10 @@ function populateFilters() {
         option.textContent = translations.categoryFilters[currentLanguage][category] || category;
         categoryFilter.appendChild(option);
     });
+
+    // Keep the user's selections across re-population
+    yearFilter.value = selectedYear;
+    categoryFilter.value = selectedCategory;
 }
 
 // Setup event listeners
@@ -309,46 +595,74 @@ function updateActiveNavLink() {
 }
 
 // Apply filters
-function applyFilters() {
+async function applyFilters() {
     const yearValue = yearFilter.value;
     const categoryValue = categoryFilter.value;
     const lengthValue = lengthFilter.value;
     const sortValue = sortFilter.value;
     const searchValue = searchInput.value.toLowerCase().trim();
 
+    // Fetch the year shards this view needs, and look the query up in the
+    // story bodies; results from older passes are ignored
+    const requestId = ++filterRequestId;
+    await loadCatalogYears(yearValue ? [yearValue] : null);
+    const bodyMatches = searchValue ? await searchStoryBodies(searchValue) : null;
+    if (requestId !== filterRequestId) {
+        return;
+    }
+
+    // Year, category and length are bitmap lookups and the order is
+    // precomputed; only the search text is checked per story
+    if (catalogFacets) {
+        filteredStories = facetStories(yearValue, categoryValue, lengthValue, sortValue)
+            .filter(story => !searchValue || matchesSearch(story, searchValue, bodyMatches));
+        currentPage = 1;
+        pageStart = 0;
+        displayStories();
+        return;
+    }
+
+    const categoryCode = SITE_CATEGORIES.indexOf(categoryValue);
     filteredStories = allStories.filter(story => {
         // Year filter
         if (yearValue && story.year.toString() !== yearValue) {
             return false;
         }
 
-        // Category filter - use auto-categorization
-        if (categoryValue && categorizeStory(story) !== categoryValue) {
+        // Category filter - precomputed code
+        if (categoryValue && (story.site_category || 0) !== categoryCode) {
             return false;
         }
 
         // Length filter (based on text_length)
-        if (lengthValue) {
-            const isShort = story.text_length < 1000;
-            const isLong = story.text_length >= 1000;
-            if ((lengthValue === 'short' && !isShort) || (lengthValue === 'long' && !isLong)) {
-                return false;
-            }
+        if (lengthValue && storyLength(story) !== lengthValue) {
+            return false;
         }
 
-        // Search filter
-        if (searchValue) {
-            const searchText = (story.title + ' ' + story.excerpt).toLowerCase();
-            if (!searchText.includes(searchValue)) {
-                return false;
-            }
+        // Search filter (title/excerpt, or anywhere in the story body)
+        if (searchValue && !matchesSearch(story, searchValue, bodyMatches)) {
+            return false;
         }
 
         return true;
     });
 
-    // Apply sorting
-    filteredStories.sort((a, b) => {
+    filteredStories = sortStories(filteredStories, sortValue);
+
+    currentPage = 1;
+    pageStart = 0;
+    displayStories();
+}
+
+// Search filter: title/excerpt, or anywhere in the story body
+function matchesSearch(story, searchValue, bodyMatches) {
+    const searchText = (story.title + ' ' + story.excerpt).toLowerCase();
+    return searchText.includes(searchValue) || Boolean(bodyMatches && bodyMatches.has(story.file));
+}
+
+// Sort stories in place for the selected order
+function sortStories(stories, sortValue) {
+    return stories.sort((a, b) => {
         switch (sortValue) {
             case 'oldest':
                 // Sort by creation date (oldest first)
@@ -368,16 +682,90 @@ function applyFilters() {
                 return dateD - dateC;
         }
     });
+}
 
-    currentPage = 1;
+// Re-apply the current filters without losing the reader's place
+async function refreshFilteredStories() {
+    const page = currentPage;
+    const start = pageStart;
+    await applyFilters();
+    currentPage = page;
+    pageStart = start;
     displayStories();
 }
 
+// Split text into search terms the same way telugu_tokenizer.py does:
+// NFC, zero-width joiners removed, lower case, runs of letters, digits and
+// combining marks (so vowel signs and virama stay with their letter)
+function tokenizeSearchText(text) {
+    return text.normalize('NFC').replace(/[\u200C\u200D]/g, '').toLowerCase()
+        .match(/[\p{L}\p{N}\p{M}_]+/gu) || [];
+}
+
+// Load the search index manifest once; null if the index was not built
+function loadSearchManifest() {
+    if (!searchManifestPromise) {
+        searchManifestPromise = fetch(`${SEARCH_INDEX_DIR}/index.json`)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+    }
+    return searchManifestPromise;
+}
+
+// Load one postings shard once and keep it for later queries
+function loadSearchShard(fileName) {
+    if (!searchShardPromises[fileName]) {
+        searchShardPromises[fileName] = fetch(`${SEARCH_INDEX_DIR}/${fileName}`)
+            .then(response => response.ok ? response.json() : {})
+            .catch(() => ({}));
+    }
+    return searchShardPromises[fileName];
+}
+
+// Return the set of story files whose body contains every query term
+// (each term matched as a prefix), or null when the index is unavailable
+async function searchStoryBodies(query) {
+    const manifest = await loadSearchManifest();
+    const terms = tokenizeSearchText(query);
+    if (!manifest || terms.length === 0) {
+        return null;
+    }
+
+    let matches = null;
+    for (const term of terms) {
+        // Only the shards whose prefix overlaps this term are fetched
+        const fileNames = Object.keys(manifest.shards)
+            .filter(prefix => term.startsWith(prefix) || prefix.startsWith(term))
+            .map(prefix => manifest.shards[prefix]);
+        const shards = await Promise.all(fileNames.map(loadSearchShard));
+
+        const termMatches = new Set();
+        shards.forEach(shard => {
+            for (const indexedTerm in shard) {
+                if (!indexedTerm.startsWith(term)) {
+                    continue;
+                }
+                const postings = shard[indexedTerm];
+                let docId = 0;
+                for (let i = 0; i < postings.length; i += 2) {
+                    docId += postings[i];
+                    termMatches.add(manifest.docs[docId]);
+                }
+            }
+        });
+
+        matches = matches ? new Set([...matches].filter(file => termMatches.has(file))) : termMatches;
+        if (matches.size === 0) {
+            break;
+        }
+    }
+    return matches;
+}
+
 // Display stories
 function displayStories() {
-    const startIndex = 0;
-    const endIndex = currentPage * storiesPerPage;
-    displayedStories = filteredStories.slice(startIndex, endIndex);
+    const endIndex = pageStart + currentPage * storiesPerPage;
+    displayedStories = filteredStories.slice(pageStart, endIndex);
 
     if (displayedStories.length === 0) {
         showNoResults();
@@ -399,50 +787,6 @@ function renderStories() {
     });
 }
 
-// Function to categorize story based on title and content
-function categorizeStory(story) {
-    const title = story.title.toLowerCase();
-    
-    // Family related keywords (highest priority)
-    if (title.includes('అమ్మ') || title.includes('నాన్న') || title.includes('కుటుంబ') || 
-        title.includes('పెళ్లి') || title.includes('వివాహ') || title.includes('అల్లుడు') ||
-        title.includes('కోడలు') || title.includes('వదిన') || title.includes('family')) {
-        return 'family';
-    }
-    
-    // Spiritual/Religious (second priority)
-    if (title.includes('దేవుడు') || title.includes('భగవాన్') || title.includes('పూజ') || 
-        title.includes('మంత్ర') || title.includes('స్తోత్ర') || title.includes('spiritual') ||
-        title.includes('శ్రీ') || title.includes('గణేశ') || title.includes('విష్ణు') ||
-        title.includes('శివ') || title.includes('దేవ') || title.includes('దేవి')) {
-        return 'spiritual';
-    }
-    
-    // Travel related (third priority)
-    if (title.includes('ప్రయాణ') || title.includes('యాత్ర') || title.includes('ట్రిప్') || 
-        title.includes('travel') || title.includes('trip') || title.includes('విమాన') ||
-        title.includes('రైలు') || title.includes('బస్')) {
-        return 'travel';
-    }
-    
-    // Kids/Children (fourth priority)
-    if (title.includes('పిల్లల') || title.includes('చిన్న') || title.includes('బాల') || 
-        title.includes('పాప') || title.includes('kids') || title.includes('children') ||
-        title.includes('బుడ్డి') || title.includes('అబ్బాయి') || title.includes('అమ్మాయి')) {
-        return 'kids';
-    }
-    
-    // Philosophical/Life lessons (fifth priority)
-    if (title.includes('జీవిత') || title.includes('తత్వ') || title.includes('జ్ఞాన') || 
-        title.includes('విషయ') || title.includes('అనుభవ') || title.includes('lesson') ||
-        title.includes('wisdom') || title.includes('philosophical')) {
-        return 'philosophical';
-    }
-    
-    // Default to general
-    return 'general';
-}
-
 // Create a story card element
 function createStoryCard(story) {
     const card = document.createElement('div');
@@ -453,15 +797,11 @@ function createStoryCard(story) {
         return false;
     };
 
-    // Auto-categorize the story
-    const autoCategory = categorizeStory(story);
+    // Category and length bucket, precomputed by the catalog build when available
+    const autoCategory = storyCategory(story);
     const categoryTag = `<span class="category-tag ${autoCategory}">${getCategoryDisplayName(autoCategory)}</span>`;
-
-    // Determine length based on text_length
-    const isShort = story.text_length < 1000;
-    const lengthTag = isShort ? 
-        `<span class="category-tag short">${getCategoryDisplayName('short')}</span>` : 
-        `<span class="category-tag long">${getCategoryDisplayName('long')}</span>`;
+    const length = storyLength(story);
+    const lengthTag = `<span class="category-tag ${length}">${getCategoryDisplayName(length)}</span>`;
 
     const wordsText = translations.ui[currentLanguage]['words'] || 'words';
     const readMoreText = translations.ui[currentLanguage]['readMore'] || 'Read More';
@@ -481,9 +821,11 @@ function createStoryCard(story) {
         });
     }
 
+    // Same markup as the prerendered cards of build_listing_pages.py; the
+    // links only matter without JavaScript, clicks open the modal
     card.innerHTML = `
         <div class="story-card-header">
-            <h3 class="story-card-title">${story.title}</h3>
+            <h3 class="story-card-title"><a href="${story.file}">${story.title}</a></h3>
             <div class="story-card-meta">
                 <span><i class="fas fa-calendar"></i> ${displayDate}</span>
                 <span><i class="fas fa-file-word"></i> ${wordCount} ${wordsText}</span>
@@ -496,9 +838,9 @@ function createStoryCard(story) {
                     ${categoryTag}
                     ${lengthTag}
                 </div>
-                <button class="read-more">
+                <a class="read-more" href="${story.file}">
                     ${readMoreText} <i class="fas fa-arrow-right"></i>
-                </button>
+                </a>
             </div>
         </div>
     `;
@@ -529,11 +871,12 @@ function loadMoreStories() {
 
 // Update load more button state
 function updateLoadMoreButton() {
-    const hasMore = (currentPage * storiesPerPage) < filteredStories.length;
+    const shown = pageStart + currentPage * storiesPerPage;
+    const hasMore = shown < filteredStories.length;
     loadMoreBtn.style.display = hasMore ? 'block' : 'none';
     
     if (hasMore) {
-        const remaining = filteredStories.length - (currentPage * storiesPerPage);
+        const remaining = filteredStories.length - shown;
         const buttonText = remaining > storiesPerPage ? 
             translations.ui[currentLanguage]['loadMore'].replace('{count}', Math.min(remaining, storiesPerPage)) :
             translations.ui[currentLanguage]['loadMoreDefault'];
@@ -593,11 +936,10 @@ async function openStoryModal(story) {
         if (yearSpan) yearSpan.textContent = story.year;
         if (wordCountSpan) wordCountSpan.textContent = `${wordCount} ${wordsText}`;
         
-        // Add auto-categorized tags
+        // Add the category and length tags
         if (categoriesDiv) {
-            const autoCategory = categorizeStory(story);
-            const isShort = story.text_length < 1000;
-            const lengthTag = isShort ? 'short' : 'long';
+            const autoCategory = storyCategory(story);
+            const lengthTag = storyLength(story);
             
             categoriesDiv.innerHTML = `
                 <span class="category-tag ${autoCategory}">${getCategoryDisplayName(autoCategory)}</span>
@@ -613,8 +955,15 @@ async function openStoryModal(story) {
     // Show modal
     modal.style.display = 'block';
     document.body.style.overflow = 'hidden';
+    const requestId = ++modalRequestId;
+    renderRelatedStories(story, requestId);
 
     try {
+        // Prefer the small pre-extracted payload; fall back to parsing the HTML
+        if (await renderStoryBody(story, requestId)) {
+            return;
+        }
+
         console.log('Fetching story file:', story.file);
         const response = await fetch(story.file);
         
@@ -660,9 +1009,7 @@ async function openStoryModal(story) {
             .filter(line => !line.includes('కథలు గురించి'));
 
         if (paragraphs.length > 0) {
-            modalContent.innerHTML = paragraphs
-                .map(paragraph => `<p>${paragraph}</p>`)
-                .join('');
+            modalContent.innerHTML = renderParagraphs(paragraphs);
         } else {
             modalContent.innerHTML = '<p>కథ కంటెంట్ లోడ్ చేయలేకపోయాము.</p>';
         }
@@ -674,15 +1021,110 @@ async function openStoryModal(story) {
     }
 }
 
+// Render a list of paragraphs as modal markup
+function renderParagraphs(paragraphs) {
+    return paragraphs
+        .map(paragraph => `<p>${paragraph}</p>`)
+        .join('');
+}
+
+// Render a story from its pre-extracted body chunks. The first chunk is
+// shown as soon as it arrives and the rest are appended in order.
+// Returns false when no usable payload exists for the story.
+async function renderStoryBody(story, requestId) {
+    const basePath = story.file
+        .replace(/^stories\//, `${STORY_BODIES_DIR}/`)
+        .replace(/\.html$/, '');
+
+    let first;
+    try {
+        const response = await fetch(`${basePath}.json`);
+        if (!response.ok) {
+            return false;
+        }
+        first = await response.json();
+    } catch (error) {
+        return false;
+    }
+    if (!first.paragraphs || first.paragraphs.length === 0) {
+        return false;
+    }
+    if (requestId !== modalRequestId) {
+        return true; // Modal was closed or another story opened
+    }
+
+    modalContent.innerHTML = renderParagraphs(first.paragraphs);
+
+    // Request the remaining chunks together, but append them in order
+    const pending = [];
+    for (let index = 1; index < first.chunks; index++) {
+        pending.push(fetch(`${basePath}.${index}.json`)
+            .then(response => response.json())
+            .catch(() => ({ paragraphs: [] })));
+    }
+    for (const chunkPromise of pending) {
+        const chunk = await chunkPromise;
+        if (requestId !== modalRequestId) {
+            return true;
+        }
+        modalContent.insertAdjacentHTML('beforeend', renderParagraphs(chunk.paragraphs));
+    }
+    return true;
+}
+
+// List the related stories precomputed by related_stories.py under the story
+async function renderRelatedStories(story, requestId) {
+    if (!relatedStoriesList) {
+        return;
+    }
+    relatedStoriesList.innerHTML = '';
+    if (!story.related || story.related.length === 0) {
+        return;
+    }
+
+    // Related stories can be in year shards that have not loaded yet
+    await loadCatalogYears();
+    if (requestId !== modalRequestId) {
+        return;
+    }
+
+    const storiesByFile = new Map(allStories.map(item => [item.file, item]));
+    const related = story.related.map(file => storiesByFile.get(file)).filter(Boolean);
+    if (related.length === 0) {
+        return;
+    }
+
+    const heading = translations.ui[currentLanguage]['relatedStories'] || 'Related Stories';
+    // Titles come from the imported story HTML, so they are set as text
+    const title = document.createElement('h3');
+    title.textContent = heading;
+    const list = document.createElement('ul');
+    related.forEach(item => {
+        const link = document.createElement('a');
+        link.href = '#';
+        link.textContent = item.title;
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            openStoryModal(item);
+        });
+        const listItem = document.createElement('li');
+        listItem.appendChild(link);
+        list.appendChild(listItem);
+    });
+    relatedStoriesList.appendChild(title);
+    relatedStoriesList.appendChild(list);
+}
+
 // Close story modal
 function closeModal() {
+    modalRequestId++;
     modal.style.display = 'none';
     document.body.style.overflow = 'auto';
 }
 
 // Update total stories count
 function updateTotalStoriesCount() {
-    const storyCount = allStories.length;
+    const storyCount = catalogManifest ? catalogManifest.total : allStories.length;
     
     // Update main stat in hero section
     const totalStoriesElement = document.getElementById('totalStories');
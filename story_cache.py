@@ -0,0 +1,270 @@
+"""
+Content-Addressed Parse Cache
+=============================
+
+Parsing story HTML with BeautifulSoup is the slowest part of every
+analysis and rebuild script. This module keeps the result of that parse
+(title, cleaned text, story paragraphs, text length, and the token
+stream and word count from telugu_tokenizer.py) in a single on-disk
+cache keyed by the SHA-256 of the file contents and the extractor
+version, so an unchanged archive never has to be parsed or tokenized
+twice.
+
+The cache also records which key each file path was last read with.
+Saving keeps only entries some existing file still points at, so edited
+or deleted stories do not leave their old parses behind.
+
+Two extractor backends produce identical results: 'stream' (the
+default, story_extractor.py, one html.parser pass without a tree) and
+'bs4' (BeautifulSoup). Set STORY_EXTRACTOR=bs4 to use BeautifulSoup;
+`python story_extractor.py --verify` checks they agree on the archive.
+
+Usage:
+    cache = load_parse_cache()
+    content = get_story_content('stories/2024/gift.html', cache)
+    contents = get_story_contents(file_paths, cache, jobs=8)
+    save_parse_cache(cache)
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from telugu_tokenizer import tokenize
+
+CACHE_FILE = '.story-parse-cache.json'
+
+# Bump whenever parse_story_html changes what it extracts so stale
+# entries are ignored instead of being served to the scripts.
+EXTRACTOR_VERSION = 3
+
+# Extractor backend used by parse_story_html, see EXTRACTOR_BACKENDS
+EXTRACTOR_BACKEND = os.environ.get('STORY_EXTRACTOR', 'stream')
+
+# Caches this process has loaded or saved, reused while the file is
+# unchanged so a long-running build does not re-read it for every stage
+_loaded_caches = {}
+
+# Navigation and site boilerplate lines dropped from story paragraphs
+BOILERPLATE_LINES = ['రవి కావూరు కథలు', 'మొదటి పేజీ', 'కథలు గురించి']
+
+
+def content_hash(data):
+    """Return the hex SHA-256 digest of raw file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest):
+    """Build the cache key for a content digest and the current extractor"""
+    return f"v{EXTRACTOR_VERSION}:{digest}"
+
+
+def clean_text(text):
+    """Collapse whitespace in extracted text the same way for every script"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def token_fields(text):
+    """Token stream (words joined by single spaces) and word count of cleaned text"""
+    tokens = tokenize(text)
+    return {'tokens': ' '.join(tokens), 'word_count': len(tokens)}
+
+
+def extract_paragraphs(soup):
+    """Return the reader-facing paragraphs of the story body"""
+    body = (soup.select_one('.story-body') or
+            soup.select_one('main .story-content .story-body') or
+            soup.select_one('.story-content') or
+            soup.select_one('article'))
+    if body is None:
+        return []
+
+    # Remove tags, navigation and other non-story elements
+    for element in body.select('script, style, .story-tags, .tag, nav, .nav, .navigation, .header, .footer'):
+        element.decompose()
+
+    lines = (line.strip() for line in body.get_text().split('\n'))
+    return [line for line in lines
+            if line and not any(boilerplate in line for boilerplate in BOILERPLATE_LINES)]
+
+
+def parse_with_bs4(html_content):
+    """Backend: build a BeautifulSoup tree and extract from it"""
+    from bs4 import BeautifulSoup
+
+    return extract_story_content(BeautifulSoup(html_content, 'html.parser'))
+
+
+def parse_with_stream(html_content):
+    """Backend: extract in one streaming pass without a tree"""
+    from story_extractor import extract_story_html
+
+    return extract_story_html(html_content)
+
+
+EXTRACTOR_BACKENDS = {'bs4': parse_with_bs4, 'stream': parse_with_stream}
+
+
+def parse_story_html(html_content, backend=None):
+    """Parse story HTML once and return title, cleaned text, paragraphs and counts"""
+    return EXTRACTOR_BACKENDS[backend or EXTRACTOR_BACKEND](html_content)
+
+
+def extract_story_content(soup):
+    """Extract title, cleaned text, paragraphs and counts from a parsed page"""
+    # Get title (from title tag or first heading)
+    title = ""
+    if soup.title:
+        title = soup.title.get_text().strip()
+    elif soup.h1:
+        title = soup.h1.get_text().strip()
+    elif soup.h2:
+        title = soup.h2.get_text().strip()
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = clean_text(soup.get_text())
+
+    return {
+        'title': title,
+        'text': text,
+        'paragraphs': extract_paragraphs(soup),
+        'text_length': len(text),
+        **token_fields(text)
+    }
+
+
+def file_stamp(path):
+    """Size and mtime of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_parse_cache(cache_file=CACHE_FILE):
+    """Load the parse cache, dropping entries from other extractor versions"""
+    stamp = file_stamp(cache_file)
+    loaded = _loaded_caches.get(cache_file)
+    if stamp is not None and loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+
+    stored = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable parse cache {cache_file}: {e}")
+            stored = {}
+    if 'entries' not in stored:
+        # Older caches held only the entries, without the file index
+        stored = {'files': {}, 'entries': stored}
+
+    prefix = cache_key('')
+    entries = {key: value for key, value in stored['entries'].items() if key.startswith(prefix)}
+    files = {path: key for path, key in stored['files'].items() if key in entries}
+    cache = {'file': cache_file, 'entries': entries, 'files': files, 'dirty': False}
+    _loaded_caches[cache_file] = (stamp, cache)
+    return cache
+
+
+def remember_file(cache, file_path, key):
+    """Record the cache key a file was read with"""
+    path = os.path.normpath(file_path)
+    if cache['files'].get(path) != key:
+        cache['files'][path] = key
+        cache['dirty'] = True
+
+
+def prune_parse_cache(cache):
+    """Drop files that no longer exist and entries no recorded file points at"""
+    cache['files'] = {path: key for path, key in cache['files'].items() if os.path.exists(path)}
+    referenced = set(cache['files'].values())
+    cache['entries'] = {key: value for key, value in cache['entries'].items() if key in referenced}
+
+
+def save_parse_cache(cache):
+    """Write the parse cache back to disk, pruned, if anything changed"""
+    if cache is None or not cache['dirty']:
+        return
+
+    prune_parse_cache(cache)
+    tmp_file = cache['file'] + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'files': cache['files'], 'entries': cache['entries']}, f,
+                  ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, cache['file'])
+    cache['dirty'] = False
+    _loaded_caches[cache['file']] = (file_stamp(cache['file']), cache)
+
+
+def get_story_content(file_path, cache=None):
+    """Return parsed content for a story file, using the cache when possible"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    key = cache_key(content_hash(data))
+    if cache is None:
+        return parse_story_html(data.decode('utf-8'))
+
+    remember_file(cache, file_path, key)
+    if key not in cache['entries']:
+        cache['entries'][key] = parse_story_html(data.decode('utf-8'))
+        cache['dirty'] = True
+    return cache['entries'][key]
+
+
+def _parse_file(file_path):
+    """Worker: read and parse one file, returning (key, content, error)"""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return cache_key(content_hash(data)), parse_story_html(data.decode('utf-8')), None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def get_story_contents(file_paths, cache=None, jobs=1):
+    """Return (content, error) for each file, in order, parsing cache misses on `jobs` processes
+    
+    Cache hits are served in this process; only files that need parsing are
+    sent to the pool. The result is identical for any number of jobs.
+    """
+    results = [None] * len(file_paths)
+    misses = []
+
+    for index, file_path in enumerate(file_paths):
+        if cache is not None:
+            try:
+                with open(file_path, 'rb') as f:
+                    key = cache_key(content_hash(f.read()))
+            except OSError as e:
+                results[index] = (None, str(e))
+                continue
+            remember_file(cache, file_path, key)
+            if key in cache['entries']:
+                results[index] = (cache['entries'][key], None)
+                continue
+        misses.append(index)
+
+    miss_paths = [file_paths[index] for index in misses]
+    if jobs > 1 and len(miss_paths) > 1:
+        chunksize = max(1, len(miss_paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            parsed = list(executor.map(_parse_file, miss_paths, chunksize=chunksize))
+    else:
+        parsed = [_parse_file(file_path) for file_path in miss_paths]
+
+    for index, (key, content, error) in zip(misses, parsed):
+        results[index] = (content, error)
+        if cache is not None and content is not None:
+            remember_file(cache, file_paths[index], key)
+            cache['entries'][key] = content
+            cache['dirty'] = True
+
+    return results
@@ -0,0 +1,366 @@
+"""
+Story Catalog Helpers
+=====================
+
+stories-data.json has been written in two shapes over time: a dict of
+year -> list of entries (rebuild_from_csv.py, update_stories.py) and a
+flat list of entries (create_stories_data.py, update_classification.py,
+add_mavaya_stories.py). These helpers let the build stages read either
+shape without caring which script wrote it last.
+
+write_catalog() also publishes a year-sharded copy for the site:
+catalog/manifest.json lists every year (newest first) with its entry
+count, shard file and content hash, and catalog/<year>.json holds that
+year's entries, so the first page renders from one small request.
+Shards are written in the columnar format from catalog_columnar.py.
+catalog/facets.json (story_facets.py) holds the filter bitmaps and sort
+orders over all shards; the manifest records its hash too. Entries
+carry their "site_category" code, set by the pipeline's catalog stage
+and by the import scripts when they add an entry (story_categories.py);
+publishing only serializes it, so stories-data.json and the shards
+carry the same category.
+Every script that writes stories-data.json goes through write_catalog()
+so the shards never fall behind it.
+
+Catalog changes from the import scripts are not written by rewriting
+stories-data.json. Each change (add, update, remove, reclassify) is
+appended to stories-data.journal as one JSON line with an increasing
+sequence number, under a lock and fsync'd, so a write costs the size of
+the change, and concurrent writers never lose each other's changes.
+load_catalog() returns the snapshot with the journal replayed on top.
+compact_journal() folds the journal into the snapshot and republishes
+the shards; every import script calls it before exiting, since the site
+reads only stories-data.json and catalog/, and `python story_catalog.py
+--compact` publishes anything a crashed script left behind.
+
+A crash can at worst leave a partial last journal line, which replay
+ignores and the next append trims. The snapshot and shards are only
+ever replaced whole through a temporary file. Changes are keyed by story
+file and replaying one twice has no further effect, so a crash between
+publishing a snapshot and trimming the journal is harmless. Whole-catalog
+writers (write_catalog) drop the journal records they loaded and keep any
+appended since.
+
+Usage:
+    catalog = load_catalog()
+    append_changes([add_change('2024', entry), remove_change('stories/2021/old.html')])
+    compact_journal()
+    python story_catalog.py [--compact]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+from datetime import datetime
+from catalog_columnar import FORMAT_NAME, encode_catalog
+from story_facets import build_facets
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No advisory locks (Windows): run one writer at a time
+
+CATALOG_FILE = 'stories-data.json'
+CATALOG_DIR = 'catalog'
+CATALOG_MANIFEST_VERSION = 3
+FACETS_FILE = 'facets.json'
+
+JOURNAL_FILE = 'stories-data.journal'
+
+# Last journal sequence number load_catalog() replayed, per journal file
+_journal_seen = {}
+
+
+def group_by_year(data):
+    """Return catalog data of either shape as a dict of year -> list of entries"""
+    if isinstance(data, dict):
+        return data
+
+    by_year = {}
+    for entry in data:
+        year = str(entry.get('year', ''))
+        by_year.setdefault(year, []).append(entry)
+    return by_year
+
+
+def load_snapshot(catalog_file=CATALOG_FILE):
+    """Load stories-data.json as written, in either shape, without the journal"""
+    if not os.path.exists(catalog_file):
+        return {}
+
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_catalog(catalog_file=CATALOG_FILE, journal_file=JOURNAL_FILE):
+    """Load the catalog as a dict of year -> list of entries, journaled changes included"""
+    data = load_snapshot(catalog_file)
+    records = [record for record in read_journal(journal_file) if record['op'] != 'compacted']
+    if records:
+        _journal_seen[journal_file] = max(record['seq'] for record in records)
+        data = apply_changes(data, records)
+    return group_by_year(data)
+
+
+def write_if_changed(path, data):
+    """Write bytes to path unless the file already holds them; return True if written"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_catalog_shards(data, catalog_dir=CATALOG_DIR):
+    """Write one columnar shard per year, the facets file and a manifest with counts and hashes"""
+    by_year = group_by_year(data)
+    manifest = {'version': CATALOG_MANIFEST_VERSION, 'format': FORMAT_NAME, 'total': 0, 'years': []}
+    os.makedirs(catalog_dir, exist_ok=True)
+
+    for year in sorted(by_year, reverse=True):
+        shard = encode_catalog({year: by_year[year]})
+        payload = json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        file_name = f"{year}.json"
+        write_if_changed(os.path.join(catalog_dir, file_name), payload)
+        manifest['total'] += len(by_year[year])
+        manifest['years'].append({
+            'year': year,
+            'count': len(by_year[year]),
+            'file': file_name,
+            'hash': hashlib.sha256(payload).hexdigest()[:16]
+        })
+
+    payload = json.dumps(build_facets(by_year), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    write_if_changed(os.path.join(catalog_dir, FACETS_FILE), payload)
+    manifest['facets'] = {'file': FACETS_FILE, 'hash': hashlib.sha256(payload).hexdigest()[:16]}
+
+    # Drop shards for years that no longer have entries
+    shard_files = {item['file'] for item in manifest['years']} | {FACETS_FILE}
+    for name in os.listdir(catalog_dir):
+        if name.endswith('.json') and name != 'manifest.json' and name not in shard_files:
+            os.remove(os.path.join(catalog_dir, name))
+
+    manifest_data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    write_if_changed(os.path.join(catalog_dir, 'manifest.json'), manifest_data)
+    return manifest
+
+
+def publish_catalog(data, catalog_file=CATALOG_FILE, catalog_dir=CATALOG_DIR):
+    """Write stories-data.json in the given shape, plus the year-sharded catalog"""
+    write_if_changed(catalog_file, json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
+    return write_catalog_shards(data, catalog_dir)
+
+
+def write_catalog(data, catalog_file=CATALOG_FILE, catalog_dir=CATALOG_DIR, journal_file=JOURNAL_FILE):
+    """Replace the whole catalog with data (either shape) and publish it
+
+    Journal records this process loaded through load_catalog() are
+    already part of data and are dropped; records appended since stay
+    in the journal and are replayed on top of the new snapshot.
+    """
+    with journal_lock(journal_file):
+        manifest = publish_catalog(data, catalog_file, catalog_dir)
+        seen = _journal_seen.pop(journal_file, None)
+        records = read_journal(journal_file) if seen is not None else []
+        changes = [record for record in records if record['op'] != 'compacted']
+        if any(record['seq'] <= seen for record in changes):
+            rewrite_journal(journal_file, records, [record for record in changes if record['seq'] > seen])
+    return manifest
+
+
+# Catalog change journal
+
+@contextlib.contextmanager
+def journal_lock(journal_file=JOURNAL_FILE):
+    """Hold the lock that serialises journal appends, compaction and catalog writes"""
+    with open(journal_file + '.lock', 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def read_journal_data(journal_file=JOURNAL_FILE):
+    """Return (complete records, byte length of the complete lines) of the journal"""
+    if not os.path.exists(journal_file):
+        return [], 0
+    with open(journal_file, 'rb') as f:
+        data = f.read()
+
+    # Anything after the last newline is a write that never finished
+    length = data.rfind(b'\n') + 1
+    records = []
+    for line in data[:length].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records, length
+
+
+def read_journal(journal_file=JOURNAL_FILE):
+    """Return the complete records of the journal, oldest first"""
+    return read_journal_data(journal_file)[0]
+
+
+def encode_record(record):
+    """One journal line"""
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def rewrite_journal(journal_file, records, keep):
+    """Replace the journal with a compaction marker and the records to keep
+
+    The marker carries the highest sequence number so far, so numbers
+    keep increasing across compactions.
+    """
+    marker = {'seq': max((record['seq'] for record in records), default=0), 'op': 'compacted',
+              'time': datetime.now().isoformat(timespec='seconds')}
+    tmp_file = journal_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(b''.join(encode_record(record) for record in [marker] + keep))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, journal_file)
+
+
+def add_change(year, entry):
+    """Change adding an entry under year, or replacing the entry for the same story file"""
+    return {'op': 'add', 'year': str(year), 'entry': entry}
+
+
+def update_change(path, fields):
+    """Change setting fields on the entry for a story file"""
+    return {'op': 'update', 'file': path, 'fields': fields}
+
+
+def remove_change(path):
+    """Change removing the entry for a story file"""
+    return {'op': 'remove', 'file': path}
+
+
+def reclassify_change(path, classification, confidence=None):
+    """Change recording a new classification; entries that are no longer a Story are removed"""
+    change = {'op': 'reclassify', 'file': path, 'classification': classification}
+    if confidence is not None:
+        change['confidence'] = confidence
+    return change
+
+
+def append_changes(changes, journal_file=JOURNAL_FILE):
+    """Durably append changes to the journal; return the sequence number of the last one"""
+    with journal_lock(journal_file):
+        records, length = read_journal_data(journal_file)
+        seq = max((record['seq'] for record in records), default=0)
+        now = datetime.now().isoformat(timespec='seconds')
+        lines = []
+        for change in changes:
+            seq += 1
+            lines.append(encode_record({'seq': seq, 'time': now, **change}))
+
+        with open(journal_file, 'ab') as f:
+            f.truncate(length)  # Drop a torn last line
+            f.write(b''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+    return seq
+
+
+def apply_changes(data, changes):
+    """Return catalog data (either shape) with journal changes applied, in the same shape"""
+    flat = isinstance(data, list)
+    rows = [(year, entry) for year, entries in group_by_year(data).items() for entry in entries]
+    if flat:
+        rows = [(str(entry.get('year', '')), entry) for entry in data]
+
+    positions = {}
+    for index, (year, entry) in enumerate(rows):
+        positions.setdefault(entry_file(entry, year), index)
+
+    for change in changes:
+        if change['op'] == 'add':
+            year, entry = change['year'], dict(change['entry'])
+            if flat:
+                entry.setdefault('year', int(year) if year.isdigit() else year)
+            path = entry_file(entry, year)
+            if path in positions:
+                rows[positions[path]] = (year, entry)
+            else:
+                positions[path] = len(rows)
+                rows.append((year, entry))
+            continue
+
+        index = positions.get(change.get('file'))
+        if index is None:
+            continue  # Unknown operation, marker, or a file not in the catalog
+        year, entry = rows[index]
+        if change['op'] == 'remove' or (change['op'] == 'reclassify' and
+                                        str(change['classification']).lower() != 'story'):
+            rows[index] = None
+            del positions[change['file']]
+        elif change['op'] == 'update':
+            rows[index] = (year, {**entry, **change['fields']})
+        elif change['op'] == 'reclassify':
+            fields = {key: change[key] for key in ('classification', 'confidence') if key in change}
+            rows[index] = (year, {**entry, **fields})
+
+    rows = [row for row in rows if row is not None]
+    if flat:
+        return [entry for _, entry in rows]
+    by_year = {year: [] for year in data}
+    for year, entry in rows:
+        by_year.setdefault(year, []).append(entry)
+    return by_year
+
+
+def compact_journal(min_records=0, catalog_file=CATALOG_FILE, catalog_dir=CATALOG_DIR,
+                    journal_file=JOURNAL_FILE):
+    """Fold the journal into stories-data.json and republish the shards
+
+    Nothing happens while fewer than min_records changes are waiting.
+    Returns the number of changes folded.
+    """
+    with journal_lock(journal_file):
+        records = read_journal(journal_file)
+        changes = [record for record in records if record['op'] != 'compacted']
+        if not changes or len(changes) < min_records:
+            return 0
+        publish_catalog(apply_changes(load_snapshot(catalog_file), changes), catalog_file, catalog_dir)
+        rewrite_journal(journal_file, records, [])
+    _journal_seen.pop(journal_file, None)
+    return len(changes)
+
+
+def entry_file(entry, year=None):
+    """Return the site-relative story file path of a catalog entry"""
+    path = entry.get('file') or entry.get('path') or entry.get('filename', '')
+    if path and '/' not in path:
+        path = f"stories/{year or entry.get('year')}/{path}"
+    return path
+
+
+def iter_catalog_entries(catalog):
+    """Yield (year, entry) pairs in year order, then catalog order"""
+    for year in sorted(catalog):
+        for entry in catalog[year]:
+            yield year, entry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish the year-sharded catalog")
+    parser.add_argument('--compact', action='store_true',
+                        help="fold the change journal into stories-data.json first")
+    args = parser.parse_args()
+
+    if args.compact:
+        folded = compact_journal()
+        print(f"📒 Folded {folded} journaled changes into {CATALOG_FILE}")
+    # Re-shard the current stories-data.json without touching it
+    manifest = write_catalog_shards(load_snapshot())
+    print(f"🗂️  Wrote {len(manifest['years'])} year shards ({manifest['total']} stories) to {CATALOG_DIR}/")
@@ -0,0 +1,49 @@
+"""
+Story Site Categories
+=====================
+
+Sets the "site_category" code of catalog entries, an index into
+story_facets.SITE_CATEGORIES scored by story_facets.story_category()
+from the entry's title and its story text. The text is read through
+the parse cache, so only new or edited stories are parsed.
+
+The pipeline's catalog stage categorizes every entry, and the import
+scripts categorize the entries they add or update. Publishing the
+catalog (story_catalog.py) only serializes the codes entries carry.
+
+Usage:
+    data = with_site_categories(catalog)
+    codes = site_categories(entries, paths)
+"""
+
+from dedupe_stories import story_text
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from story_catalog import entry_file
+from story_facets import story_category
+
+
+def site_categories(entries, paths, jobs=1):
+    """SITE_CATEGORIES index of each entry, reading story bodies through the parse cache"""
+    cache = load_parse_cache()
+    codes = []
+    for entry, (content, error) in zip(entries, get_story_contents(paths, cache, jobs)):
+        text = story_text(content) if content is not None else ''
+        codes.append(story_category(entry.get('title') or '', text))
+    save_parse_cache(cache)
+    return codes
+
+
+def with_site_categories(data, jobs=1):
+    """Copy of catalog data (either shape) with site_category set on every entry"""
+    if isinstance(data, dict):
+        pairs = [(year, entry) for year in data for entry in data[year]]
+    else:
+        pairs = [(None, entry) for entry in data]
+    codes = site_categories([entry for _, entry in pairs], [entry_file(entry, year) for year, entry in pairs],
+                            jobs)
+    categorized = [dict(entry, site_category=code) for (_, entry), code in zip(pairs, codes)]
+    if not isinstance(data, dict):
+        return categorized
+
+    rows = iter(categorized)
+    return {year: [next(rows) for _ in data[year]] for year in data}
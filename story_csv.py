@@ -0,0 +1,156 @@
+"""
+Streaming Classification CSV Reader
+===================================
+
+Reads the analysis and review CSVs (detailed_story_analysis_*.csv,
+"Mavaya stories" exports, final_story_analysis_*.csv) one row at a time
+and yields typed records, so the rebuild scripts start instantly and
+use the same memory for 400 rows or 400,000.
+
+Records are plain dicts keyed by lower-case column name:
+    filename, filepath, title, classification, reasons  - str ('' if empty)
+    year                                                - str, e.g. '2024' (None if empty)
+    confidence, text_length                             - int (None if empty)
+Any other column is kept as a string (None if empty).
+
+review-overrides.json holds manual review decisions keyed by filepath
+or filename; review_override() finds the one that applies to a record.
+
+Usage:
+    stats = {}
+    for record in iter_story_records(csv_file, stats):
+        print(record['title'], record['year'])
+    print(stats['rows'], stats['classifications'])
+"""
+
+import csv
+import json
+import os
+
+REVIEW_OVERRIDES_FILE = 'review-overrides.json'
+
+# Fields a review decision may override
+REVIEW_FIELDS = ['classification', 'confidence', 'reasons']
+
+# Site suffixes removed from story titles in the catalog
+TITLE_SUFFIXES = [' - రవి కావూరు కథలు', ' - రవి గరి కథలు']
+
+TEXT_FIELDS = ['filename', 'filepath', 'title', 'classification', 'reasons']
+INT_FIELDS = ['confidence', 'text_length']
+
+
+def to_int(value, default=None):
+    """Parse an integer cell, accepting float spellings such as '2024.0'"""
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return default
+
+
+def clean_title(title):
+    """Strip the site name suffix from a story title"""
+    for suffix in TITLE_SUFFIXES:
+        title = title.replace(suffix, '')
+    return title.strip()
+
+
+def normalize_field(name):
+    """Canonical record key for a CSV column name"""
+    return name.strip().lower()
+
+
+def parse_record(fields, values):
+    """Turn the cells of one CSV row into a typed record"""
+    record = {field: value.strip() or None for field, value in zip(fields, values)}
+
+    for field in TEXT_FIELDS:
+        record[field] = record.get(field) or ''
+    for field in INT_FIELDS:
+        record[field] = to_int(record.get(field))
+
+    year = to_int(record.get('year'))
+    record['year'] = str(year) if year is not None else None
+    return record
+
+
+def is_story(record):
+    """True if a record is classified as a Story (any letter case)"""
+    return record['classification'].lower() == 'story'
+
+
+def read_csv_fields(csv_file):
+    """Return the normalised column names of a CSV file"""
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return [normalize_field(name) for name in header]
+
+
+def iter_csv_records(csv_file, stats=None):
+    """Yield a typed record for every row of a CSV file
+
+    If a stats dict is given it is filled with the row count and the
+    number of rows per classification as the file is read.
+    """
+    if stats is not None:
+        stats['rows'] = 0
+        stats['classifications'] = {}
+
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        fields = [normalize_field(name) for name in next(reader, [])]
+        for values in reader:
+            if not values:
+                continue  # Blank line
+            record = parse_record(fields, values)
+            if stats is not None:
+                stats['rows'] += 1
+                classification = record['classification']
+                stats['classifications'][classification] = stats['classifications'].get(classification, 0) + 1
+            yield record
+
+
+def iter_story_records(csv_file, stats=None):
+    """Yield the Story records of a CSV file with cleaned titles
+
+    The title as written in the CSV is kept under 'raw_title'.
+    """
+    for record in iter_csv_records(csv_file, stats):
+        if is_story(record):
+            record['raw_title'] = record['title']
+            record['title'] = clean_title(record['title'])
+            yield record
+
+
+def load_review_overrides(overrides_file=REVIEW_OVERRIDES_FILE):
+    """Load manual review decisions keyed by filepath or filename"""
+    if not os.path.exists(overrides_file):
+        return {}
+    with open(overrides_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_reviewed_csv(csv_file):
+    """Read classification decisions from a reviewed analysis CSV"""
+    overrides = {}
+    for record in iter_csv_records(csv_file):
+        key = record['filepath'] or record['filename']
+        if key and record['classification']:
+            overrides[key] = {'classification': record['classification'].title()}
+    return overrides
+
+
+def review_override(record, overrides):
+    """Return the review decision for a record; filepath keys win over filename keys"""
+    return overrides.get(record['filepath']) or overrides.get(record['filename'])
+
+
+def apply_review_override(record, override):
+    """Return a copy of a record with a review decision applied"""
+    record = dict(record)
+    record.update({field: override[field] for field in REVIEW_FIELDS if field in override})
+    return record
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Streaming Story Extractor
+=========================
+
+Extracts the same title, text, paragraphs and counts as
+story_cache.extract_story_content() without building a BeautifulSoup
+tree. The page goes through html.parser (the tokenizer BeautifulSoup
+uses with 'html.parser') once, and the tree-building rules that matter
+for the output are replayed on a stack of open tag names:
+
+    - end tags close the most recent open tag of that name, void tags
+      (br, img, meta, ...) close at once
+    - text inside script, style, template, rt and rp is not page text
+    - whitespace-only text runs collapse to one space or newline,
+      except inside pre and textarea
+    - the title is the first <title>, else the first <h1>, else <h2>
+    - paragraphs come from the first .story-body, else .story-content,
+      else <article>, without script, style, nav, .nav, .navigation,
+      .header, .footer, .tag and .story-tags inside it
+
+Input can be fed in chunks, so a file is read in CHUNK_SIZE pieces and
+only the extracted text is kept in memory.
+
+--verify runs both extractors over every file under stories/ and
+reports any file whose output differs, plus the time each one took.
+
+Usage:
+    content = extract_story_html(html)
+    content = extract_story_file('stories/2024/gift.html')
+    python story_extractor.py --verify [--chunk-size BYTES]
+"""
+
+import argparse
+import codecs
+import glob
+import re
+import time
+from html.entities import html5
+from html.parser import HTMLParser
+from story_cache import BOILERPLATE_LINES, clean_text, token_fields
+
+CHUNK_SIZE = 64 * 1024
+
+# Tree-building rules of BeautifulSoup's HTMLParserTreeBuilder
+VOID_TAGS = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame',
+             'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta',
+             'nextid', 'param', 'source', 'spacer', 'track', 'wbr'}
+STRING_CONTAINER_TAGS = {'rt', 'rp', 'style', 'script', 'template'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = ' \n\t\f\r'
+
+# Entity names with and without the trailing semicolon, first spelling wins
+ENTITIES = {}
+for _name, _character in sorted(html5.items()):
+    ENTITIES.setdefault(_name[:-1] if _name.endswith(';') else _name, _character)
+
+DECIMAL_REFERENCE = re.compile('^([0-9]+)(.*)')
+HEX_REFERENCE = re.compile('^([0-9a-f]+)(.*)')
+
+# Elements whose text becomes the title, in order of preference
+TITLE_TAGS = ['title', 'h1', 'h2']
+
+# Story body candidates in order of preference: (tag name, class)
+BODY_SELECTORS = [(None, 'story-body'), (None, 'story-content'), ('article', None)]
+
+# Elements removed from inside the story body
+EXCLUDED_TAGS = {'script', 'style', 'nav'}
+EXCLUDED_CLASSES = {'story-tags', 'tag', 'nav', 'navigation', 'header', 'footer'}
+
+
+def character_reference(name):
+    """Return the text for &#name; and any trailing characters that were not part of it"""
+    base, pattern = 10, DECIMAL_REFERENCE
+    if name[:1] in ('x', 'X'):
+        name, base, pattern = name[1:], 16, HEX_REFERENCE
+    try:
+        number, extra = int(name, base), ''
+    except ValueError:
+        match = pattern.match(name)
+        if match is None:
+            return '', name
+        number, extra = int(match.group(1), base), match.group(2)
+
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return '\ufffd', extra
+    if 0x80 <= number <= 0x9F:
+        # Windows-1252 bytes written as character references
+        try:
+            return bytes([number]).decode('cp1252'), extra
+        except UnicodeDecodeError:
+            pass
+    return chr(number), extra
+
+
+def new_capture(exclude):
+    """State for the text of one element of interest"""
+    return {'start': None, 'done': False, 'excluded_at': None, 'exclude': exclude, 'parts': []}
+
+
+class StoryExtractor(HTMLParser):
+    """html.parser handler collecting story text without a tree
+
+    Call feed() with each piece of the page, then close() and result().
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+        self.open_counts = {}
+        self.closed_void_tags = []
+        self.container_depth = 0
+        self.preserve_depth = 0
+        self.run = []
+        self.text = []
+        self.titles = {tag: new_capture(False) for tag in TITLE_TAGS}
+        self.bodies = [new_capture(True) for _ in BODY_SELECTORS]
+        self.active = []
+
+    def updatepos(self, i, j):
+        # Line and column numbers are never read, skip counting them
+        return j
+
+    # Text runs
+
+    def flush(self, kind='text'):
+        """End the current text run and hand it to every open capture"""
+        if not self.run:
+            return
+        data = ''.join(self.run)
+        self.run = []
+        if not self.preserve_depth and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+
+        if kind == 'cdata' or (kind == 'text' and not self.container_depth):
+            self.text.append(data)
+            for capture in self.active:
+                if capture['excluded_at'] is None:
+                    capture['parts'].append(data)
+
+    def handle_data(self, data):
+        self.run.append(data)
+
+    def handle_entityref(self, name):
+        self.run.append(ENTITIES.get(name, '&' + name))
+
+    def handle_charref(self, name):
+        character, extra = character_reference(name)
+        self.run.append(character)
+        self.run.append(extra)
+
+    def handle_comment(self, data):
+        self.flush()
+        self.run.append(data)
+        self.flush('comment')
+
+    def handle_decl(self, decl):
+        self.flush()
+        self.run.append(decl)
+        self.flush('doctype')
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith('CDATA['):
+            self.run.append(data[len('CDATA['):])
+            self.flush('cdata')
+        else:
+            self.run.append(data)
+            self.flush('declaration')
+
+    def handle_pi(self, data):
+        self.flush()
+        self.run.append(data)
+        self.flush('pi')
+
+    # Tags
+
+    def push(self, tag, attrs):
+        """Open an element and start or exclude captures it matches"""
+        self.flush()
+        index = len(self.stack)
+        self.stack.append(tag)
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_depth += 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+
+        classes = ()
+        for name, value in attrs:
+            if name == 'class':
+                classes = (value or '').split()
+
+        if self.active and (tag in EXCLUDED_TAGS or not EXCLUDED_CLASSES.isdisjoint(classes)):
+            for capture in self.active:
+                if capture['exclude'] and capture['excluded_at'] is None:
+                    capture['excluded_at'] = index
+
+        title = self.titles.get(tag)
+        if title is not None and title['start'] is None:
+            title['start'] = index
+            self.active.append(title)
+
+        if tag not in ('script', 'style'):
+            for (selector_tag, selector_class), body in zip(BODY_SELECTORS, self.bodies):
+                if body['start'] is None and (tag == selector_tag or selector_class in classes):
+                    body['start'] = index
+                    self.active.append(body)
+
+    def pop(self):
+        """Close the innermost open element"""
+        index = len(self.stack) - 1
+        tag = self.stack.pop()
+        self.open_counts[tag] -= 1
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_depth -= 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+
+        closed = False
+        for capture in self.active:
+            if capture['excluded_at'] == index:
+                capture['excluded_at'] = None
+            if capture['start'] == index:
+                capture['done'] = closed = True
+        if closed:
+            self.active = [capture for capture in self.active if not capture['done']]
+
+    def close_tag(self, tag):
+        """Close the most recent open element named tag and everything inside it"""
+        self.flush()
+        if not self.open_counts.get(tag):
+            return
+        while self.stack[-1] != tag:
+            self.pop()
+        self.pop()
+
+    def handle_starttag(self, tag, attrs):
+        self.push(tag, attrs)
+        if tag in VOID_TAGS:
+            self.close_tag(tag)
+            self.closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.push(tag, attrs)
+        self.close_tag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            # The end tag of a void element that was already closed
+            self.closed_void_tags.remove(tag)
+        else:
+            self.close_tag(tag)
+
+    # Result
+
+    def close(self):
+        super().close()
+        self.flush()
+
+    def result(self):
+        """Return title, cleaned text, paragraphs and counts of the page fed so far"""
+        title = ''
+        for tag in TITLE_TAGS:
+            if self.titles[tag]['start'] is not None:
+                title = ''.join(self.titles[tag]['parts']).strip()
+                break
+
+        paragraphs = []
+        for body in self.bodies:
+            if body['start'] is not None:
+                lines = (line.strip() for line in ''.join(body['parts']).split('\n'))
+                paragraphs = [line for line in lines
+                              if line and not any(boilerplate in line for boilerplate in BOILERPLATE_LINES)]
+                break
+
+        text = clean_text(''.join(self.text))
+        return {
+            'title': title,
+            'text': text,
+            'paragraphs': paragraphs,
+            'text_length': len(text),
+            **token_fields(text)
+        }
+
+
+def extract_story_html(html_content):
+    """Extract title, cleaned text, paragraphs and counts from page HTML in one pass"""
+    extractor = StoryExtractor()
+    extractor.feed(html_content)
+    extractor.close()
+    return extractor.result()
+
+
+def extract_story_file(file_path, chunk_size=CHUNK_SIZE):
+    """Extract a story file, reading and parsing it chunk_size bytes at a time"""
+    extractor = StoryExtractor()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            extractor.feed(decoder.decode(chunk, final=not chunk))
+            if not chunk:
+                break
+    extractor.close()
+    return extractor.result()
+
+
+def verify_archive(pattern='stories/*/*.html', chunk_size=CHUNK_SIZE):
+    """Compare the streaming extractor with BeautifulSoup on every archived file"""
+    from story_cache import parse_with_bs4
+
+    files = sorted(glob.glob(pattern))
+    print(f"🔍 Comparing extractors on {len(files)} files...")
+    timings = {'bs4': 0.0, 'stream': 0.0}
+    mismatches = []
+
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            html_content = f.read().decode('utf-8')
+
+        started = time.perf_counter()
+        expected = parse_with_bs4(html_content)
+        timings['bs4'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = extract_story_file(file_path, chunk_size)
+        timings['stream'] += time.perf_counter() - started
+
+        fields = [field for field in expected if expected[field] != actual.get(field)]
+        if fields:
+            mismatches.append((file_path, fields))
+            print(f"❌ {file_path}: {', '.join(fields)} differ")
+
+    speedup = timings['bs4'] / timings['stream'] if timings['stream'] else 0
+    print(f"\nBeautifulSoup: {timings['bs4']:.2f}s, streaming: {timings['stream']:.2f}s "
+          f"({speedup:.1f}x faster)")
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(files)} files differ")
+    else:
+        print(f"✅ All {len(files)} files extract identically")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming story text extractor")
+    parser.add_argument('--verify', action='store_true',
+                        help="compare with the BeautifulSoup extractor over stories/")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="bytes read and parsed at a time")
+    parser.add_argument('files', nargs='*', help="story files to extract")
+    args = parser.parse_args()
+
+    if args.verify:
+        raise SystemExit(0 if verify_archive(chunk_size=args.chunk_size) else 1)
+    for path in args.files:
+        content = extract_story_file(path, args.chunk_size)
+        print(f"{path}: {content['title']} ({content['word_count']} words, "
+              f"{len(content['paragraphs'])} paragraphs)")
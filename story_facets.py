@@ -0,0 +1,155 @@
+"""
+Catalog Facets
+==============
+
+Filter and sort data for the site, computed when the catalog is
+published so the browser never re-runs predicates over every story or
+re-sorts them when a filter changes.
+
+Stories are numbered in shard order: years newest first, as listed in
+catalog/manifest.json, then the entries of each year shard. A story's
+number is the count of every earlier year plus its row in its shard.
+
+catalog/facets.json:
+
+    {
+      "version": 1,
+      "count": 400,
+      "bitmaps": {
+        "year": {"2025": "<base64>", ...},
+        "category": {"family": "<base64>", ...},
+        "length": {"short": "<base64>", "long": "<base64>"}
+      },
+      "lengths": [0, 1, ...],                 # LENGTH_BUCKETS index per story
+      "sorts": {"newest": [17, 3, ...], "oldest": [...], "title": [...]}
+    }
+
+Every entry carries its category as "site_category", an index into
+SITE_CATEGORIES (0 is general), scored here by story_category() from
+the story's cleaned body and its title (story_categories.py sets it on
+catalog entries) so the browser never matches keywords. A category scores its keyword hits per 1000 words of body
+plus TITLE_WEIGHT per hit in the title; the best score of at least
+MIN_SCORE wins, earlier categories winning ties. One title hit is
+enough, as when categories came from titles alone.
+
+A bitmap has bit i (byte i // 8, bit i % 8) set when story i has that
+value, padded to a multiple of 4 bytes so script.js can intersect them
+as Uint32Arrays. A sort order is the list of story numbers in display
+order; titles are ordered by telugu_tokenizer.collation_key().
+
+Usage:
+    code = story_category(title, text)
+    facets = build_facets(by_year)
+"""
+
+import base64
+import functools
+from telugu_tokenizer import collation_key, compile_keywords, count_keywords, token_text
+
+FACETS_VERSION = 1
+
+# Length buckets by text_length, as the site labels them
+LENGTH_BUCKETS = ['short', 'long']
+SHORT_TEXT_LENGTH = 1000
+
+# Site categories and their keywords, highest priority first. Words
+# common in any story (చిన్న small, విషయం matter, శ్రీ as an honorific)
+# are left out, since they are matched on the whole body.
+CATEGORY_KEYWORDS = [
+    ('family', ['అమ్మ', 'నాన్న', 'తల్లి', 'తండ్రి', 'కుటుంబ', 'పెళ్లి', 'వివాహ', 'అల్లుడు', 'కోడలు',
+                'వదిన', 'family', 'mother', 'father']),
+    ('spiritual', ['దేవుడు', 'భగవాన్', 'భగవంతుడు', 'దేవ', 'దేవి', 'పూజ', 'ప్రార్థన', 'మంత్ర', 'స్తోత్ర',
+                   'గణేశ', 'విష్ణు', 'శివ', 'భక్తి', 'గుడి', 'temple', 'spiritual', 'prayer']),
+    ('travel', ['ప్రయాణ', 'యాత్ర', 'ట్రిప్', 'విమాన', 'రైలు', 'బస్', 'travel', 'trip', 'journey']),
+    ('kids', ['పిల్లల', 'పిల్లవాడు', 'బాలుడు', 'పాప', 'బుడ్డి', 'అబ్బాయి', 'అమ్మాయి', 'kids', 'children',
+              'child']),
+    ('philosophical', ['జీవిత', 'తత్వ', 'జ్ఞాన', 'అనుభవ', 'lesson', 'wisdom', 'philosophical',
+                       'philosophy', 'meaning'])
+]
+CATEGORY_MATCHERS = [compile_keywords(words) for _, words in CATEGORY_KEYWORDS]
+DEFAULT_CATEGORY = 'general'
+SITE_CATEGORIES = [DEFAULT_CATEGORY] + [category for category, _ in CATEGORY_KEYWORDS]
+
+MIN_SCORE = 4
+TITLE_WEIGHT = MIN_SCORE
+
+# Categories kept in memory, so a long-running build (build_pipeline.py
+# --watch) only scores stories that changed
+CATEGORY_MEMO_SIZE = 4096
+
+# Dates of entries without one sort as the oldest
+MISSING_DATE = '1900-01-01'
+
+
+@functools.lru_cache(maxsize=CATEGORY_MEMO_SIZE)
+def story_category(title, text):
+    """SITE_CATEGORIES index of a story from its title and cleaned body text"""
+    title_tokens = token_text(title)
+    body_tokens = token_text(text)
+    words = body_tokens.count(' ') + 1 if body_tokens else 0
+
+    scores = []
+    for matcher in CATEGORY_MATCHERS:
+        score = TITLE_WEIGHT * sum(count_keywords(matcher, title_tokens).values())
+        if words:
+            score += sum(count_keywords(matcher, body_tokens).values()) * 1000 / words
+        scores.append(score)
+
+    best = max(range(len(scores)), key=lambda index: (scores[index], -index))
+    return best + 1 if scores[best] >= MIN_SCORE else 0
+
+
+def length_bucket(entry):
+    """LENGTH_BUCKETS index of an entry; entries without a text_length count as long"""
+    text_length = entry.get('text_length')
+    return 0 if isinstance(text_length, int) and text_length < SHORT_TEXT_LENGTH else 1
+
+
+def encode_bitmap(numbers, count):
+    """Base64 bitmap with the given story numbers set"""
+    bitmap = bytearray((count + 31) // 32 * 4)
+    for number in numbers:
+        bitmap[number >> 3] |= 1 << (number & 7)
+    return base64.b64encode(bitmap).decode('ascii')
+
+
+def shard_entries(by_year):
+    """(year, entry) pairs in story number order: years newest first, then shard order"""
+    return [(year, entry) for year in sorted(by_year, reverse=True) for entry in by_year[year]]
+
+
+def sort_orders(entries):
+    """Story numbers of each sort order for (year, entry) pairs in story number order"""
+    # Stable sorts, so ties keep shard order
+    count = len(entries)
+    dates = [entry.get('created_date') or entry.get('date') or MISSING_DATE for _, entry in entries]
+    titles = [collation_key(entry.get('title') or '') for _, entry in entries]
+    return {
+        'newest': sorted(range(count), key=dates.__getitem__, reverse=True),
+        'oldest': sorted(range(count), key=dates.__getitem__),
+        'title': sorted(range(count), key=titles.__getitem__)
+    }
+
+
+def build_facets(by_year):
+    """Facet bitmaps, length buckets and sort orders for a dict of year -> entries with site_category set"""
+    entries = shard_entries(by_year)
+    count = len(entries)
+
+    values = {'year': {}, 'category': {}, 'length': {}}
+    lengths = []
+    for number, (year, entry) in enumerate(entries):
+        bucket = length_bucket(entry)
+        lengths.append(bucket)
+        values['year'].setdefault(year, []).append(number)
+        values['category'].setdefault(SITE_CATEGORIES[entry.get('site_category', 0)], []).append(number)
+        values['length'].setdefault(LENGTH_BUCKETS[bucket], []).append(number)
+
+    return {
+        'version': FACETS_VERSION,
+        'count': count,
+        'bitmaps': {facet: {value: encode_bitmap(numbers, count) for value, numbers in sorted(found.items())}
+                    for facet, found in values.items()},
+        'lengths': lengths,
+        'sorts': sort_orders(entries)
+    }
@@ -0,0 +1,141 @@
+"""
+Story File Manifest
+===================
+
+Keeps a persistent record of every analysed story file (path, size,
+mtime, content hash and its last classification) so that
+comprehensive_story_analysis.py only re-processes files that were
+added, changed or deleted since the previous run.
+
+The merged results of the latest run are written to a stable CSV
+(ANALYSIS_CSV) so the downstream scripts no longer have to hunt for the
+newest timestamped file.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = '.story-manifest.json'
+ANALYSIS_CSV = 'detailed_story_analysis_latest.csv'
+
+
+def file_hash(file_path):
+    """Return the hex SHA-256 digest of a file"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def find_analysis_csv():
+    """Return the stable analysis CSV, falling back to the newest timestamped one"""
+    if os.path.exists(ANALYSIS_CSV):
+        return ANALYSIS_CSV
+    candidates = sorted(glob.glob('detailed_story_analysis_*.csv'))
+    return candidates[-1] if candidates else None
+
+
+def load_manifest(version, manifest_file=MANIFEST_FILE):
+    """Load the manifest; a different classifier version forces a full rescan"""
+    entries = {}
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                entries = data.get('files', {})
+            else:
+                print("Classifier version changed, re-analysing every file")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {manifest_file}: {e}")
+
+    return {
+        'file': manifest_file,
+        'version': version,
+        'entries': entries,
+        'seen': set(),
+        'delta': {'added': [], 'changed': [], 'deleted': [], 'reclassified': []}
+    }
+
+
+def lookup_file(manifest, filepath):
+    """Return the previous result for an unchanged file, or None if it must be re-analysed"""
+    manifest['seen'].add(filepath)
+    entry = manifest['entries'].get(filepath)
+    if entry is None:
+        manifest['delta']['added'].append(filepath)
+        return None
+
+    # Files that failed last time are retried quietly; only a different outcome is reported
+    if entry['result']['classification'] == 'Error':
+        return None
+
+    stat = os.stat(filepath)
+    if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+        return entry['result']
+
+    # Touched but possibly identical (e.g. after a git checkout)
+    if entry['size'] == stat.st_size and entry['hash'] == file_hash(filepath):
+        entry['mtime'] = stat.st_mtime_ns
+        return entry['result']
+
+    manifest['delta']['changed'].append(filepath)
+    return None
+
+
+def record_file(manifest, filepath, result):
+    """Store a freshly analysed result, or an Error result, in the manifest"""
+    previous = manifest['entries'].get(filepath)
+    if previous and previous['result']['classification'] != result['classification']:
+        manifest['delta']['reclassified'].append(
+            (filepath, previous['result']['classification'], result['classification'])
+        )
+
+    try:
+        stat = os.stat(filepath)
+        digest = file_hash(filepath)
+    except OSError:
+        if result['classification'] != 'Error':
+            raise
+        # Unreadable: keep the error so the next run does not report the file as added
+        stat, digest = None, None
+    manifest['entries'][filepath] = {
+        'size': stat.st_size if stat else None,
+        'mtime': stat.st_mtime_ns if stat else None,
+        'hash': digest,
+        'result': result
+    }
+
+
+def finish_scan(manifest):
+    """Drop files that disappeared since the last run and return the delta"""
+    for filepath in sorted(set(manifest['entries']) - manifest['seen']):
+        manifest['delta']['deleted'].append(filepath)
+        del manifest['entries'][filepath]
+    return manifest['delta']
+
+
+def save_manifest(manifest):
+    """Write the manifest atomically"""
+    tmp_file = manifest['file'] + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': manifest['version'], 'files': manifest['entries']},
+                  f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, manifest['file'])
+
+
+def print_delta_report(delta):
+    """Print what changed since the previous run"""
+    print(f"\n=== CHANGES SINCE LAST RUN ===")
+    print(f"Added: {len(delta['added'])}")
+    print(f"Changed: {len(delta['changed'])}")
+    print(f"Deleted: {len(delta['deleted'])}")
+    print(f"Reclassified: {len(delta['reclassified'])}")
+
+    for label in ['added', 'changed', 'deleted']:
+        for filepath in delta[label][:10]:  # Show first 10
+            print(f"  [{label}] {filepath}")
+        if len(delta[label]) > 10:
+            print(f"  ... and {len(delta[label]) - 10} more {label}")
+    for filepath, old, new in delta['reclassified']:
+        print(f"  [reclassified] {filepath}: {old} -> {new}")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Packed Story Corpus
+===================
+
+Analysis experiments (classifier and categorizer tweaks) re-read every
+file under stories/ on each run, and opening hundreds of small files
+costs more than the text itself on networked or container filesystems.
+This module writes the cleaned text of every story into one pack file
+and reads it back through mmap:
+
+    header      magic, version, flags, story count, section offsets
+    dictionary  zlib preset dictionary (empty when not compressed)
+    records     one record per story: UTF-8 text, or that text
+                compressed on its own with the preset dictionary
+    offsets     count + 1 little-endian uint64 record offsets
+    index       JSON: story ids (site paths), titles and word counts
+
+Records are compressed one at a time so any story can be read without
+the others. Short texts compress poorly on their own, so the preset
+dictionary is trained on the corpus: the Telugu words and word pairs
+that save the most bytes, most valuable last (closest to the data).
+
+StoryPack gives random access by story id. raw() returns a memoryview
+of the mapped file (no copy), text() decodes one story, and iterating
+the pack walks every story in order.
+
+Usage:
+    python story_pack.py [--compress] [--out stories.pack] [--jobs N]
+    python story_pack.py --scan [--out stories.pack]
+
+    with StoryPack('stories.pack') as pack:
+        text = pack.text('stories/2024/gift.html')
+        for story_id, text in pack.items(): ...
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from story_cache import get_story_contents, load_parse_cache, save_parse_cache
+from telugu_tokenizer import tokenize
+
+PACK_FILE = 'stories.pack'
+PACK_MAGIC = b'TSPK'
+PACK_VERSION = 1
+
+FLAG_COMPRESSED = 1
+
+# magic, version, flags, count, dictionary length, offsets position, index position, index length
+HEADER = struct.Struct('<4sHHIIQQQ')
+
+# zlib only looks back 32 KB, a longer dictionary would not be used
+DICTIONARY_SIZE = 32 * 1024
+DICTIONARY_SAMPLE = 2000
+COMPRESS_LEVEL = 9
+
+
+def train_dictionary(texts, size=DICTIONARY_SIZE, sample=DICTIONARY_SAMPLE):
+    """Build a zlib preset dictionary from the words and word pairs that repeat most"""
+    step = max(1, len(texts) // sample)
+    counts = {}
+    for text in texts[::step]:
+        words = text.split()
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for first, second in zip(words, words[1:]):
+            pair = first + ' ' + second
+            counts[pair] = counts.get(pair, 0) + 1
+
+    # Bytes a string saves: every repeat after the first becomes a back-reference
+    scored = [(count * len(phrase.encode('utf-8')), phrase)
+              for phrase, count in counts.items() if count > 1]
+    scored.sort(reverse=True)
+
+    chosen, used = [], 0
+    for _, phrase in scored:
+        data = phrase.encode('utf-8') + b' '
+        if used + len(data) > size:
+            continue
+        chosen.append(data)
+        used += len(data)
+    # zlib reaches the end of the dictionary most cheaply, so the best phrases go last
+    return b''.join(reversed(chosen))
+
+
+def compress_record(data, dictionary):
+    """Compress one record on its own with the preset dictionary"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, zdict=dictionary)
+    return compressor.compress(data) + compressor.flush()
+
+
+def write_pack(stories, pack_file=PACK_FILE, compress=False):
+    """Write (story id, title, text) tuples to a pack file; return its size in bytes"""
+    texts = [text for _, _, text in stories]
+    dictionary = train_dictionary(texts) if compress and texts else b''
+
+    records, offsets = [], [HEADER.size + len(dictionary)]
+    for text in texts:
+        data = text.encode('utf-8')
+        if compress:
+            data = compress_record(data, dictionary)
+        records.append(data)
+        offsets.append(offsets[-1] + len(data))
+
+    index = json.dumps({
+        'ids': [story_id for story_id, _, _ in stories],
+        'titles': [title for _, title, _ in stories],
+        'word_counts': [len(tokenize(text)) for text in texts]
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    offsets_position = offsets[-1]
+    index_position = offsets_position + 8 * len(offsets)
+    header = HEADER.pack(PACK_MAGIC, PACK_VERSION, FLAG_COMPRESSED if compress else 0,
+                         len(stories), len(dictionary), offsets_position, index_position, len(index))
+
+    tmp_file = pack_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(header)
+        f.write(dictionary)
+        for data in records:
+            f.write(data)
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        f.write(index)
+    os.replace(tmp_file, pack_file)
+    return index_position + len(index)
+
+
+class StoryPack:
+    """Read-only, memory-mapped view of a pack file
+
+    Use as a context manager, or call close() when done; memoryviews
+    returned by raw() must be released before the pack is closed.
+    """
+
+    def __init__(self, pack_file=PACK_FILE):
+        self.file = open(pack_file, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+        (magic, version, flags, count, dictionary_length,
+         offsets_position, index_position, index_length) = HEADER.unpack_from(self.map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"{pack_file} is not a version {PACK_VERSION} story pack")
+
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.dictionary = bytes(self.view[HEADER.size:HEADER.size + dictionary_length])
+        self.offsets = struct.unpack_from(f'<{count + 1}Q', self.map, offsets_position)
+        index = json.loads(bytes(self.view[index_position:index_position + index_length]))
+        self.ids = index['ids']
+        self.titles = index['titles']
+        self.word_counts = index['word_counts']
+        self.positions = {story_id: position for position, story_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, story_id):
+        return story_id in self.positions
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the view and unmap the file"""
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        self.map.close()
+        self.file.close()
+
+    def raw(self, story_id):
+        """Stored bytes of a story as a memoryview of the mapped file (compressed if the pack is)"""
+        position = self.positions[story_id]
+        return self.view[self.offsets[position]:self.offsets[position + 1]]
+
+    def decode(self, data):
+        """Text of a stored record"""
+        if self.compressed:
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=self.dictionary)
+            data = decompressor.decompress(data) + decompressor.flush()
+        return str(data, 'utf-8')
+
+    def text(self, story_id):
+        """Cleaned text of a story"""
+        with self.raw(story_id) as data:
+            return self.decode(data)
+
+    def title(self, story_id):
+        """Title of a story"""
+        return self.titles[self.positions[story_id]]
+
+    def items(self):
+        """Yield (story id, text) for every story in pack order"""
+        for story_id in self.ids:
+            yield story_id, self.text(story_id)
+
+
+def build_pack(pack_file=PACK_FILE, compress=False, jobs=1, pattern='stories/*/*.html'):
+    """Extract every story (through the parse cache) and write the pack"""
+    file_paths = sorted(glob.glob(pattern))
+    cache = load_parse_cache()
+    stories, raw_size = [], 0
+    for path, (content, error) in zip(file_paths, get_story_contents(file_paths, cache, jobs)):
+        if error:
+            print(f"❌ Skipping {path}: {error}")
+            continue
+        stories.append((path, content['title'], content['text']))
+        raw_size += len(content['text'].encode('utf-8'))
+    save_parse_cache(cache)
+
+    size = write_pack(stories, pack_file, compress)
+    ratio = size / raw_size * 100 if raw_size else 0
+    print(f"📦 Packed {len(stories)} stories into {pack_file}: {size / 1024:.0f} KB "
+          f"({raw_size / 1024:.0f} KB of text, {ratio:.0f}%{', zlib + preset dictionary' if compress else ''})")
+    return size
+
+
+def scan_pack(pack_file=PACK_FILE):
+    """Time decoding and classifying every story straight from the pack"""
+    from comprehensive_story_analysis import analyze_content_type
+
+    with StoryPack(pack_file) as pack:
+        started = time.perf_counter()
+        total = sum(len(text) for _, text in pack.items())
+        decoded = time.perf_counter() - started
+
+        started = time.perf_counter()
+        counts = {}
+        for story_id, text in pack.items():
+            classification, _, _ = analyze_content_type(text, pack.title(story_id), os.path.basename(story_id))
+            counts[classification] = counts.get(classification, 0) + 1
+        classified = time.perf_counter() - started
+
+    print(f"📖 Decoded {len(pack)} stories ({total} characters) in {decoded * 1000:.1f} ms")
+    print(f"🏷️  Classified them in {classified * 1000:.1f} ms: "
+          + ', '.join(f"{name} {count}" for name, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack the cleaned text of every story into one mmap-able file")
+    parser.add_argument('--out', default=PACK_FILE, help="pack file to write or read")
+    parser.add_argument('--compress', action='store_true',
+                        help="zlib-compress each story with a preset dictionary trained on the corpus")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for HTML parsing")
+    parser.add_argument('--scan', action='store_true',
+                        help="time reading and classifying every story from an existing pack")
+    args = parser.parse_args()
+
+    if args.scan:
+        if not os.path.exists(args.out):
+            sys.exit(f"❌ {args.out} not found, build it first with: python story_pack.py")
+        scan_pack(args.out)
+    else:
+        build_pack(args.out, args.compress, args.jobs)
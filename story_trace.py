@@ -0,0 +1,116 @@
+"""
+Analysis Timing Trace
+=====================
+
+Optional instrumentation for comprehensive_story_analysis.py --trace.
+Every step of every file (read, BeautifulSoup parse, text extraction,
+classification) is recorded with its wall time and peak allocation
+(tracemalloc), then exported in the Chrome trace event format, which
+opens in chrome://tracing, https://ui.perfetto.dev or speedscope.
+
+Each file appears as one "file" span with its steps nested inside, and
+the summary lists the slowest files and the time spent in each stage.
+
+Usage:
+    trace = start_trace()
+    data = trace_step(trace, 'read', path, read_file, path)
+    ...
+    finish_trace(trace)
+    save_chrome_trace(trace, 'analysis-trace.json')
+    print_trace_summary(trace, top=10)
+"""
+
+import json
+import time
+import tracemalloc
+
+
+def start_trace():
+    """Start recording; allocation tracking stays on until finish_trace()"""
+    tracemalloc.start()
+    return {'origin': time.perf_counter(), 'events': [], 'files': {}, 'stages': {}}
+
+
+def _microseconds(trace, moment):
+    """Offset of a perf_counter() reading from the start of the trace"""
+    return round((moment - trace['origin']) * 1e6, 1)
+
+
+def trace_step(trace, stage, filepath, function, *args):
+    """Run function(*args) as one step of a file, recording time and peak allocation"""
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        ended = time.perf_counter()
+        allocated = tracemalloc.get_traced_memory()[1] - base
+        duration = ended - started
+
+        trace['events'].append({
+            'name': stage, 'cat': 'stage', 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': _microseconds(trace, started), 'dur': round(duration * 1e6, 1),
+            'args': {'file': filepath, 'peak_alloc_kb': round(allocated / 1024, 1)}
+        })
+
+        record = trace['files'].setdefault(filepath, {
+            'start': started, 'end': ended, 'seconds': 0.0, 'bytes': 0, 'stages': {}
+        })
+        record['end'] = ended
+        record['seconds'] += duration
+        record['stages'][stage] = record['stages'].get(stage, 0.0) + duration
+
+        totals = trace['stages'].setdefault(stage, {'seconds': 0.0, 'count': 0, 'max': 0.0,
+                                                    'peak_alloc': 0})
+        totals['seconds'] += duration
+        totals['count'] += 1
+        totals['max'] = max(totals['max'], duration)
+        totals['peak_alloc'] = max(totals['peak_alloc'], allocated)
+
+
+def trace_file_size(trace, filepath, size):
+    """Record the size of a traced file for the summary"""
+    if filepath in trace['files']:
+        trace['files'][filepath]['bytes'] = size
+
+
+def finish_trace(trace):
+    """Stop allocation tracking and add one enclosing span per file"""
+    tracemalloc.stop()
+    for filepath, record in trace['files'].items():
+        trace['events'].append({
+            'name': 'file', 'cat': 'file', 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': _microseconds(trace, record['start']),
+            'dur': round((record['end'] - record['start']) * 1e6, 1),
+            'args': {'file': filepath, 'bytes': record['bytes']}
+        })
+    trace['events'].sort(key=lambda event: (event['ts'], -event['dur']))
+
+
+def save_chrome_trace(trace, trace_file):
+    """Write the events in the Chrome trace event format"""
+    with open(trace_file, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace['events'], 'displayTimeUnit': 'ms'},
+                  f, ensure_ascii=False, separators=(',', ':'))
+    print(f"\nTiming trace saved to: {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
+
+
+def print_trace_summary(trace, top=10):
+    """Print the slowest files and the time spent in each stage"""
+    total = sum(record['seconds'] for record in trace['files'].values())
+
+    print(f"\n=== SLOWEST STAGES ===")
+    print(f"{'stage':<10}{'total s':>10}{'share':>8}{'mean ms':>10}{'max ms':>10}{'peak alloc KB':>15}")
+    for stage, totals in sorted(trace['stages'].items(), key=lambda item: -item[1]['seconds']):
+        share = totals['seconds'] / total * 100 if total else 0
+        mean = totals['seconds'] / totals['count'] * 1000
+        print(f"{stage:<10}{totals['seconds']:>10.3f}{share:>7.1f}%{mean:>10.2f}"
+              f"{totals['max'] * 1000:>10.2f}{totals['peak_alloc'] / 1024:>15.0f}")
+
+    print(f"\n=== SLOWEST {top} FILES ===")
+    slowest = sorted(trace['files'].items(), key=lambda item: -item[1]['seconds'])[:top]
+    for filepath, record in slowest:
+        stage, seconds = max(record['stages'].items(), key=lambda item: item[1])
+        print(f"  {record['seconds'] * 1000:8.1f} ms  {record['bytes'] / 1024:7.0f} KB  "
+              f"{filepath} (mostly {stage}: {seconds * 1000:.1f} ms)")
@@ -0,0 +1,178 @@
+"""
+Story File Watcher
+==================
+
+Reports story HTML files that are created, written, renamed or deleted
+under stories/, for build_pipeline.py --watch.
+
+On Linux the kernel's inotify interface is used through ctypes (no
+extra package): the stories/ directory and every year directory are
+watched, new year directories are picked up as they appear, and a file
+is reported once it is closed after writing or moved into place (so an
+editor's save-to-temp-and-rename is one change, not a half-written
+file). Elsewhere, or if inotify is unavailable, the tree is polled and
+files whose size or mtime changed are reported.
+
+watch_changes() debounces: after the first change it keeps collecting
+until nothing has changed for `debounce` seconds, then yields the whole
+batch, so saving many files at once triggers one rebuild.
+
+Usage:
+    for paths in watch_changes('stories', debounce=0.2):
+        rebuild(paths)
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import os
+import select
+import struct
+import time
+
+STORY_SUFFIX = '.html'
+POLL_INTERVAL = 0.5
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Change source backed by inotify"""
+
+    name = 'inotify'
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.directories = {}
+        self.add_directory(root)
+        for entry in sorted(os.scandir(root), key=lambda entry: entry.name):
+            if entry.is_dir():
+                self.add_directory(entry.path)
+
+    def add_directory(self, path):
+        """Start watching a directory"""
+        descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if descriptor < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {path}')
+        self.directories[descriptor] = path
+
+    def changes(self, timeout=None):
+        """Wait up to timeout seconds (forever if None) and return the story files that changed"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+
+                directory = self.directories.get(descriptor)
+                if directory is None:
+                    continue
+                if mask & IN_DELETE_SELF:
+                    del self.directories[descriptor]
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files may have landed before the watch existed
+                        self.add_directory(path)
+                        changed.update(glob.glob(os.path.join(path, '*' + STORY_SUFFIX)))
+                elif name.endswith(STORY_SUFFIX) and not mask & IN_CREATE:
+                    # A created file is reported when it is closed after writing
+                    changed.add(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Change source that compares size and mtime of every story file"""
+
+    name = 'polling'
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.pattern = os.path.join(root, '*', '*' + STORY_SUFFIX)
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        """Size and mtime of every story file"""
+        snapshot = {}
+        for path in glob.glob(self.pattern):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout=None):
+        """Poll until something changed or timeout seconds passed; return the changed files"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+            snapshot = self.take_snapshot()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root, poll=False):
+    """Return an inotify watcher for root, or a polling one if asked or inotify is unavailable"""
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), polling every {POLL_INTERVAL}s instead")
+    return PollingWatcher(root)
+
+
+def watch_changes(root, debounce=0.2, poll=False):
+    """Yield sets of changed story files, each batch closed by `debounce` quiet seconds"""
+    watcher = open_watcher(root, poll)
+    print(f"👀 Watching {root}/ ({watcher.name})")
+    try:
+        while True:
+            changed = watcher.changes()
+            while True:
+                more = watcher.changes(debounce)
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                yield changed
+    finally:
+        watcher.close()
@@ -0,0 +1,186 @@
+// Service worker: serves the site cache-first from the content hashes in
+// precache-manifest.json (build_precache_manifest.py). Returning readers
+// get the list and every story they have read without a request, offline
+// too. Files are cached under their path and hash, so a new build is
+// fetched next to the old one: each visit looks for a new manifest and
+// precaches it, and the next visit switches to it and drops the files only
+// the old build used. Every page load is served from one build.
+
+// Bump when the cache key format changes; older caches are deleted on activate
+const CACHE_NAME = 'ravi-gari-kathalu-v2';
+const MANIFEST_FILE = 'precache-manifest.json';
+// Manifest format, kept in step with PRECACHE_VERSION in build_precache_manifest.py
+const MANIFEST_VERSION = 1;
+
+// Hash of every managed path in the manifest pages are served from, and in
+// a newer one waiting for the next navigation (null if there is none)
+let manifestsPromise = null;
+let syncPromise = null;
+
+self.addEventListener('install', event => {
+    event.waitUntil(syncManifest().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const path = assetPath(request.url);
+    if (path === null || path === MANIFEST_FILE) return;
+
+    if (request.mode === 'navigate') {
+        // A new page switches to the build found on an earlier visit, then
+        // checks for a newer one; the page and what it loads share a build
+        const ready = switchManifest().catch(error => console.warn('Manifest switch failed:', error));
+        event.respondWith(ready.then(() => cacheFirst(path, request)));
+        event.waitUntil(ready.then(syncManifest).catch(error => console.warn('Manifest check failed:', error)));
+        return;
+    }
+    event.respondWith(cacheFirst(path, request));
+});
+
+// Path of a same-origin URL relative to the worker's scope, as written in
+// the manifest (decoded, no query), or null outside the scope
+function assetPath(url) {
+    const scope = new URL(self.registration.scope);
+    const target = new URL(url);
+    if (target.origin !== scope.origin || !target.pathname.startsWith(scope.pathname)) return null;
+    const path = decodeURIComponent(target.pathname.slice(scope.pathname.length));
+    return path === '' ? 'index.html' : path;
+}
+
+function assetUrl(path) {
+    return new URL(path.split('/').map(encodeURIComponent).join('/'), self.registration.scope).href;
+}
+
+// Cache key of one build of a file; catalog shards are requested with the same ?v=<hash>
+function assetKey(path, hash) {
+    return `${assetUrl(path)}?v=${hash}`;
+}
+
+// Cache key of the manifest in use ('current') or waiting ('pending')
+function manifestKey(name) {
+    return `${assetUrl(MANIFEST_FILE)}?${name}`;
+}
+
+function manifestHashes(manifest) {
+    return {...manifest.runtime, ...manifest.precache};
+}
+
+function loadManifests() {
+    if (!manifestsPromise) {
+        manifestsPromise = (async () => {
+            const cache = await caches.open(CACHE_NAME);
+            const [current, pending] = await Promise.all(['current', 'pending'].map(async name => {
+                const response = await cache.match(manifestKey(name));
+                return response ? manifestHashes(await response.json()) : null;
+            }));
+            return {current: current || {}, pending};
+        })();
+    }
+    return manifestsPromise;
+}
+
+// First 16 hex digits of the SHA-256 of a response body, as in the manifest
+async function contentHash(response) {
+    const digest = await crypto.subtle.digest('SHA-256', await response.clone().arrayBuffer());
+    return Array.from(new Uint8Array(digest).slice(0, 8), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+// Cache a fetched file under its build's key, unless the server already
+// has a different build of it
+async function store(cache, path, hash, response) {
+    if (!response.ok || response.redirected || await contentHash(response) !== hash) return;
+    await cache.put(assetKey(path, hash), response.clone());
+}
+
+async function cacheFirst(path, request) {
+    const {current} = await loadManifests();
+    if (!(path in current)) return fetch(request);
+
+    // A catalog shard names the build it wants; everything else uses the page's build
+    const hash = new URL(request.url).searchParams.get('v') || current[path];
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(assetKey(path, hash));
+    if (cached) return cached;
+
+    // Not cached yet: skip a stale HTTP cache
+    const response = await fetch(assetUrl(path), {cache: 'no-cache'});
+    await store(cache, path, hash, response);
+    return response;
+}
+
+// Serve from the manifest a previous visit precached, if there is one
+async function switchManifest() {
+    const manifests = await loadManifests();
+    if (!manifests.pending) return;
+
+    const cache = await caches.open(CACHE_NAME);
+    const response = await cache.match(manifestKey('pending'));
+    if (response) await cache.put(manifestKey('current'), response);
+    await cache.delete(manifestKey('pending'));
+    manifests.current = manifests.pending;
+    manifests.pending = null;
+}
+
+// Fetch the current manifest, precache its files next to the ones in use
+// and keep it for the next navigation; runs one at a time
+function syncManifest() {
+    if (!syncPromise) {
+        syncPromise = fetchManifest().finally(() => { syncPromise = null; });
+    }
+    return syncPromise;
+}
+
+async function fetchManifest() {
+    const response = await fetch(MANIFEST_FILE, {cache: 'no-cache'});
+    if (!response.ok) throw new Error(`${MANIFEST_FILE}: HTTP ${response.status}`);
+    const manifest = await response.clone().json();
+    if (manifest.version !== MANIFEST_VERSION) throw new Error(`${MANIFEST_FILE}: unknown version`);
+
+    const cache = await caches.open(CACHE_NAME);
+    const manifests = await loadManifests();
+    const hashes = manifestHashes(manifest);
+
+    await Promise.all(Object.entries(manifest.precache).map(async ([path, hash]) => {
+        if (await cache.match(assetKey(path, hash))) return;
+        try {
+            await store(cache, path, hash, await fetch(assetUrl(path), {cache: 'no-cache'}));
+        } catch (error) {
+            // Left for cacheFirst to fetch when a page asks for it
+            console.warn(`Precache of ${path} failed:`, error);
+        }
+    }));
+
+    const unchanged = Object.keys(hashes).length === Object.keys(manifests.current).length &&
+        Object.keys(hashes).every(path => hashes[path] === manifests.current[path]);
+    if (Object.keys(manifests.current).length === 0) {
+        // Nothing served yet (first install): use it straight away
+        await cache.put(manifestKey('current'), response);
+        manifests.current = hashes;
+    } else if (unchanged) {
+        await cache.delete(manifestKey('pending'));
+        manifests.pending = null;
+    } else {
+        await cache.put(manifestKey('pending'), response);
+        manifests.pending = hashes;
+    }
+
+    // Drop the files neither the build in use nor the waiting one lists
+    const keys = await cache.keys();
+    await Promise.all(keys.map(request => {
+        const path = assetPath(request.url);
+        if (path === MANIFEST_FILE) return null;
+        const hash = new URL(request.url).searchParams.get('v');
+        const pending = manifests.pending || {};
+        if (path !== null && hash && (manifests.current[path] === hash || pending[path] === hash)) return null;
+        return cache.delete(request);
+    }));
+}
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Synthetic Telugu Story Corpus
+=============================
+
+Generates story and document HTML pages in the same shape as
+stories/<year>/*.html (same template, navigation, tags and story-body
+markup) so the build scripts can be benchmarked at sizes far beyond the
+real archive.
+
+Text is built from random Telugu syllables mixed with the narrative and
+document phrases the classifier looks for, so pages exercise the same
+code paths as the real archive: about one page in eight is a document
+(bill, form, chat log) and the rest are stories of 150 to 1500 words.
+Output is deterministic for a given size and seed, and a finished
+corpus is reused instead of being generated again.
+
+Usage:
+    python synthetic_corpus.py 1000 [--seed N] [--out DIR]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+from datetime import date, timedelta
+
+CORPUS_DIR = '.bench-corpus'
+
+# Bump when the generated pages change so old corpora are rebuilt
+GENERATOR_VERSION = 1
+
+YEARS = ['2021', '2022', '2023', '2024']
+DOCUMENT_RATIO = 0.125
+
+CONSONANTS = 'కఖగఘచఛజఝటఠడఢణతథదధనపఫబభమయరలవశషసహళ'
+VOWEL_SIGNS = ['', 'ా', 'ి', 'ీ', 'ు', 'ూ', 'ె', 'ే', 'ై', 'ొ', 'ో', 'ౌ', 'ం', '్య', '్ర']
+
+STORY_PHRASES = [
+    'అనగనగా', 'ఒకసారి', 'ఒక రోజు', 'జరిగింది', 'అన్నాడు', 'అంది', 'చెప్పాడు',
+    'అడిగింది', 'అనిపించింది', 'గుర్తుకు వచ్చింది', 'అమ్మ', 'తండ్రి', 'పిల్లలు',
+    'జీవితం', 'ప్రయాణం', 'దేవుడు', 'పూజ'
+]
+DOCUMENT_PHRASES = [
+    'invoice', 'amount', 'tax', 'total', 'due date', 'account number', 'payment',
+    'application', 'form', 'registration', 'whatsapp chat', 'message', 'status:'
+]
+DOCUMENT_SLUGS = ['bill', 'application-form', 'fibernet-invoice', 'whatsapp-chat', 'house-tax']
+TAGS = ['family', 'travel', 'kids', 'spiritual', 'philosophical', 'short', 'long', 'devudu']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="te">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <meta name="description" content="{title}">
+    <meta property="og:title" content="{title}">
+    <meta property="og:type" content="article">
+    <link rel="stylesheet" href="../../styles.css">
+</head>
+<body>
+    <nav class="navbar">
+        <div class="nav-container">
+            <a href="../../index.html" class="nav-brand">రవి కావూరు కథలు</a>
+            <div class="nav-links">
+                <a href="../../index.html#home">మొదటి పేజీ</a>
+                <a href="../../index.html#stories">కథలు</a>
+                <a href="../../index.html#about">గురించి</a>
+            </div>
+        </div>
+    </nav>
+
+    <main class="story-page">
+        <div class="container">
+            <article class="story-content">
+                <header class="story-header">
+                    <h1 class="story-title">{title}</h1>
+                    <div class="story-meta">
+                        <span class="story-date">{date}</span>
+                        <div class="story-tags">
+                            {tags}
+                        </div>
+                    </div>
+                </header>
+
+                <div class="story-body">
+{paragraphs}
+                </div>
+
+                <footer class="story-footer">
+                    <a href="../../index.html#stories" class="back-to-stories">← మరిన్ని కథలు చూడండి</a>
+                </footer>
+            </article>
+        </div>
+    </main>
+
+    <footer class="site-footer">
+        <div class="container">
+            <p>&copy; 2024 రవి కావూరు కథలు. అన్ని హక్కులు సురక్షితం.</p>
+        </div>
+    </footer>
+</body>
+</html>
+"""
+
+
+def random_word(rng):
+    """A pronounceable Telugu word of one to four syllables"""
+    return ''.join(rng.choice(CONSONANTS) + rng.choice(VOWEL_SIGNS)
+                   for _ in range(rng.randint(1, 4)))
+
+
+def random_sentence(rng, phrases):
+    """A sentence of random words with an occasional indicator phrase"""
+    words = [random_word(rng) for _ in range(rng.randint(4, 14))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(phrases))
+    return ' '.join(words) + '.'
+
+
+def generate_page(rng, index, year):
+    """Return (filename, html) for one synthetic page"""
+    is_document = rng.random() < DOCUMENT_RATIO
+    phrases = DOCUMENT_PHRASES if is_document else STORY_PHRASES
+    title = ' '.join(random_word(rng) for _ in range(rng.randint(1, 5)))
+
+    if is_document:
+        slug = f"{rng.choice(DOCUMENT_SLUGS)}-{index}"
+        word_target = rng.randint(40, 400)
+    else:
+        slug = '-'.join(random_word(rng) for _ in range(rng.randint(1, 4))) + f"-{index}"
+        word_target = rng.randint(150, 1500)
+
+    paragraphs = []
+    words = 0
+    while words < word_target:
+        # Lines inside a paragraph are separated by newlines, as in the archive
+        lines = [random_sentence(rng, phrases) for _ in range(rng.randint(1, 6))]
+        words += sum(len(line.split()) for line in lines)
+        paragraphs.append('                    <p>' + '\n'.join(lines) + '</p>')
+
+    page_date = date(int(year), 1, 1) + timedelta(days=rng.randrange(365))
+    tags = ' '.join(f'<span class="tag">{tag}</span>' for tag in rng.sample(TAGS, rng.randint(1, 4)))
+    html = PAGE_TEMPLATE.format(
+        title=title,
+        date=page_date.strftime("%B %d, %Y"),
+        tags=tags,
+        paragraphs='\n'.join(paragraphs)
+    )
+    return f"{slug}.html", html
+
+
+def corpus_path(size, seed, corpus_dir=CORPUS_DIR):
+    """Directory holding the corpus for a size and seed"""
+    return os.path.join(corpus_dir, f"{size}-s{seed}")
+
+
+def generate_corpus(size, seed=0, corpus_dir=CORPUS_DIR):
+    """Write a corpus of `size` pages (reusing a finished one) and return its file paths
+
+    Pages are spread evenly over YEARS under <corpus>/stories/<year>/.
+    """
+    root = corpus_path(size, seed, corpus_dir)
+    marker = os.path.join(root, 'corpus.json')
+    expected = {'version': GENERATOR_VERSION, 'size': size, 'seed': seed}
+
+    if os.path.exists(marker):
+        with open(marker, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if all(info.get(key) == value for key, value in expected.items()):
+            return info['files']
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    print(f"🧪 Generating synthetic corpus of {size} pages in {root}/...")
+    rng = random.Random(seed)
+    files = []
+    for index in range(size):
+        year = YEARS[index % len(YEARS)]
+        filename, html = generate_page(rng, index, year)
+        path = os.path.join(root, 'stories', year, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        files.append(path)
+
+    # Written last, so an interrupted run is regenerated next time
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(dict(expected, files=files), f, ensure_ascii=False)
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Telugu story corpus")
+    parser.add_argument('size', type=int, help="number of pages to generate")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--out', default=CORPUS_DIR, help="directory for generated corpora")
+    args = parser.parse_args()
+    files = generate_corpus(args.size, args.seed, args.out)
+    print(f"✅ {len(files)} pages in {corpus_path(args.size, args.seed, args.out)}/")
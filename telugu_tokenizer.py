@@ -0,0 +1,191 @@
+"""
+Telugu Tokenizer
+================
+
+The one place where story text is split into words. Word counts, the
+classifier, the categorizers, the search index and related stories all
+use it, so every script sees the same words:
+
+    1. Unicode NFC, so precomposed and decomposed spellings of the same
+       letter compare equal
+    2. zero-width joiner and non-joiner removed: they only choose how a
+       conjunct is drawn, not which word it is
+    3. lower case
+    4. a word is a run of letters, digits, underscores and combining
+       marks, so vowel signs, virama, anusvara and visarga stay with
+       their letter instead of splitting the word (script.js splits
+       search queries with the same rules)
+
+The token stream of a story ("tokens" in the parse cache, words joined
+by single spaces) is computed once per content version by story_cache.py
+and reused by every consumer.
+
+Keywords are matched on grapheme clusters (aksharas: a consonant with
+any virama-joined consonants, vowel sign and modifiers) in token text,
+or in normalised text when punctuation matters ('date:'). A keyword
+must start on a cluster boundary and may not end inside a conjunct, so
+'పద' (word) is not found in 'పద్మం' (lotus); a keyword that ends in a
+virama ('బస్') does match the conjunct it starts ('బస్సు'). It may end
+before a vowel sign or modifier, because Telugu inflects a stem that
+way: 'దేవ' is found in 'దేవుడు' and 'దేవాలయం', 'ప్రయాణ' in 'ప్రయాణం'.
+Multi-word keywords match consecutive words. count_keywords() counts
+every such occurrence, for scoring a whole story body.
+
+collation_key() sorts titles the way a Telugu reader (and the browser's
+'te' collation) expects: punctuation, then digits, then Telugu in
+alphabet order (syllable modifiers, vowels, consonants with ళ after హ,
+vowel signs, virama), then other scripts; case only breaks ties.
+
+Usage:
+    words = tokenize(text)
+    tokens = token_text(text)          # 'word word ...'
+    matcher = compile_keywords(['అమ్మ', 'కథ కదంబం'])
+    found = find_keywords(matcher, tokens)
+    counts = count_keywords(matcher, tokens)   # {'అమ్మ': 3}
+    titles.sort(key=collation_key)
+"""
+
+import re
+import sys
+import unicodedata
+from indicator_matcher import compile_indicators, find_indicators
+
+ZERO_WIDTH_JOINERS = '\u200c\u200d'
+GRAPHEME_BOUNDARY = '\x1f'
+
+
+def _code_points(predicate):
+    """Every BMP character matching predicate"""
+    return frozenset(chr(code) for code in range(0x10000) if predicate(chr(code)))
+
+
+def _char_class(chars):
+    """Regex character class body for a set of characters"""
+    codes = sorted(map(ord, chars))
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ''.join(f"\\u{first:04x}" if first == last else f"\\u{first:04x}-\\u{last:04x}"
+                   for first, last in ranges)
+
+
+# Combining marks (Mn, Mc, Me) and viramas (canonical combining class 9)
+MARK_CHARS = _code_points(lambda char: unicodedata.category(char).startswith('M'))
+VIRAMA_CHARS = _code_points(lambda char: unicodedata.combining(char) == 9)
+MARKS = _char_class(MARK_CHARS)
+VIRAMAS = _char_class(VIRAMA_CHARS)
+
+TOKEN_RE = re.compile(f"[\\w{MARKS}]+")
+ZERO_WIDTH_RE = re.compile(f"[{ZERO_WIDTH_JOINERS}]")
+
+# Telugu letters and signs in collation order
+TELUGU_ORDER = ('ఀఁంఃఄ'
+                'అఆఇఈఉఊఋౠఌౡఎఏఐఒఓఔ'
+                'కఖగఘఙచౘఛజౙఝఞటఠడఢణతథదధనపఫబభమయరఱౚలవశషసహళఴ'
+                '఼ాిీుూృౄౢౣెేైొోౌ్ౕౖ')
+TELUGU_WEIGHTS = {char: weight for weight, char in enumerate(TELUGU_ORDER)}
+
+# Common punctuation and symbols in collation order, curly quotes equal to
+# straight ones; the rest follow by code point
+PUNCTUATION_ORDER = [' ', '_', '-', '–', '—', ',', ';', ':', '!', '?', '.', '…', "'‘’", '"“”',
+                     '«', '»', '(', ')', '[', ']', '{', '}', '@', '*', '/', '\\', '&', '#', '%',
+                     '`', '^', '+', '<', '=', '>', '|', '~', '$']
+PUNCTUATION_WEIGHTS = {char: weight for weight, chars in enumerate(PUNCTUATION_ORDER) for char in chars}
+
+# Primary weight groups of collation_key()
+PUNCTUATION, DIGIT, TELUGU, OTHER = range(4)
+
+# Between two characters of a word, except before a mark or after a virama
+CLUSTER_BOUNDARY_RE = re.compile(f"(?<=.)(?<![{VIRAMAS}])(?=[^{MARKS}])", re.S)
+
+
+def normalize(text):
+    """NFC, without zero-width joiners, lower case"""
+    return ZERO_WIDTH_RE.sub('', unicodedata.normalize('NFC', text)).lower()
+
+
+def tokenize(text):
+    """Split text into normalised word tokens"""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def token_text(text):
+    """The token stream of text as one string, words separated by single spaces"""
+    return ' '.join(tokenize(text))
+
+
+def graphemes(word):
+    """Split a word into grapheme clusters (aksharas)"""
+    return CLUSTER_BOUNDARY_RE.sub(GRAPHEME_BOUNDARY, word).split(GRAPHEME_BOUNDARY)
+
+
+def is_cluster_boundary(text, position):
+    """True if position in text does not fall inside a grapheme cluster"""
+    if position <= 0 or position >= len(text):
+        return True
+    return text[position] not in MARK_CHARS and text[position - 1] not in VIRAMA_CHARS
+
+
+def is_keyword_end(text, position):
+    """True if a keyword match may end at position: anywhere but before a virama"""
+    return position >= len(text) or text[position] not in VIRAMA_CHARS
+
+
+def compile_keywords(keywords):
+    """Compile keywords for grapheme-aligned matching with find_keywords()"""
+    normalized = {}
+    for keyword in keywords:
+        pattern = ' '.join(normalize(keyword).split())
+        if pattern:
+            normalized.setdefault(sys.intern(pattern), keyword)
+    return {'matcher': compile_indicators(list(normalized)), 'keywords': normalized}
+
+
+def find_keywords(matcher, text):
+    """Return the set of keywords found in normalised text (usually token text), never splitting a cluster's consonants"""
+    found = set()
+    for pattern, positions in find_indicators(matcher['matcher'], text).items():
+        keyword = matcher['keywords'][pattern]
+        if keyword in found:
+            continue
+        for position in positions:
+            if is_cluster_boundary(text, position) and is_keyword_end(text, position + len(pattern)):
+                found.add(keyword)
+                break
+    return found
+
+
+def count_keywords(matcher, text):
+    """Return how many times each keyword occurs in normalised text, matched like find_keywords()"""
+    counts = {}
+    for pattern, positions in find_indicators(matcher['matcher'], text).items():
+        hits = sum(1 for position in positions
+                   if is_cluster_boundary(text, position) and is_keyword_end(text, position + len(pattern)))
+        if hits:
+            keyword = matcher['keywords'][pattern]
+            counts[keyword] = counts.get(keyword, 0) + hits
+    return counts
+
+
+def primary_weight(char):
+    """Collation weight of one character, or None if it is ignored"""
+    if char in TELUGU_WEIGHTS:
+        return (TELUGU, TELUGU_WEIGHTS[char])
+    if char.isdecimal():
+        return (DIGIT, unicodedata.decimal(char))
+    category = unicodedata.category(char)
+    if category[0] in 'PSZ':
+        return (PUNCTUATION, PUNCTUATION_WEIGHTS.get(char, len(PUNCTUATION_ORDER) + ord(char)))
+    if category[0] == 'C':
+        return None
+    return (OTHER, ord(char))
+
+
+def collation_key(text):
+    """Sort key for Telugu text: alphabet order first, then lower case before upper"""
+    text = ZERO_WIDTH_RE.sub('', unicodedata.normalize('NFC', text))
+    weights = tuple(weight for weight in map(primary_weight, text.lower()) if weight is not None)
+    return weights, text.swapcase()
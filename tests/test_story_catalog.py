@@ -0,0 +1,124 @@
+"""
+Catalog Journal Tests
+=====================
+
+Checks the crash-safety and concurrency guarantees story_catalog.py
+documents: concurrent appenders never lose or reuse a sequence number,
+a torn last line is ignored and trimmed, replaying changes twice has no
+further effect, and whole-catalog writes keep records appended after
+their load.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from story_catalog import (add_change, append_changes, apply_changes, compact_journal, load_catalog,
+                           load_snapshot, read_journal, remove_change, update_change, write_catalog)
+
+WRITERS = 4
+CHANGES_PER_WRITER = 50
+
+
+def entry(name, year='2024', **fields):
+    """Catalog entry for stories/<year>/<name>.html"""
+    return {'title': name, 'file': f'stories/{year}/{name}.html', 'date': f'{year}-01-01', **fields}
+
+
+def append_from_writer(journal_file, writer):
+    """Process body: append CHANGES_PER_WRITER single-change batches"""
+    for index in range(CHANGES_PER_WRITER):
+        append_changes([add_change('2024', entry(f'w{writer}-{index}'))], journal_file)
+
+
+class CatalogJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog_file = os.path.join(self.tmp.name, 'stories-data.json')
+        self.catalog_dir = os.path.join(self.tmp.name, 'catalog')
+        self.journal_file = os.path.join(self.tmp.name, 'stories-data.journal')
+        with open(self.catalog_file, 'w', encoding='utf-8') as f:
+            json.dump({'2024': [entry('first')], '2023': [entry('old', '2023')]}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self):
+        return load_catalog(self.catalog_file, self.journal_file)
+
+    def test_concurrent_appenders_keep_every_change(self):
+        processes = [multiprocessing.Process(target=append_from_writer, args=(self.journal_file, writer))
+                     for writer in range(WRITERS)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        records = read_journal(self.journal_file)
+        self.assertEqual([record['seq'] for record in records], list(range(1, WRITERS * CHANGES_PER_WRITER + 1)))
+        for writer in range(WRITERS):
+            titles = [record['entry']['title'] for record in records
+                      if record['entry']['title'].startswith(f'w{writer}-')]
+            self.assertEqual(titles, [f'w{writer}-{index}' for index in range(CHANGES_PER_WRITER)])
+        self.assertEqual(len(self.load()['2024']), 1 + WRITERS * CHANGES_PER_WRITER)
+
+    def test_torn_last_line_is_ignored_and_trimmed(self):
+        append_changes([add_change('2024', entry('a')), add_change('2024', entry('b'))], self.journal_file)
+        with open(self.journal_file, 'ab') as f:
+            f.write(b'{"seq":3,"op":"add","year":"2024","entry":{"tit')  # Crash mid-write
+
+        self.assertEqual(len(read_journal(self.journal_file)), 2)
+        self.assertEqual([e['title'] for e in self.load()['2024']], ['first', 'a', 'b'])
+
+        self.assertEqual(append_changes([remove_change('stories/2024/a.html')], self.journal_file), 3)
+        with open(self.journal_file, 'rb') as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(line)['seq'] for line in lines], [1, 2, 3])
+        self.assertEqual([e['title'] for e in self.load()['2024']], ['first', 'b'])
+
+    def test_replaying_changes_twice_has_no_further_effect(self):
+        changes = [add_change('2024', entry('new')), update_change('stories/2024/first.html', {'title': 'First'}),
+                   remove_change('stories/2023/old.html'), add_change('2024', entry('new', title='Newer'))]
+        data = load_snapshot(self.catalog_file)
+        once = apply_changes(data, changes)
+        self.assertEqual(apply_changes(once, changes), once)
+        self.assertEqual([e['title'] for e in once['2024']], ['First', 'Newer'])
+        self.assertEqual(once['2023'], [])
+
+    def test_crash_between_publish_and_trim_is_harmless(self):
+        append_changes([add_change('2024', entry('new')), remove_change('stories/2023/old.html')],
+                       self.journal_file)
+        expected = self.load()
+        # Snapshot published with the changes, journal never trimmed
+        with open(self.catalog_file, 'w', encoding='utf-8') as f:
+            json.dump(expected, f)
+        self.assertEqual(self.load(), expected)
+
+    def test_compaction_publishes_and_keeps_sequence_numbers_increasing(self):
+        append_changes([add_change('2024', entry('new'))], self.journal_file)
+        self.assertEqual(compact_journal(0, self.catalog_file, self.catalog_dir, self.journal_file), 1)
+
+        self.assertEqual([e['title'] for e in load_snapshot(self.catalog_file)['2024']], ['first', 'new'])
+        self.assertTrue(os.path.exists(os.path.join(self.catalog_dir, 'manifest.json')))
+        self.assertEqual([record['op'] for record in read_journal(self.journal_file)], ['compacted'])
+        self.assertEqual(append_changes([remove_change('stories/2024/new.html')], self.journal_file), 2)
+
+    def test_write_catalog_keeps_records_appended_after_load(self):
+        append_changes([add_change('2024', entry('loaded'))], self.journal_file)
+        data = self.load()
+        append_changes([add_change('2024', entry('later'))], self.journal_file)
+
+        write_catalog(data, self.catalog_file, self.catalog_dir, self.journal_file)
+        remaining = [record for record in read_journal(self.journal_file) if record['op'] != 'compacted']
+        self.assertEqual([record['entry']['title'] for record in remaining], ['later'])
+        self.assertEqual([e['title'] for e in self.load()['2024']], ['first', 'loaded', 'later'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,96 +2,80 @@
 """
 Script to update the classification of the reviewed files and create the final stories data.
 """
-import pandas as pd
-import json
-import os
+import csv
 from datetime import datetime
+from story_catalog import write_catalog
+from story_categories import with_site_categories
+from story_csv import (apply_review_override, clean_title, is_story, iter_csv_records,
+                       load_review_overrides, read_csv_fields, review_override)
+from story_manifest import find_analysis_csv
+from telugu_tokenizer import compile_keywords, find_keywords, token_text
+
+# Collections of several stories, matched on whole grapheme clusters of
+# the title and filename (telugu_tokenizer.py). The site category comes
+# from the story text and title (story_categories.py).
+COLLECTION_MATCHER = compile_keywords(['కథ కదంబం', 'కథసగర', 'కథ సగర'])
+
+def story_kind(story):
+    """Return "collection" when a story row's title or filename names a collection, else "story"."""
+    # Title and filename on separate lines, so no keyword spans both
+    tokens = token_text(story['title']) + '\n' + token_text(story['filename'])
+    return "collection" if find_keywords(COLLECTION_MATCHER, tokens) else "story"
 
 def update_classifications():
     # Read the CSV file
-    csv_file = None
-    for file in os.listdir('.'):
-        if file.startswith('detailed_story_analysis_') and file.endswith('.csv'):
-            csv_file = file
-            break
+    csv_file = find_analysis_csv()
     
     if not csv_file:
         print("Error: Could not find the analysis CSV file")
         return
     
     print(f"Reading {csv_file}...")
-    df = pd.read_csv(csv_file)
-    
-    # Update the three files that needed review
-    files_to_update = [
-        'untitled-document-25.html',
-        'untitled-document-33.html', 
-        'imp.html'
-    ]
-    
-    for filename in files_to_update:
-        mask = df['filename'] == filename
-        if mask.any():
-            df.loc[mask, 'classification'] = 'Document'
-            df.loc[mask, 'confidence'] = 90
-            df.loc[mask, 'reasons'] = 'Manual review: placeholder/incomplete content'
-            print(f"Updated {filename} to Document")
+    overrides = load_review_overrides()
+    stats = {}
     
-    # Save updated CSV
+    # Stream rows through the review decisions into the updated CSV
     updated_csv = f"final_story_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(updated_csv, index=False)
-    print(f"Saved updated analysis to {updated_csv}")
-    
-    # Create stories data JSON
-    stories_df = df[df['classification'] == 'Story'].copy()
-    print(f"\nFound {len(stories_df)} stories out of {len(df)} total files")
-    
-    # Create stories data structure
     stories_data = []
-    
-    for _, story in stories_df.iterrows():
-        # Extract category from content patterns
-        category = "general"  # default
-        
-        # Determine category based on filename/title patterns
-        title = story['title'].lower()
-        filename = story['filename'].lower()
-        
-        if any(x in title or x in filename for x in ['కథ', 'कथ', 'story', 'కధ']):
-            if any(x in title or x in filename for x in ['కథ కదంబం', 'కథసగర', 'కథ సగర']):
-                category = "collection"
-            else:
-                category = "story"
-        elif any(x in title or x in filename for x in ['యాత్र', 'trip', 'పర్వతం', 'గుడి']):
-            category = "travel"
-        elif any(x in title or x in filename for x in ['కవిత', 'పద్య', 'స్తోత్రం', 'మంత్రం']):
-            category = "poetry"
-        elif any(x in title or x in filename for x in ['భక్తి', 'దేవుడు', 'గాయత్రి', 'శ్రీ', 'స్వామి']):
-            category = "spiritual"
-        elif any(x in title or x in filename for x in ['అనుభవం', 'జీవితం', 'వ్యక్తిగత']):
-            category = "personal"
-        elif story['text_length'] < 500:
-            category = "short"
+    with open(updated_csv, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.DictWriter(out, fieldnames=read_csv_fields(csv_file), extrasaction='ignore')
+        writer.writeheader()
         
-        story_data = {
-            "id": story['filename'].replace('.html', ''),
-            "title": story['title'].replace(' - రవి కావూరు కథలు', ''),
-            "filename": story['filename'],
-            "year": int(story['year']),
-            "category": category,
-            "textLength": int(story['text_length']),
-            "confidence": int(story['confidence']),
-            "path": story['filepath']
-        }
-        
-        stories_data.append(story_data)
+        for story in iter_csv_records(csv_file, stats):
+            # Apply the manual review decisions from review-overrides.json
+            override = review_override(story, overrides)
+            if override:
+                story = apply_review_override(story, override)
+                print(f"Updated {story['filename']} to {story['classification']}")
+            writer.writerow(story)
+            
+            if not is_story(story):
+                continue
+            
+            # Collection or single story, from filename/title patterns
+            category = story_kind(story)
+            
+            story_data = {
+                "id": story['filename'].replace('.html', ''),
+                "title": clean_title(story['title']),
+                "filename": story['filename'],
+                "year": int(story['year']),
+                "category": category,
+                "textLength": story['text_length'],
+                "confidence": story['confidence'],
+                "path": story['filepath']
+            }
+            
+            stories_data.append(story_data)
+    
+    print(f"Saved updated analysis to {updated_csv}")
+    print(f"\nFound {len(stories_data)} stories out of {stats['rows']} total files")
     
     # Sort by year (newest first) and then by title
     stories_data.sort(key=lambda x: (-x['year'], x['title']))
     
-    # Save stories data JSON
-    with open('stories-data.json', 'w', encoding='utf-8') as f:
-        json.dump(stories_data, f, ensure_ascii=False, indent=2)
+    # Save stories data JSON (plus the year-sharded catalog for the site)
+    write_catalog(with_site_categories(stories_data))
     
     print(f"Created stories-data.json with {len(stories_data)} stories")
     
@@ -5,21 +5,22 @@ Telugu Stories Data Updater
 
 This script reads the "Mavaya stories" CSV file and updates the stories-data.json 
 with new stories that are marked as "Story" in the classification column.
+New stories are appended to the catalog change journal (see story_catalog.py)
+and then published, so stories-data.json and catalog/ include them as
+soon as the script exits.
 
 Usage:
     python update_stories.py
 
-Requirements:
-    pip install pandas
-
 Author: Your Name
 Date: October 2025
 """
 
-import pandas as pd
-import json
 import os
 from datetime import datetime
+from story_catalog import add_change, append_changes, compact_journal, load_catalog
+from story_categories import with_site_categories
+from story_csv import iter_story_records
 
 def find_csv_file():
     """Find the Mavaya stories CSV file in the current directory."""
@@ -41,14 +42,6 @@ def find_csv_file():
     
     return csv_files[0]
 
-def load_stories_data():
-    """Load existing stories data or create new structure."""
-    if os.path.exists('stories-data.json'):
-        with open('stories-data.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        return {"2021": [], "2022": [], "2023": [], "2024": [], "2025": []}
-
 def update_stories_from_csv():
     """Main function to update stories from CSV."""
     print("🔍 Looking for Mavaya stories CSV file...")
@@ -60,20 +53,8 @@ def update_stories_from_csv():
     print(f"📖 Reading CSV file: {csv_file}")
     
     try:
-        # Read the CSV file
-        df = pd.read_csv(csv_file)
-        print(f"📊 Total entries in CSV: {len(df)}")
-        
-        # Filter only stories (case-insensitive)
-        story_entries = df[df['Classification'].str.lower() == 'story']
-        print(f"📚 Stories found: {len(story_entries)}")
-        
-        if len(story_entries) == 0:
-            print("⚠️  No entries marked as 'Story' found!")
-            return
-        
-        # Load existing stories data
-        stories_data = load_stories_data()
+        # Load existing stories data (snapshot plus journaled changes)
+        stories_data = load_catalog()
         
         # Get existing story titles to avoid duplicates
         existing_titles = set()
@@ -82,26 +63,21 @@ def update_stories_from_csv():
                 existing_titles.add(story['title'])
         
         new_stories_count = 0
+        new_stories = {}
+        stats = {}
+        story_entries = 0
         
-        # Process each story entry
-        for _, row in story_entries.iterrows():
-            title = str(row['Title']).strip()
-            
-            # Remove redundant suffix if present
-            title = title.replace(' - రవి కావూరు కథలు', '').replace(' - రవి గరి కథలు', '')
+        # Stream the entries marked as Story (case-insensitive), suffix already removed
+        for row in iter_story_records(csv_file, stats):
+            story_entries += 1
+            title = row['title']
             
             # Skip if title already exists
             if title in existing_titles:
                 continue
             
             # Determine year (default to 2024 if not specified)
-            year = "2024"  # You can modify this logic based on your needs
-            if 'Year' in row and pd.notna(row['Year']):
-                year = str(int(row['Year']))
-            
-            # Ensure year exists in data structure
-            if year not in stories_data:
-                stories_data[year] = []
+            year = row['year'] or "2024"  # You can modify this logic based on your needs
             
             # Create story entry
             story_entry = {
@@ -112,16 +88,27 @@ def update_stories_from_csv():
             }
             
             # Add description if available
-            if 'Description' in row and pd.notna(row['Description']):
-                story_entry["description"] = str(row['Description'])[:200] + "..."
+            if row.get('description'):
+                story_entry["description"] = row['description'][:200] + "..."
             
-            stories_data[year].append(story_entry)
+            new_stories.setdefault(year, []).append(story_entry)
+            stories_data.setdefault(year, []).append(story_entry)
             existing_titles.add(title)
             new_stories_count += 1
         
-        # Save updated stories data
-        with open('stories-data.json', 'w', encoding='utf-8') as f:
-            json.dump(stories_data, f, ensure_ascii=False, indent=2)
+        print(f"📊 Total entries in CSV: {stats['rows']}")
+        print(f"📚 Stories found: {story_entries}")
+        
+        if story_entries == 0:
+            print("⚠️  No entries marked as 'Story' found!")
+            return
+        
+        # Journal the new stories with their site category, then publish them for the site
+        new_stories = with_site_categories(new_stories)
+        changes = [add_change(year, story) for year in new_stories for story in new_stories[year]]
+        if changes:
+            append_changes(changes)
+        compact_journal()
         
         print(f"✅ Successfully added {new_stories_count} new stories!")
         print(f"📝 Total stories now: {sum(len(stories) for stories in stories_data.values())}")
@@ -134,7 +121,7 @@ def update_stories_from_csv():
         if new_stories_count > 0:
             print(f"\n🎉 New stories added from CSV: {new_stories_count}")
             print("📌 Next steps:")
-            print("   1. Run: git add stories-data.json")
+            print("   1. Run: git add stories-data.json catalog/")
             print("   2. Run: git commit -m 'Update stories from CSV'")
             print("   3. Run: git push")
         else: